@@ -0,0 +1,262 @@
+import asyncio
+import math
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.analysis.incremental import IndicatorBook
+
+ALERT_FIELDS = ("bid", "ask", "mid", "rsi")
+CONDITIONS = ("above", "below", "crosses")
+
+class ThresholdIndex:
+    """Alert thresholds on one (instrument, field), kept sorted per crossing direction.
+
+    A move from ``p`` to ``v`` can only fire the alerts whose threshold lies
+    between the two, which is one contiguous run of each sorted list: two
+    bisects find it, so a tick costs O(log n + matches) however many alerts
+    are registered. Adding or removing an alert is O(n) (a list insert or
+    delete after the bisect); that is a memmove, cheap next to ticks at the
+    ``ALERT_MAX`` sizes used here.
+    """
+
+    def __init__(self, last: Optional[float] = None):
+        self.up_keys: List[float] = []    # fire when the value rises to or through them
+        self.up_ids: List[int] = []
+        self.down_keys: List[float] = []  # fire when the value falls to or through them
+        self.down_ids: List[int] = []
+        self.last = last
+
+    def __len__(self) -> int:
+        return len(self.up_ids) + len(self.down_ids)
+
+    @staticmethod
+    def _insert(keys: List[float], ids: List[int], threshold: float, alert_id: int):
+        i = bisect_right(keys, threshold)
+        keys.insert(i, threshold)
+        ids.insert(i, alert_id)
+
+    @staticmethod
+    def _delete(keys: List[float], ids: List[int], threshold: float, alert_id: int):
+        i = bisect_left(keys, threshold)
+        while i < len(keys) and keys[i] == threshold:
+            if ids[i] == alert_id:
+                del keys[i], ids[i]
+                return
+            i += 1
+
+    def add(self, alert_id: int, threshold: float, condition: str):
+        if condition in ("above", "crosses"):
+            self._insert(self.up_keys, self.up_ids, threshold, alert_id)
+        if condition in ("below", "crosses"):
+            self._insert(self.down_keys, self.down_ids, threshold, alert_id)
+
+    def remove(self, alert_id: int, threshold: float, condition: str):
+        if condition in ("above", "crosses"):
+            self._delete(self.up_keys, self.up_ids, threshold, alert_id)
+        if condition in ("below", "crosses"):
+            self._delete(self.down_keys, self.down_ids, threshold, alert_id)
+
+    def cross(self, value: float) -> List[int]:
+        """Move to ``value``; ids of the alerts whose threshold the move reached or passed"""
+        previous, self.last = self.last, value
+        if previous is None or value == previous:
+            return []
+        if value > previous:  # previous < threshold <= value
+            return self.up_ids[bisect_right(self.up_keys, previous):bisect_right(self.up_keys, value)]
+        # value <= threshold < previous
+        return self.down_ids[bisect_left(self.down_keys, value):bisect_left(self.down_keys, previous)]
+
+class AlertQueue:
+    """Triggered alerts awaiting delivery, at most one pending event per alert.
+
+    An alert that fires again before its last event was collected updates
+    that event (``repeats`` counts the extra triggers) instead of queueing a
+    duplicate; past ``max_size`` pending events the oldest is dropped.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.pending: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self.delivered = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def put(self, event: Dict[str, Any]):
+        existing = self.pending.get(event["alert_id"])
+        if existing is not None:
+            existing.update(event, repeats=existing["repeats"] + 1)
+            self.deduplicated += 1
+            return
+        if len(self.pending) >= self.max_size:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        self.pending[event["alert_id"]] = dict(event, repeats=0)
+        self._ready.set()
+
+    def drain(self, max_events: int) -> List[Dict[str, Any]]:
+        events = []
+        while self.pending and len(events) < max_events:
+            events.append(self.pending.popitem(last=False)[1])
+        if not self.pending:
+            self._ready.clear()
+        self.delivered += len(events)
+        return events
+
+    async def get_batch(self, max_events: int = 100, timeout: float = 0.0) -> List[Dict[str, Any]]:
+        """Pending events, oldest first, waiting up to ``timeout`` seconds for the first one"""
+        if not self.pending and timeout > 0:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        return self.drain(max_events)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self.pending),
+            "delivered": self.delivered,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped
+        }
+
+class AlertEngine:
+    """Price and RSI alerts checked on every tick through sorted threshold indexes.
+
+    Alerts are edge-triggered: ``above`` fires when the value rises to or
+    through the threshold, ``below`` when it falls to or through it,
+    ``crosses`` on either. A fired alert re-arms after its ``cooldown``
+    (``once`` alerts are removed instead). RSI is computed from
+    ``rsi_bar_seconds`` mid-price bars built from the ticks, with the same
+    incremental indicators the streaming signals use.
+    """
+
+    def __init__(self, queue: Optional[AlertQueue] = None, default_cooldown: float = 60.0,
+                 max_alerts: int = 200000, rsi_bar_seconds: int = 60, rsi_period: int = 14):
+        self.queue = queue or AlertQueue()
+        self.default_cooldown = default_cooldown
+        self.max_alerts = max_alerts
+        self.rsi_bar_seconds = rsi_bar_seconds
+        self.indicators = IndicatorBook(rsi_period=rsi_period)
+        self.alerts: Dict[int, Dict[str, Any]] = {}
+        self.indexes: Dict[Tuple[str, str], ThresholdIndex] = {}
+        self.latest: Dict[str, Dict[str, float]] = {}
+        self._bars: Dict[str, Tuple[int, float]] = {}  # instrument -> (forming bar, its last mid)
+        self.next_id = 1
+        self.ticks = 0
+        self.triggered = 0
+        self.suppressed = 0
+
+    def add(self, instrument: str, field: str, condition: str, threshold: float,
+            cooldown: Optional[float] = None, once: bool = False, note: Optional[str] = None) -> Dict[str, Any]:
+        """Register an alert; ValueError on an unknown field or condition, or when full"""
+        if field not in ALERT_FIELDS:
+            raise ValueError(f"field must be one of {', '.join(ALERT_FIELDS)}")
+        if condition not in CONDITIONS:
+            raise ValueError(f"condition must be one of {', '.join(CONDITIONS)}")
+        if not math.isfinite(threshold):
+            raise ValueError("threshold must be a finite number")
+        if len(self.alerts) >= self.max_alerts:
+            raise ValueError(f"Alert limit of {self.max_alerts} reached")
+        alert = {
+            "id": self.next_id,
+            "instrument": instrument,
+            "field": field,
+            "condition": condition,
+            "threshold": float(threshold),
+            "cooldown": self.default_cooldown if cooldown is None else max(0.0, cooldown),
+            "once": once,
+            "note": note,
+            "created_at": time.time(),
+            "last_triggered": None,
+            "triggered_count": 0
+        }
+        key = (instrument, field)
+        index = self.indexes.get(key)
+        if index is None:
+            index = self.indexes[key] = ThresholdIndex(self.latest.get(instrument, {}).get(field))
+        index.add(alert["id"], alert["threshold"], condition)
+        self.alerts[alert["id"]] = alert
+        self.next_id += 1
+        return alert
+
+    def remove(self, alert_id: int) -> bool:
+        alert = self.alerts.pop(alert_id, None)
+        if alert is None:
+            return False
+        key = (alert["instrument"], alert["field"])
+        index = self.indexes[key]
+        index.remove(alert_id, alert["threshold"], alert["condition"])
+        if not len(index):
+            del self.indexes[key]
+        return True
+
+    def get(self, alert_id: int) -> Optional[Dict[str, Any]]:
+        return self.alerts.get(alert_id)
+
+    def list_alerts(self, instrument: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [a for a in self.alerts.values() if instrument is None or a["instrument"] == instrument]
+
+    def current(self, instrument: str, field: str) -> Optional[float]:
+        return self.latest.get(instrument, {}).get(field)
+
+    def on_tick(self, instrument: str, timestamp: float, bid: float, ask: float):
+        """Check one tick against the instrument's alerts (a TickHistory listener)"""
+        self.ticks += 1
+        mid = (bid + ask) / 2
+        values = self.latest.setdefault(instrument, {})
+        values["bid"], values["ask"], values["mid"] = bid, ask, mid
+        for field in ("bid", "ask", "mid"):
+            index = self.indexes.get((instrument, field))
+            if index is not None:
+                self._fire(index.cross(values[field]), values[field], timestamp)
+
+        # RSI moves once per closed bar
+        bar = int(timestamp // self.rsi_bar_seconds)
+        forming = self._bars.get(instrument)
+        self._bars[instrument] = (bar, mid)
+        if forming is None or forming[0] == bar:
+            return
+        rsi = self.indicators.update(instrument, "ticks", forming[1]).rsi()
+        if math.isnan(rsi):
+            return
+        values["rsi"] = rsi
+        index = self.indexes.get((instrument, "rsi"))
+        if index is not None:
+            self._fire(index.cross(rsi), rsi, timestamp)
+
+    def _fire(self, alert_ids: List[int], value: float, timestamp: float):
+        for alert_id in alert_ids:
+            alert = self.alerts[alert_id]
+            last = alert["last_triggered"]
+            if last is not None and timestamp - last < alert["cooldown"]:
+                self.suppressed += 1
+                continue
+            alert["last_triggered"] = timestamp
+            alert["triggered_count"] += 1
+            self.triggered += 1
+            self.queue.put({
+                "alert_id": alert_id,
+                "instrument": alert["instrument"],
+                "field": alert["field"],
+                "condition": alert["condition"],
+                "threshold": alert["threshold"],
+                "value": value,
+                "note": alert["note"],
+                "triggered_at": timestamp
+            })
+            if alert["once"]:
+                self.remove(alert_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "alerts": len(self.alerts),
+            "max_alerts": self.max_alerts,
+            "indexes": len(self.indexes),
+            "ticks_checked": self.ticks,
+            "triggered": self.triggered,
+            "suppressed_by_cooldown": self.suppressed,
+            "queue": self.queue.stats()
+        }
@@ -0,0 +1,62 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
+# Full-strength news (sentiment +-1) moves a 0-100 technical score by 50 x this many points
+DEFAULT_WEIGHTS = {
+    "sentiment": float(os.getenv("SIGNAL_WEIGHT_SENTIMENT", "0.2"))
+}
+
+def pair_sentiment(base: Optional[float], quote: Optional[float]) -> Optional[float]:
+    """Fallback for pairs not scored from their own titles: good news for the base lifts the pair, for the quote sinks it"""
+    if base is None and quote is None:
+        return None
+    return max(-1.0, min(1.0, (base or 0.0) - (quote or 0.0)))
+
+def composite_score(technical: float, sentiment: Optional[float],
+                    weights: Dict[str, float] = DEFAULT_WEIGHTS) -> int:
+    """Shift a 0-100 technical score toward the pair's -1..+1 news sentiment.
+
+    The offset is additive, so no news (None) or neutral news (0.0) leaves
+    the technical score exactly as it was.
+    """
+    if not sentiment or weights["sentiment"] <= 0:
+        return int(round(technical))
+    return max(0, min(100, int(round(technical + weights["sentiment"] * 50 * sentiment))))
+
+class SentimentBoard:
+    """Latest news sentiment per currency and per pair, refreshed in the background.
+
+    Each currency and pair is scored once per refresh; requests read their
+    pair from here, so they never trigger a news fetch. ``values()`` is the
+    plain-dict form shared with other workers.
+    """
+
+    def __init__(self):
+        self.currencies: Dict[str, Optional[float]] = {}
+        self.pairs: Dict[str, Optional[float]] = {}
+        self.updated_at = 0.0
+
+    def update(self, currencies: Dict[str, Optional[float]], pairs: Optional[Dict[str, Optional[float]]] = None):
+        # swapped whole, readers never see a partial refresh
+        self.currencies, self.pairs = currencies, pairs or {}
+        self.updated_at = time.time()
+
+    def values(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {"currencies": self.currencies, "pairs": self.pairs}
+
+    def for_pair(self, instrument: str, values: Optional[Dict[str, Dict[str, Optional[float]]]] = None) -> Dict[str, Any]:
+        values = self.values() if values is None else values
+        currencies, pairs = values.get("currencies", {}), values.get("pairs", {})
+        base, _, quote = instrument.partition("_")
+        base_value, quote_value = currencies.get(base), currencies.get(quote)
+        pair = pairs[instrument] if instrument in pairs else pair_sentiment(base_value, quote_value)
+        return {"base": base_value, "quote": quote_value, "pair": pair}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "currencies": self.currencies,
+            "pairs": self.pairs,
+            "updated_at": self.updated_at or None,
+            "weights": DEFAULT_WEIGHTS
+        }
@@ -0,0 +1,180 @@
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+PairSplitter = Callable[[str], Tuple[str, str]]
+
+def _split(instrument: str) -> Tuple[str, str]:
+    base, _, quote = instrument.partition("_")
+    return base, quote
+
+def rounded_matrix(matrix: np.ndarray, digits: int = 4) -> List[List[Optional[float]]]:
+    """Nested lists for JSON, NaN (undefined correlation) as None"""
+    return [[None if math.isnan(v) else round(v, digits) for v in row] for row in matrix.tolist()]
+
+class RollingCorrelation:
+    """Rolling correlation of bar returns across every instrument that ticks.
+
+    Each ``bar_seconds`` the latest mid of every tracked instrument becomes
+    one log return. The window's return sums and cross-product sums are
+    updated by adding the new bar and removing the one that left the
+    window, an O(N²) rank-one update per bar instead of recomputing
+    correlations over the whole window; the sums are rebuilt from the
+    return buffer once per window so float error cannot accumulate.
+    Bars without ticks close flat (zero return), one per elapsed period.
+    """
+
+    def __init__(self, bar_seconds: float = 60.0, window: int = 120, min_periods: Optional[int] = None):
+        self.bar_seconds = bar_seconds
+        self.window = window
+        self.min_periods = min_periods or window
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._returns = np.zeros((window, 0))  # ring of bar return vectors
+        self._sum = np.zeros(0)
+        self._cross = np.zeros((0, 0))
+        self._mids = np.zeros(0)
+        self._closes = np.zeros(0)  # mid at the last bar close (NaN until known)
+        self._samples = np.zeros(0, dtype=np.int64)  # returns seen per instrument
+        self._bar: Optional[int] = None
+        self.bars = 0
+        self.resyncs = 0
+
+    def _track(self, instrument: str) -> int:
+        """Add a column; its earlier bars count as flat until it has ``min_periods`` of its own"""
+        self.index[instrument] = len(self.names)
+        self.names.append(instrument)
+        self._returns = np.pad(self._returns, ((0, 0), (0, 1)))
+        self._sum = np.append(self._sum, 0.0)
+        self._cross = np.pad(self._cross, ((0, 1), (0, 1)))
+        self._mids = np.append(self._mids, np.nan)
+        self._closes = np.append(self._closes, np.nan)
+        self._samples = np.append(self._samples, 0)
+        return self.index[instrument]
+
+    def on_tick(self, instrument: str, timestamp: float, bid: float, ask: float):
+        """Take one tick (a TickHistory listener); closes every bar it ends"""
+        bar = int(timestamp // self.bar_seconds)
+        if self._bar is None:
+            self._bar = bar
+        elif bar > self._bar:
+            # the skipped bars had no ticks; past a full window more flat bars change nothing
+            for _ in range(min(bar - self._bar, self.window)):
+                self.close_bar()
+            self._bar = bar
+        i = self.index.get(instrument)
+        if i is None:
+            i = self._track(instrument)
+        self._mids[i] = (bid + ask) / 2
+
+    def close_bar(self):
+        """Fold the current mids into the window as one bar of returns"""
+        known = ~np.isnan(self._closes) & ~np.isnan(self._mids)
+        returns = np.zeros(len(self.names))
+        returns[known] = np.log(self._mids[known] / self._closes[known])
+        slot = self.bars % self.window
+        if self.bars >= self.window:
+            leaving = self._returns[slot]
+            self._sum -= leaving
+            self._cross -= np.outer(leaving, leaving)
+        self._returns[slot] = returns
+        self._sum += returns
+        self._cross += np.outer(returns, returns)
+        self._closes = self._mids.copy()
+        self._samples += known
+        self.bars += 1
+        if self.bars % self.window == 0:
+            self._sum = self._returns.sum(axis=0)
+            self._cross = self._returns.T @ self._returns
+            self.resyncs += 1
+
+    @property
+    def observations(self) -> int:
+        return min(self.bars, self.window)
+
+    def ready(self) -> List[str]:
+        """Instruments with at least ``min_periods`` returns of their own"""
+        return [name for name, samples in zip(self.names, self._samples) if samples >= self.min_periods]
+
+    def _select(self, instruments: Optional[List[str]]) -> Tuple[List[str], np.ndarray]:
+        ready = set(self.ready())
+        names = [n for n in (instruments if instruments is not None else self.names) if n in ready]
+        return names, np.array([self.index[n] for n in names], dtype=np.int64)
+
+    def covariance(self, instruments: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """Sample covariance of bar returns from the running sums"""
+        names, columns = self._select(instruments)
+        n = self.observations
+        if n < 2 or not names:
+            return names, np.full((len(names), len(names)), np.nan)
+        mean = self._sum[columns] / n
+        cross = self._cross[np.ix_(columns, columns)]
+        return names, (cross - n * np.outer(mean, mean)) / (n - 1)
+
+    def correlation(self, instruments: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+        names, cov = self.covariance(instruments)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+        corr[np.outer(std, std) == 0] = np.nan  # flat instruments have no correlation
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return names, np.clip(corr, -1.0, 1.0)
+
+    def window_returns(self, instruments: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """Log return of each instrument over the window"""
+        names, columns = self._select(instruments)
+        return names, self._sum[columns]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "instruments": len(self.names),
+            "ready": len(self.ready()),
+            "bar_seconds": self.bar_seconds,
+            "window_bars": self.window,
+            "bars": self.bars,
+            "resyncs": self.resyncs
+        }
+
+def currency_strength(names: List[str], returns: np.ndarray, cov: np.ndarray,
+                      split: PairSplitter = _split) -> Dict[str, Any]:
+    """Per-currency strength from pair returns.
+
+    Each pair's return is modelled as base strength minus quote strength;
+    the least-squares (zero-sum) solution over every pair is one
+    pseudo-inverse product, and the same projection turns the pair
+    covariance into currency covariance and correlation.
+    """
+    currencies = sorted({c for name in names for c in split(name)})
+    if not names:
+        return {"currencies": [], "strength_bps": {}, "rank": [], "pairs_per_currency": {}, "correlation": []}
+    column = {c: i for i, c in enumerate(currencies)}
+    incidence = np.zeros((len(names), len(currencies)))
+    for row, name in enumerate(names):
+        base, quote = split(name)
+        incidence[row, column[base]] += 1.0
+        incidence[row, column[quote]] -= 1.0
+    projection = np.linalg.pinv(incidence)  # currencies x pairs
+    strength = projection @ returns
+    currency_cov = projection @ cov @ projection.T
+    std = np.sqrt(np.clip(np.diag(currency_cov), 0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        currency_corr = np.clip(currency_cov / np.outer(std, std), -1.0, 1.0)
+    return {
+        "currencies": currencies,
+        "strength_bps": {c: round(float(s) * 10000, 2) for c, s in zip(currencies, strength)},
+        "rank": [currencies[i] for i in np.argsort(-strength, kind="stable")],
+        "pairs_per_currency": {c: int(np.count_nonzero(incidence[:, i])) for c, i in column.items()},
+        "correlation": rounded_matrix(currency_corr)
+    }
+
+def correlated_pairs(names: List[str], corr: np.ndarray, min_abs: float = 0.7) -> List[Dict[str, Any]]:
+    """Pairs of instruments whose return correlation is at least ``min_abs`` in size, strongest first"""
+    rows, cols = np.triu_indices(len(names), k=1)
+    values = corr[rows, cols]
+    keep = np.flatnonzero(np.abs(np.nan_to_num(values)) >= min_abs)
+    keep = keep[np.argsort(-np.abs(values[keep]), kind="stable")]
+    return [
+        {"pair": [names[rows[k]], names[cols[k]]], "correlation": round(float(values[k]), 4)}
+        for k in keep
+    ]
@@ -0,0 +1,237 @@
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import pandas as pd
+
+from app.analysis.technical_analyzer import TechnicalAnalyzer
+
+class _EWM:
+    """Running ``Series.ewm(span=n).mean()`` (adjust=True), one value at a time.
+
+    Mirrors pandas' weighted recurrence so results match the batch calculation.
+    """
+
+    def __init__(self, span: int):
+        self.decay = 1 - 2.0 / (span + 1)
+        self.value = math.nan
+        self.weight = 0.0
+
+    def update(self, x: float) -> float:
+        if self.weight == 0.0:
+            self.value = x
+            self.weight = 1.0
+            return x
+        self.weight *= self.decay
+        if self.value != x:  # pandas skips this on constant input to avoid drift
+            self.value = (self.weight * self.value + x) / (self.weight + 1.0)
+        self.weight += 1.0
+        return self.value
+
+class _RollingStats:
+    """Sliding-window mean and sample variance with O(1) Welford-style updates"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: Deque[float] = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x: float):
+        if len(self.values) < self.window:
+            self.values.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.values.popleft()
+            self.values.append(x)
+            old_mean = self.mean
+            self.mean += (x - old) / self.window
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+            self.m2 = max(self.m2, 0.0)
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.window - 1)) if self.ready and self.window > 1 else math.nan
+
+class _RollingExtreme:
+    """Sliding-window max (or min) via a monotonic deque, amortised O(1)"""
+
+    def __init__(self, window: int, use_max: bool):
+        self.window = window
+        self.use_max = use_max
+        self.count = 0
+        self.candidates: Deque[Tuple[int, float]] = deque()
+
+    def update(self, x: float):
+        while self.candidates and (self.candidates[-1][1] <= x if self.use_max else self.candidates[-1][1] >= x):
+            self.candidates.pop()
+        self.candidates.append((self.count, x))
+        self.count += 1
+        if self.candidates[0][0] <= self.count - 1 - self.window:
+            self.candidates.popleft()
+
+    @property
+    def value(self) -> float:
+        return self.candidates[0][1] if self.candidates else math.nan
+
+class IncrementalIndicators:
+    """Streaming state for one instrument/granularity.
+
+    Each closed candle updates RSI, the MACD EMAs, the Bollinger rolling
+    mean/variance and the support/resistance window in O(1), producing the
+    same values as the batch ``TechnicalAnalyzer`` functions over the full
+    history.
+    """
+
+    def __init__(self, rsi_period: int = 14, bb_period: int = 20, sr_window: int = 10,
+                 macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9):
+        self.rsi_period = rsi_period
+        self.count = 0
+        self.last_close = math.nan
+        self.last_high = math.nan
+        self.last_low = math.nan
+        # RSI: running sums of gains/losses over the window, plus non-zero
+        # counts so an all-zero window yields exactly 0 despite float drift
+        self._moves: Deque[Tuple[float, float]] = deque()
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._gain_count = 0
+        self._loss_count = 0
+        self._fast = _EWM(macd_fast)
+        self._slow = _EWM(macd_slow)
+        self._signal = _EWM(macd_signal)
+        self._macd = math.nan
+        self._bb = _RollingStats(bb_period)
+        self._highs = _RollingExtreme(sr_window, use_max=True)
+        self._lows = _RollingExtreme(sr_window, use_max=False)
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None):
+        """Feed one closed candle (high/low default to the close)"""
+        close = float(close)
+        high = close if high is None else float(high)
+        low = close if low is None else float(low)
+
+        # The batch RSI turns the leading NaN diff into a zero move
+        delta = close - self.last_close if self.count else 0.0
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        self._moves.append((gain, loss))
+        self._gain_sum += gain
+        self._loss_sum += loss
+        self._gain_count += gain > 0
+        self._loss_count += loss > 0
+        if len(self._moves) > self.rsi_period:
+            old_gain, old_loss = self._moves.popleft()
+            self._gain_sum -= old_gain
+            self._loss_sum -= old_loss
+            self._gain_count -= old_gain > 0
+            self._loss_count -= old_loss > 0
+
+        self._macd = self._fast.update(close) - self._slow.update(close)
+        self._signal.update(self._macd)
+        self._bb.update(close)
+        self._highs.update(high)
+        self._lows.update(low)
+
+        self.last_close, self.last_high, self.last_low = close, high, low
+        self.count += 1
+
+    def seed(self, prices: pd.DataFrame) -> "IncrementalIndicators":
+        """Warm the state from a batch of candles (``close`` plus optional ``high``/``low``)"""
+        closes = prices['close'].to_numpy(dtype=float)
+        highs = prices['high'].to_numpy(dtype=float) if 'high' in prices else closes
+        lows = prices['low'].to_numpy(dtype=float) if 'low' in prices else closes
+        for close, high, low in zip(closes, highs, lows):
+            self.update(close, high, low)
+        return self
+
+    def rsi(self) -> float:
+        if self.count == 0:
+            return 50
+        if len(self._moves) < self.rsi_period:
+            return math.nan
+        gain = self._gain_sum / self.rsi_period if self._gain_count else 0.0
+        loss = self._loss_sum / self.rsi_period if self._loss_count else 0.0
+        if loss == 0.0:
+            return math.nan if gain == 0.0 else 100.0
+        return round(100 - (100 / (1 + gain / loss)), 2)
+
+    def macd(self) -> Dict[str, float]:
+        signal = self._signal.value
+        return {
+            'macd': round(self._macd, 5),
+            'signal': round(signal, 5),
+            'histogram': round(self._macd - signal, 5)
+        }
+
+    def bollinger_bands(self) -> Dict[str, float]:
+        sma = self._bb.mean if self._bb.ready else math.nan
+        std = self._bb.std
+        upper, lower = sma + std * 2, sma - std * 2
+        width = upper - lower
+        position = (self.last_close - lower) / width if width else math.nan
+        return {
+            'upper': round(upper, 5),
+            'middle': round(sma, 5),
+            'lower': round(lower, 5),
+            'position': round(position, 3)
+        }
+
+    def support_resistance(self) -> Dict[str, float]:
+        recent_high, recent_low = self._highs.value, self._lows.value
+        return {
+            'support': round(recent_low, 5),
+            'resistance': round(recent_high, 5),
+            'current_vs_support': round(((self.last_close - recent_low) / recent_low * 100), 2),
+            'current_vs_resistance': round(((recent_high - self.last_close) / self.last_close * 100), 2)
+        }
+
+    def generate_signal(self, sentiment: Optional[float] = None) -> Dict[str, Any]:
+        """Same payload as ``TechnicalAnalyzer.generate_signal`` from the current state"""
+        rsi = self.rsi()
+        macd_data = self.macd()
+        bb_data = self.bollinger_bands()
+        technical_score, signal, strength = TechnicalAnalyzer.score_signal(rsi, macd_data['histogram'], bb_data['position'])
+        score = technical_score
+        if sentiment is not None:
+            score, signal, strength = TechnicalAnalyzer.blend_sentiment(technical_score, sentiment)
+        result = {
+            'signal': signal,
+            'strength': strength,
+            'score': score,
+            'indicators': {
+                'rsi': rsi,
+                'macd': macd_data,
+                'bollinger_bands': bb_data,
+                'support_resistance': self.support_resistance()
+            },
+            'timestamp': pd.Timestamp.now().isoformat()
+        }
+        if sentiment is not None:
+            result['technical_score'] = technical_score
+            result['sentiment'] = sentiment
+        return result
+
+class IndicatorBook:
+    """Incremental indicator state per (instrument, granularity)"""
+
+    def __init__(self, **indicator_params):
+        self.indicator_params = indicator_params
+        self.states: Dict[Tuple[str, str], IncrementalIndicators] = {}
+
+    def get(self, instrument: str, granularity: str = "H1") -> IncrementalIndicators:
+        key = (instrument, granularity)
+        if key not in self.states:
+            self.states[key] = IncrementalIndicators(**self.indicator_params)
+        return self.states[key]
+
+    def update(self, instrument: str, granularity: str, close: float,
+               high: Optional[float] = None, low: Optional[float] = None) -> IncrementalIndicators:
+        state = self.get(instrument, granularity)
+        state.update(close, high, low)
+        return state
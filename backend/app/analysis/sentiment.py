@@ -0,0 +1,212 @@
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Whole-word lexicon (with common inflections, since titles are not stemmed)
+POSITIVE_WORDS = {
+    "up", "rise", "rises", "rising", "rose", "gain", "gains", "gained", "bullish",
+    "strong", "stronger", "strengthens", "buy", "positive", "rally", "rallies", "surge", "surges"
+}
+NEGATIVE_WORDS = {
+    "down", "fall", "falls", "falling", "fell", "drop", "drops", "dropped", "bearish",
+    "weak", "weaker", "weakens", "sell", "negative", "slump", "slumps", "plunge", "plunges"
+}
+LEXICON = {**{word: 1 for word in POSITIVE_WORDS}, **{word: -1 for word in NEGATIVE_WORDS}}
+
+# Title terms identifying news about each currency; a multi-word term needs all its words
+CURRENCY_TERMS = {
+    "USD": ["usd", "dollar", "fed", "federal reserve", "powell", "greenback"],
+    "EUR": ["eur", "euro", "ecb", "eurozone", "lagarde"],
+    "GBP": ["gbp", "sterling", "pound", "bank of england", "boe"],
+    "JPY": ["jpy", "yen", "boj", "bank of japan"],
+    "CHF": ["chf", "franc", "snb", "swiss national bank"],
+    "AUD": ["aud", "aussie", "rba", "reserve bank of australia"],
+    "CAD": ["cad", "loonie", "boc", "bank of canada"],
+    "NZD": ["nzd", "kiwi", "rbnz"]
+}
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+def title_sentiment(tokens: Set[str]) -> Optional[float]:
+    """(positive - negative) / (positive + negative) over a title's distinct words; None without lexicon words"""
+    positive = negative = 0
+    for token in tokens:
+        weight = LEXICON.get(token)
+        if weight == 1:
+            positive += 1
+        elif weight == -1:
+            negative += 1
+    if positive + negative == 0:
+        return None
+    return (positive - negative) / (positive + negative)
+
+def _published_ts(article: Dict[str, Any]) -> float:
+    try:
+        return datetime.fromisoformat(article["publishedAt"].replace("Z", "+00:00")).timestamp()
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return time.time()
+
+class NewsCorpus:
+    """Recent articles, tokenized and scored once on arrival.
+
+    An inverted index maps title tokens to article ids, so a query only
+    visits the articles containing its terms, and every article's
+    sentiment is computed when it is added, not per query.
+    """
+
+    def __init__(self, window: float = 86400.0):
+        self.window = window
+        self.articles: Dict[int, Dict[str, Any]] = {}
+        self.sentiments: Dict[int, Optional[float]] = {}
+        self.index: Dict[str, Set[int]] = {}
+        self._ids_by_key: Dict[str, int] = {}
+        self._next_id = 0
+        self.newest_published: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def add(self, articles: Iterable[Dict[str, Any]]) -> int:
+        """Index articles not seen yet (by url, else title); returns how many were new"""
+        added = 0
+        for article in articles:
+            title = article.get("title") or ""
+            key = article.get("url") or title
+            if not key or key in self._ids_by_key:
+                continue
+            article_id = self._next_id
+            self._next_id += 1
+            words = tokenize(title)
+            tokens = set(words)
+            self._ids_by_key[key] = article_id
+            self.articles[article_id] = {
+                "key": key,
+                "title": title,
+                "words": words,
+                "tokens": tokens,
+                "published": _published_ts(article),
+                "published_at": article.get("publishedAt")
+            }
+            self.sentiments[article_id] = title_sentiment(tokens)
+            for token in tokens:
+                self.index.setdefault(token, set()).add(article_id)
+            published = article.get("publishedAt")
+            if published and (self.newest_published is None or published > self.newest_published):
+                self.newest_published = published
+            added += 1
+        return added
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop articles published more than ``window`` seconds ago"""
+        cutoff = (now if now is not None else time.time()) - self.window
+        expired = [i for i, article in self.articles.items() if article["published"] < cutoff]
+        for article_id in expired:
+            article = self.articles.pop(article_id)
+            del self.sentiments[article_id]
+            del self._ids_by_key[article["key"]]
+            for token in article["tokens"]:
+                postings = self.index.get(token)
+                if postings is not None:
+                    postings.discard(article_id)
+                    if not postings:
+                        del self.index[token]
+        return len(expired)
+
+    def matching(self, term: str) -> Set[int]:
+        """Ids of articles whose title contains every word of ``term``"""
+        words = tokenize(term)
+        if not words:
+            return set()
+        postings = sorted((self.index.get(word, set()) for word in words), key=len)
+        return set.intersection(*postings) if postings[0] else set()
+
+    def score_ids(self, ids: Iterable[int]) -> Tuple[Optional[float], int]:
+        """Average sentiment over the articles that have any, and how many do"""
+        scores = [s for s in (self.sentiments[i] for i in ids) if s is not None]
+        return (sum(scores) / len(scores) if scores else None), len(scores)
+
+    def score_query(self, query: str) -> Tuple[Optional[float], int]:
+        """Sentiment of articles matching a NewsAPI-style query (terms joined by OR)"""
+        ids: Set[int] = set()
+        for term in re.split(r"\s+OR\s+", query):
+            ids |= self.matching(term)
+        return self.score_ids(ids)
+
+    def currency_ids(self, currency: str, terms: Dict[str, List[str]] = CURRENCY_TERMS) -> Set[int]:
+        ids: Set[int] = set()
+        for term in terms.get(currency, [currency.lower()]):
+            ids |= self.matching(term)
+        return ids
+
+    def currency_mentions(self, currencies: Iterable[str],
+                          terms: Dict[str, List[str]] = CURRENCY_TERMS) -> Dict[str, Dict[str, Any]]:
+        """Per currency, read from the index once: where each title naming it
+        first does, and the summed sentiment of those titles"""
+        mentions: Dict[str, Dict[str, Any]] = {}
+        for currency in currencies:
+            if currency in mentions:
+                continue
+            first = {i: self._first_mention(i, currency, terms) for i in self.currency_ids(currency, terms)}
+            scores = [s for s in (self.sentiments[i] for i in first) if s is not None]
+            mentions[currency] = {"first": first, "total": sum(scores), "scored": len(scores)}
+        return mentions
+
+    def score_currencies(self, currencies: Iterable[str], terms: Dict[str, List[str]] = CURRENCY_TERMS,
+                         mentions: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Sentiment per currency, all read from the same indexed corpus"""
+        mentions = mentions if mentions is not None else self.currency_mentions(currencies, terms)
+        results = {}
+        for currency in currencies:
+            mention = mentions[currency]
+            scored = mention["scored"]
+            results[currency] = {
+                "sentiment": mention["total"] / scored if scored else None,
+                "articles": len(mention["first"]),
+                "scored": scored
+            }
+        return results
+
+    def _first_mention(self, article_id: int, currency: str, terms: Dict[str, List[str]]) -> int:
+        """Word position where a title first names ``currency``"""
+        words = self.articles[article_id]["words"]
+        positions = []
+        for term in terms.get(currency, [currency.lower()]):
+            term_words = tokenize(term)
+            positions += [i for i in range(len(words) - len(term_words) + 1)
+                          if words[i:i + len(term_words)] == term_words][:1]
+        return min(positions, default=len(words))
+
+    def score_pair(self, base: str, quote: str, terms: Dict[str, List[str]] = CURRENCY_TERMS,
+                   mentions: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Sentiment for BASE_QUOTE (-1 to +1) from every title naming either currency.
+
+        A title about one currency counts for the pair when it names the
+        base and against it when it names the quote. A title naming both
+        ("EUR/USD rallies", "Dollar slips against the euro") is about the
+        pair: its sentiment belongs to whichever currency it names first.
+        Pass ``currency_mentions()`` to score many pairs off one index pass;
+        then only the titles naming both currencies are visited.
+        """
+        if mentions is None:
+            mentions = self.currency_mentions((base, quote), terms)
+        base_first, quote_first = mentions[base]["first"], mentions[quote]["first"]
+        # base titles count for, quote titles against; a title naming both was counted both ways
+        total = mentions[base]["total"] - mentions[quote]["total"]
+        scored = mentions[base]["scored"] + mentions[quote]["scored"]
+        both = base_first.keys() & quote_first.keys()
+        for article_id in both:
+            sentiment = self.sentiments[article_id]
+            if sentiment is None:
+                continue
+            scored -= 1
+            total += sentiment if base_first[article_id] <= quote_first[article_id] else -sentiment
+        return {
+            "sentiment": total / scored if scored else None,
+            "articles": len(base_first) + len(quote_first) - len(both),
+            "pair_articles": len(both),
+            "scored": scored
+        }
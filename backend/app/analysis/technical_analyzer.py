@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+
+from app.analysis.composite import DEFAULT_WEIGHTS, composite_score
+from app.tracing import span
 
 class TechnicalAnalyzer:
     @staticmethod
@@ -61,16 +64,9 @@ class TechnicalAnalyzer:
             'current_vs_resistance': round(((recent_high - current_close) / current_close * 100), 2)
         }
 
-    def generate_signal(self, prices: pd.DataFrame) -> Dict[str, Any]:
-        """Generate comprehensive trading signal"""
-        close_prices = prices['close']
-        
-        # Calculate all indicators
-        rsi = self.calculate_rsi(close_prices)
-        macd_data = self.calculate_macd(close_prices)
-        bb_data = self.calculate_bollinger_bands(close_prices)
-        sr_data = self.calculate_support_resistance(prices)
-        
+    @staticmethod
+    def score_signal(rsi: float, macd_histogram: float, bb_position: float) -> Tuple[int, str, str]:
+        """Combine indicator readings into a 0-100 score, direction and strength"""
         # Generate signal score (0-100)
         score = 50  # Neutral
         
@@ -79,17 +75,22 @@ class TechnicalAnalyzer:
         elif rsi > 70: score -= 20  # Overbought - bearish
         
         # MACD scoring
-        if macd_data['histogram'] > 0: score += 15  # Bullish
+        if macd_histogram > 0: score += 15  # Bullish
         else: score -= 15  # Bearish
         
         # Bollinger Bands scoring
-        if bb_data['position'] < 0.2: score += 15  # Near support - bullish
-        elif bb_data['position'] > 0.8: score -= 15  # Near resistance - bearish
+        if bb_position < 0.2: score += 15  # Near support - bullish
+        elif bb_position > 0.8: score -= 15  # Near resistance - bearish
         
         # Clamp score between 0-100
         score = max(0, min(100, score))
         
-        # Determine signal direction
+        signal, strength = TechnicalAnalyzer.classify_score(score)
+        return score, signal, strength
+
+    @staticmethod
+    def classify_score(score: int) -> Tuple[str, str]:
+        """Direction and strength of a 0-100 score"""
         if score > 60:
             signal = "BUY"
             strength = "STRONG" if score > 75 else "WEAK"
@@ -100,7 +101,38 @@ class TechnicalAnalyzer:
             signal = "HOLD"
             strength = "NEUTRAL"
         
-        return {
+        return signal, strength
+
+    @staticmethod
+    def blend_sentiment(score: int, sentiment: Optional[float],
+                        weights: Dict[str, float] = DEFAULT_WEIGHTS) -> Tuple[int, str, str]:
+        """Mix a pair's news sentiment (-1 to +1) into a technical score and re-classify it"""
+        score = composite_score(score, sentiment, weights)
+        signal, strength = TechnicalAnalyzer.classify_score(score)
+        return score, signal, strength
+
+    def generate_signal(self, prices: pd.DataFrame, sentiment: Optional[float] = None,
+                        weights: Dict[str, float] = DEFAULT_WEIGHTS) -> Dict[str, Any]:
+        """Generate comprehensive trading signal, optionally blended with the pair's news sentiment"""
+        close_prices = prices['close']
+        
+        # Calculate all indicators
+        with span("rsi"):
+            rsi = self.calculate_rsi(close_prices)
+        with span("macd"):
+            macd_data = self.calculate_macd(close_prices)
+        with span("bollinger"):
+            bb_data = self.calculate_bollinger_bands(close_prices)
+        with span("support_resistance"):
+            sr_data = self.calculate_support_resistance(prices)
+        
+        with span("scoring"):
+            technical_score, signal, strength = self.score_signal(rsi, macd_data['histogram'], bb_data['position'])
+            score = technical_score
+            if sentiment is not None:
+                score, signal, strength = self.blend_sentiment(technical_score, sentiment, weights)
+        
+        result = {
             'signal': signal,
             'strength': strength,
             'score': score,
@@ -112,6 +144,10 @@ class TechnicalAnalyzer:
             },
             'timestamp': pd.Timestamp.now().isoformat()
         }
+        if sentiment is not None:
+            result['technical_score'] = technical_score
+            result['sentiment'] = sentiment
+        return result
 
 # Global analyzer instance
 technical_analyzer = TechnicalAnalyzer()
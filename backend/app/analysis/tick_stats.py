@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SECONDS_PER_YEAR = 365 * 86400
+
+def _mid(ticks: Dict[str, np.ndarray]) -> np.ndarray:
+    return (ticks["bid"] + ticks["ask"]) / 2
+
+def _bucket_starts(times: np.ndarray, seconds: float) -> np.ndarray:
+    """Index of the first tick in each ``seconds`` bucket (epoch-aligned)"""
+    buckets = np.floor(times / seconds)
+    return np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+
+def spread_percentiles(ticks: Dict[str, np.ndarray], percentiles: List[float],
+                       pip_size: Optional[float] = None) -> Dict[str, Any]:
+    """Percentiles of the quoted spread (ask - bid) over the ticks, also in pips when ``pip_size`` is known"""
+    spreads = ticks["ask"] - ticks["bid"]
+    if len(spreads) == 0:
+        return {"ticks": 0, "spread": None, "spread_pips": None}
+    values = np.percentile(spreads, percentiles)
+    result = {
+        "ticks": len(spreads),
+        "spread": {f"p{p:g}": float(v) for p, v in zip(percentiles, values)},
+        "spread_pips": None,
+        "current": float(spreads[-1]),
+        "mean": float(spreads.mean())
+    }
+    if pip_size:
+        result["spread_pips"] = {key: round(value / pip_size, 2) for key, value in result["spread"].items()}
+    return result
+
+def realized_volatility(ticks: Dict[str, np.ndarray], sample_seconds: float = 1.0) -> Dict[str, Any]:
+    """Realized volatility of the mid: root of summed squared log returns between sample points.
+
+    The last mid of each ``sample_seconds`` bucket is the sample, which keeps
+    bid/ask bounce at tick level from inflating the estimate.
+    """
+    times = ticks["time"]
+    if len(times) < 2:
+        return {"ticks": len(times), "samples": len(times), "realized": None, "annualized": None}
+    mid = _mid(ticks)
+    ends = np.concatenate((_bucket_starts(times, sample_seconds)[1:], [len(times)])) - 1
+    returns = np.diff(np.log(mid[ends]))
+    realized = float(np.sqrt(np.sum(returns * returns)))
+    span = float(times[-1] - times[0])
+    return {
+        "ticks": len(times),
+        "samples": len(ends),
+        "span_seconds": round(span, 3),
+        "realized": realized,
+        "annualized": realized * float(np.sqrt(SECONDS_PER_YEAR / span)) if span > 0 else None
+    }
+
+def average_true_range(ticks: Dict[str, np.ndarray], bar_seconds: float = 60.0, period: int = 14,
+                       pip_size: Optional[float] = None) -> Dict[str, Any]:
+    """ATR of ``bar_seconds`` mid-price bars built from the ticks (simple mean of the last ``period`` true ranges)"""
+    times = ticks["time"]
+    if len(times) == 0:
+        return {"ticks": 0, "bars": 0, "atr": None, "atr_pips": None, "last_range": None}
+    mid = _mid(ticks)
+    starts = _bucket_starts(times, bar_seconds)
+    high = np.maximum.reduceat(mid, starts)
+    low = np.minimum.reduceat(mid, starts)
+    close = mid[np.concatenate((starts[1:], [len(mid)])) - 1]
+    ranges = high - low
+    # True range: the bar's range widened to include a gap from the previous close
+    ranges[1:] = np.maximum(ranges[1:], np.maximum(np.abs(high[1:] - close[:-1]), np.abs(low[1:] - close[:-1])))
+    atr = float(ranges[-period:].mean())
+    return {
+        "ticks": len(times),
+        "bars": len(starts),
+        "bar_seconds": bar_seconds,
+        "period": min(period, len(ranges)),
+        "atr": atr,
+        "atr_pips": round(atr / pip_size, 2) if pip_size else None,
+        "last_range": float(ranges[-1])
+    }
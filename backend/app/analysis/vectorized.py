@@ -0,0 +1,200 @@
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Callable, Dict, Tuple
+
+# Scoring rules of TechnicalAnalyzer.score_signal, as tunable parameters
+DEFAULT_THRESHOLDS = {
+    'rsi_oversold': 30.0,
+    'rsi_overbought': 70.0,
+    'bb_low': 0.2,
+    'bb_high': 0.8,
+    'buy_above': 60,
+    'strong_buy_above': 75,
+    'sell_below': 40,
+    'strong_sell_below': 25,
+    'rsi_weight': 20,
+    'macd_weight': 15,
+    'bb_weight': 15
+}
+
+# EMA weights older than this many bars are below float precision for MACD spans
+MACD_HISTORY = 1024
+
+def _as_matrix(prices: np.ndarray) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    return prices[np.newaxis, :] if prices.ndim == 1 else prices
+
+# Cap on elements materialised at once by sliding-window reductions
+ROLLING_CHUNK_ELEMENTS = 4_000_000
+
+def _rolling_reduce(x: np.ndarray, window: int, reducer: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    """Apply ``reducer`` over trailing windows along the bar axis; NaN until the first full window.
+
+    Works through the bars in chunks so long histories never materialise
+    more than ``ROLLING_CHUNK_ELEMENTS`` window elements at a time.
+    """
+    instruments, bars = x.shape
+    out = np.full((instruments, bars), np.nan)
+    if bars < window:
+        return out
+    chunk = max(1, ROLLING_CHUNK_ELEMENTS // (window * max(1, instruments)))
+    for first in range(window - 1, bars, chunk):
+        last = min(bars, first + chunk)
+        windows = sliding_window_view(x[:, first - window + 1:last], window, axis=1)
+        out[:, first:last] = reducer(windows)
+    return out
+
+def rsi_series(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI for every bar; same rolling-mean formula as ``calculate_rsi``"""
+    close = _as_matrix(close)
+    delta = np.diff(close, axis=1, prepend=close[:, :1])  # leading move is 0, as in pandas
+    avg_gain = _rolling_reduce(np.clip(delta, 0, None), period, lambda w: w.mean(axis=-1))
+    avg_loss = _rolling_reduce(np.clip(-delta, 0, None), period, lambda w: w.mean(axis=-1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+def _decayed_cumsum(x: np.ndarray, decay: float, block: int = 256) -> np.ndarray:
+    """y[t] = decay * y[t-1] + x[t] along the bar axis, without a loop over bars.
+
+    Bars are cut into blocks: one matrix product with a decay-power Toeplitz
+    matrix gives every within-block sum, and the carries between blocks
+    follow the same recurrence with ``decay ** block``, solved recursively.
+    """
+    instruments, bars = x.shape
+    if bars <= block:
+        powers = np.tril(decay ** np.subtract.outer(np.arange(bars), np.arange(bars)).clip(0))
+        return x @ powers.T
+    blocks = -(-bars // block)
+    padded = np.zeros((instruments, blocks * block))
+    padded[:, :bars] = x
+    steps = np.arange(block)
+    powers = np.tril(decay ** np.subtract.outer(steps, steps).clip(0))
+    within = padded.reshape(instruments, blocks, block) @ powers.T
+    # Value carried into block k is the full recurrence at the end of block k-1
+    ends = _decayed_cumsum(within[:, :, -1], decay ** block, block)
+    carry = np.zeros((instruments, blocks))
+    carry[:, 1:] = ends[:, :-1]
+    out = within + carry[:, :, np.newaxis] * decay ** (steps + 1)
+    return out.reshape(instruments, -1)[:, :bars]
+
+def ema_series(x: np.ndarray, span: int) -> np.ndarray:
+    """``ewm(span=span).mean()`` (adjust=True) along the bar axis, vectorized across bars"""
+    x = _as_matrix(x)
+    decay = 1 - 2.0 / (span + 1)
+    numerator = _decayed_cumsum(x, decay)
+    denominator = (1 - decay ** np.arange(1, x.shape[1] + 1)) / (1 - decay)
+    return numerator / denominator
+
+def macd_series(close: np.ndarray, fast: int = 12, slow: int = 26,
+                signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    close = _as_matrix(close)
+    macd = ema_series(close, fast) - ema_series(close, slow)
+    signal_line = ema_series(macd, signal)
+    return macd, signal_line, macd - signal_line
+
+@lru_cache(maxsize=32)
+def _macd_weights(bars: int, fast: int, slow: int, signal: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Coefficients turning the last ``bars`` closes into the latest MACD and signal values.
+
+    MACD and its signal line are linear in the prices, so running the series
+    over unit impulses gives weights that reduce the latest value to a dot product.
+    """
+    macd, signal_line, _ = macd_series(np.eye(bars), fast, slow, signal)
+    return macd[:, -1].copy(), signal_line[:, -1].copy()
+
+def bollinger_series(close: np.ndarray, period: int = 20,
+                     num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Upper, middle, lower band and 0-1 band position for every bar"""
+    close = _as_matrix(close)
+    middle = _rolling_reduce(close, period, lambda w: w.mean(axis=-1))
+    std = _rolling_reduce(close, period, lambda w: w.std(axis=-1, ddof=1))
+    upper = middle + std * num_std
+    lower = middle - std * num_std
+    with np.errstate(divide='ignore', invalid='ignore'):
+        position = (close - lower) / (upper - lower)
+    return upper, middle, lower, position
+
+def score_signals(rsi: np.ndarray, histogram: np.ndarray, bb_position: np.ndarray,
+                  **thresholds) -> np.ndarray:
+    """Vectorized ``score_signal``: the clamped 0-100 composite score"""
+    t = dict(DEFAULT_THRESHOLDS, **thresholds)
+    score = np.full(np.shape(rsi), 50, dtype=np.int64)
+    score += np.where(rsi < t['rsi_oversold'], t['rsi_weight'],
+                      np.where(rsi > t['rsi_overbought'], -t['rsi_weight'], 0))
+    score += np.where(histogram > 0, t['macd_weight'], -t['macd_weight'])
+    score += np.where(bb_position < t['bb_low'], t['bb_weight'],
+                      np.where(bb_position > t['bb_high'], -t['bb_weight'], 0))
+    return np.clip(score, 0, 100)
+
+def classify_scores(score: np.ndarray, **thresholds) -> Tuple[np.ndarray, np.ndarray]:
+    """BUY/SELL/HOLD and STRONG/WEAK/NEUTRAL labels for an array of scores"""
+    t = dict(DEFAULT_THRESHOLDS, **thresholds)
+    signal = np.where(score > t['buy_above'], "BUY", np.where(score < t['sell_below'], "SELL", "HOLD"))
+    strength = np.where(
+        score > t['buy_above'], np.where(score > t['strong_buy_above'], "STRONG", "WEAK"),
+        np.where(score < t['sell_below'], np.where(score < t['strong_sell_below'], "STRONG", "WEAK"), "NEUTRAL")
+    )
+    return signal, strength
+
+def indicator_series(close: np.ndarray, rsi_period: int = 14, bb_period: int = 20, macd_fast: int = 12,
+                     macd_slow: int = 26, macd_signal: int = 9) -> Dict[str, np.ndarray]:
+    """The three scored indicators at every bar, rounded like the scalar functions"""
+    _, _, histogram = macd_series(close, macd_fast, macd_slow, macd_signal)
+    return {
+        'rsi': np.round(rsi_series(close, rsi_period), 2),
+        'macd_histogram': np.round(histogram, 5),
+        'bb_position': np.round(bollinger_series(close, bb_period)[3], 3)
+    }
+
+def score_series(close: np.ndarray, rsi_period: int = 14, bb_period: int = 20, macd_fast: int = 12,
+                 macd_slow: int = 26, macd_signal: int = 9, **thresholds) -> np.ndarray:
+    """Composite 0-100 score at every bar, as ``generate_signal`` would give on each prefix"""
+    indicators = indicator_series(close, rsi_period, bb_period, macd_fast, macd_slow, macd_signal)
+    return score_signals(indicators['rsi'], indicators['macd_histogram'], indicators['bb_position'], **thresholds)
+
+def batch_generate_signals(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                           rsi_period: int = 14, bb_period: int = 20, sr_window: int = 10,
+                           macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                           **thresholds) -> Dict[str, np.ndarray]:
+    """Score every instrument of an (instruments x bars) price matrix in one pass.
+
+    Returns per-instrument arrays for the latest bar, matching what
+    ``TechnicalAnalyzer.generate_signal`` computes for each row on its own.
+    """
+    close, high, low = _as_matrix(close), _as_matrix(high), _as_matrix(low)
+
+    # RSI and Bollinger only look back a window, so only the tail is needed;
+    # MACD reduces to a dot product with precomputed weights
+    rsi = np.round(rsi_series(close[:, -(rsi_period + 1):], rsi_period)[:, -1], 2)
+    history = close[:, -MACD_HISTORY:]
+    macd_weights, signal_weights = _macd_weights(history.shape[1], macd_fast, macd_slow, macd_signal)
+    macd_raw, signal_raw = history @ macd_weights, history @ signal_weights
+    macd, signal_line, histogram = np.round(macd_raw, 5), np.round(signal_raw, 5), np.round(macd_raw - signal_raw, 5)
+    upper, middle, lower, position = (s[:, -1] for s in bollinger_series(close[:, -bb_period:], bb_period))
+    position = np.round(position, 3)
+
+    current = close[:, -1]
+    resistance = high[:, -sr_window:].max(axis=1)
+    support = low[:, -sr_window:].min(axis=1)
+
+    score = score_signals(rsi, histogram, position, **thresholds)
+    signal, strength = classify_scores(score, **thresholds)
+    return {
+        'signal': signal,
+        'strength': strength,
+        'score': score,
+        'rsi': rsi,
+        'macd': macd,
+        'macd_signal': signal_line,
+        'macd_histogram': histogram,
+        'bb_upper': np.round(upper, 5),
+        'bb_middle': np.round(middle, 5),
+        'bb_lower': np.round(lower, 5),
+        'bb_position': position,
+        'support': np.round(support, 5),
+        'resistance': np.round(resistance, 5),
+        'current_vs_support': np.round((current - support) / support * 100, 2),
+        'current_vs_resistance': np.round((resistance - current) / current * 100, 2)
+    }
@@ -0,0 +1,65 @@
+"""Backtest the TechnicalAnalyzer scoring rules over stored candle history.
+
+    cd backend && python -m app.backtest EUR_USD --granularity M1 --start 2023-01-01
+    python -m app.backtest EUR_USD --sync 5000 --param buy_above=65 --param rsi_period=10
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.backtest.engine import backtest_instrument
+from app.storage.candle_store import CandleStore, candle_store
+
+def _to_ns(value: Optional[str]) -> Optional[int]:
+    return int(np.datetime64(value, "ns").astype(np.int64)) if value else None
+
+def _parse_params(pairs: List[str]) -> Dict[str, float]:
+    params = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"--param expects key=value, got {pair!r}")
+        params[key] = float(value)
+    return params
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.backtest", description=__doc__.splitlines()[0])
+    parser.add_argument("instrument")
+    parser.add_argument("--granularity", default="M1")
+    parser.add_argument("--start", help="ISO date/time of the first bar")
+    parser.add_argument("--end", help="ISO date/time of the last bar")
+    parser.add_argument("--units", type=float, default=1.0)
+    parser.add_argument("--exit-on-hold", action="store_true", help="go flat on HOLD instead of keeping the position")
+    parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="indicator period or scoring threshold override")
+    parser.add_argument("--store", help="candle store directory (default: CANDLE_STORE_DIR)")
+    parser.add_argument("--sync", type=int, metavar="COUNT",
+                        help="fetch the latest COUNT candles from OANDA into the store first")
+    args = parser.parse_args(argv)
+
+    store = CandleStore(args.store) if args.store else candle_store
+    if args.sync:
+        from app.clients.forex_client import ForexDataClient
+        written = ForexDataClient(candle_store=store).sync_candles(args.instrument, args.granularity, args.sync)
+        print(f"Synced {written} candles", file=sys.stderr)
+
+    started = time.perf_counter()
+    try:
+        result = backtest_instrument(
+            args.instrument, args.granularity, store=store,
+            start_ns=_to_ns(args.start), end_ns=_to_ns(args.end),
+            units=args.units, exit_on_hold=args.exit_on_hold, **_parse_params(args.param)
+        )
+    except ValueError as e:
+        print(f"Backtest failed: {e}", file=sys.stderr)
+        return 1
+    result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import numpy as np
+from typing import Any, Dict, Optional
+
+from app.analysis.vectorized import DEFAULT_THRESHOLDS, score_series
+from app.storage.candle_store import CandleStore, candle_store
+
+INDICATOR_DEFAULTS = {
+    'rsi_period': 14,
+    'bb_period': 20,
+    'macd_fast': 12,
+    'macd_slow': 26,
+    'macd_signal': 9
+}
+SECONDS_PER_YEAR = 365.25 * 86400
+
+def split_params(params: Dict[str, Any]):
+    """Separate indicator periods from scoring thresholds, rejecting unknown names"""
+    unknown = set(params) - set(INDICATOR_DEFAULTS) - set(DEFAULT_THRESHOLDS)
+    if unknown:
+        raise ValueError(f"Unknown strategy parameters: {', '.join(sorted(unknown))}")
+    indicators = {k: int(v) for k, v in params.items() if k in INDICATOR_DEFAULTS}
+    thresholds = {k: v for k, v in params.items() if k in DEFAULT_THRESHOLDS}
+    return indicators, thresholds
+
+def warmup_bars(rsi_period: int = 14, bb_period: int = 20, macd_slow: int = 26, **_) -> int:
+    """Bars before every indicator has a full window"""
+    return max(rsi_period + 1, bb_period, macd_slow)
+
+def positions_from_scores(score: np.ndarray, exit_on_hold: bool = False, warmup: int = 0,
+                          **thresholds) -> np.ndarray:
+    """Target position per bar: +1 after BUY, -1 after SELL, flat during warm-up.
+
+    HOLD keeps the previous position unless ``exit_on_hold`` is set, in which
+    case it goes flat.
+    """
+    t = dict(DEFAULT_THRESHOLDS, **thresholds)
+    target = np.where(score > t['buy_above'], 1, np.where(score < t['sell_below'], -1, 0)).astype(np.int8)
+    target[:warmup] = 0
+    if exit_on_hold:
+        return target
+    # Forward-fill the last non-zero signal without a Python loop
+    last_signal = np.where(target != 0, np.arange(len(target)), 0)
+    np.maximum.accumulate(last_signal, out=last_signal)
+    return target[last_signal]
+
+def simulate(columns: Dict[str, np.ndarray], target: np.ndarray, units: float = 1.0,
+             return_curves: bool = False) -> Dict[str, Any]:
+    """Fill target positions at the next bar's open (buy at ask, sell at bid) and score the result.
+
+    Returns are each bar's P&L over the starting notional. ``sharpe`` is
+    annualised: their mean over their standard deviation, times the square
+    root of ``bars_per_year`` (bars over the calendar years the data spans,
+    no risk-free rate).
+    """
+    times = np.asarray(columns["time"])
+    bid_o, ask_o = np.asarray(columns["bid_o"]), np.asarray(columns["ask_o"])
+    bid_c, ask_c = np.asarray(columns["bid_c"]), np.asarray(columns["ask_c"])
+    n = len(times)
+
+    # The signal forms at a bar's close, so the position changes at the next open
+    position = np.zeros(n)
+    position[1:] = target[:-1] * units
+    trade = np.diff(position, prepend=0.0)
+    fill = np.where(trade > 0, ask_o, bid_o)
+    cash = -np.cumsum(trade * fill)
+    # Open positions are marked at what closing them would fetch
+    mark = np.where(position > 0, bid_c, ask_c)
+    equity = cash + position * mark
+
+    notional = units * (bid_o[0] + ask_o[0]) / 2
+    pnl = np.diff(equity, prepend=0.0)
+    returns = pnl / notional
+    years = (times[-1] - times[0]) / 1e9 / SECONDS_PER_YEAR if n > 1 else 0.0
+    periods_per_year = (n - 1) / years if years > 0 else 0.0
+    volatility = returns.std()
+    drawdown = np.maximum.accumulate(np.maximum(equity, 0.0)) - equity
+
+    result = {
+        "bars": n,
+        "start": str(np.datetime64(int(times[0]), "ns")) if n else None,
+        "end": str(np.datetime64(int(times[-1]), "ns")) if n else None,
+        "total_pnl": round(float(equity[-1]), 6) if n else 0.0,
+        "total_return": round(float(equity[-1] / notional), 6) if n else 0.0,
+        "max_drawdown": round(float(drawdown.max()), 6) if n else 0.0,
+        "max_drawdown_pct": round(float(drawdown.max() / notional), 6) if n else 0.0,
+        "sharpe": round(float(returns.mean() / volatility * np.sqrt(periods_per_year)), 4) if volatility > 0 else 0.0,
+        "bars_per_year": round(float(periods_per_year), 2),
+        "trades": int(np.count_nonzero(trade)),
+        "exposure": round(float(np.count_nonzero(position) / n), 4) if n else 0.0,
+        "spread_cost": round(float((np.abs(trade) * (ask_o - bid_o) / 2).sum()), 6),
+        "final_position": float(position[-1]) if n else 0.0
+    }
+    if return_curves:
+        result["equity"] = equity
+        result["position"] = position
+    return result
+
+def run_backtest(columns: Dict[str, np.ndarray], units: float = 1.0, exit_on_hold: bool = False,
+                 return_curves: bool = False, **params) -> Dict[str, Any]:
+    """Replay the TechnicalAnalyzer scoring rules over candle columns in one vectorized pass.
+
+    ``params`` may override indicator periods (rsi_period, bb_period,
+    macd_fast, macd_slow, macd_signal) and any DEFAULT_THRESHOLDS entry.
+    """
+    if len(columns["time"]) < 2:
+        raise ValueError("Backtest needs at least two candles")
+    indicators, thresholds = split_params(params)
+    score = score_series(np.asarray(columns["bid_c"]), **indicators, **thresholds)[0]
+    target = positions_from_scores(score, exit_on_hold, warmup_bars(**dict(INDICATOR_DEFAULTS, **indicators)),
+                                   **thresholds)
+    result = simulate(columns, target, units, return_curves)
+    result["params"] = {**INDICATOR_DEFAULTS, **DEFAULT_THRESHOLDS, **indicators, **thresholds}
+    result["exit_on_hold"] = exit_on_hold
+    return result
+
+def backtest_instrument(instrument: str, granularity: str = "M1", store: CandleStore = candle_store,
+                        start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+                        **kwargs) -> Dict[str, Any]:
+    """Backtest over the stored candle history of one instrument/granularity"""
+    columns = store.read(instrument, granularity, start_ns=start_ns)
+    if end_ns is not None:
+        stop = int(np.searchsorted(columns["time"], end_ns, side="right"))
+        columns = {name: values[:stop] for name, values in columns.items()}
+    result = run_backtest(columns, **kwargs)
+    result["instrument"] = instrument
+    result["granularity"] = granularity
+    return result
@@ -0,0 +1,265 @@
+"""Grid / random search over signal parameters, spread across a process pool.
+
+The candle columns are copied once into shared memory and every worker maps
+them, so nothing but parameter sets and result rows crosses the process
+boundary. Parameter sets are grouped by their indicator periods and each
+worker caches RSI, MACD and Bollinger series, so sets that only differ in
+scoring thresholds never recompute an indicator.
+
+    cd backend && python -m app.backtest.optimizer EUR_USD --space rsi_period=10,14,21 \\
+        --space buy_above=55,60,65 --space sell_below=35,40,45 --workers 8
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analysis.vectorized import bollinger_series, macd_series, rsi_series, score_signals
+from app.backtest.engine import (INDICATOR_DEFAULTS, positions_from_scores, simulate,
+                                 split_params, warmup_bars)
+from app.storage.candle_store import CandleStore, candle_store
+
+# Columns the simulation reads; the rest of the store never leaves the parent
+SIM_COLUMNS = ["time", "bid_o", "ask_o", "bid_c", "ask_c"]
+
+# Search space used when none is given: the generate_signal constants and their neighbours
+DEFAULT_SPACE = {
+    'rsi_period': [10, 14, 21],
+    'bb_period': [14, 20, 30],
+    'rsi_oversold': [25, 30, 35],
+    'rsi_overbought': [65, 70, 75],
+    'buy_above': [55, 60, 65],
+    'sell_below': [35, 40, 45]
+}
+
+# Metrics where smaller is better
+ASCENDING_METRICS = {"max_drawdown", "max_drawdown_pct", "spread_cost"}
+
+# Worker-side state: column views onto the shared blocks, and the blocks themselves
+_columns: Dict[str, np.ndarray] = {}
+_blocks: List[shared_memory.SharedMemory] = []
+
+def parameter_grid(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the listed values"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+def random_parameters(space: Dict[str, Any], samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """``samples`` distinct draws; a value is either a list to pick from or a (low, high) range"""
+    rng = random.Random(seed)
+
+    def draw(values):
+        if isinstance(values, tuple):
+            low, high = values
+            return rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) else rng.uniform(low, high)
+        return rng.choice(list(values))
+
+    draws, seen = [], set()
+    for _ in range(samples * 20):
+        params = {name: draw(values) for name, values in space.items()}
+        key = tuple(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            draws.append(params)
+            if len(draws) == samples:
+                break
+    return draws
+
+def _share(columns: Dict[str, np.ndarray]) -> Tuple[List[shared_memory.SharedMemory], List[Tuple[str, str, str, int]]]:
+    blocks, descriptors = [], []
+    for name in SIM_COLUMNS:
+        values = np.asarray(columns[name])
+        block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+        blocks.append(block)
+        descriptors.append((name, block.name, values.dtype.str, len(values)))
+    return blocks, descriptors
+
+def _attach(descriptors: List[Tuple[str, str, str, int]]):
+    """Pool initializer: map the parent's shared column blocks"""
+    for name, block_name, dtype, length in descriptors:
+        # Pool workers share the parent's resource tracker, so the parent's unlink() settles it
+        block = shared_memory.SharedMemory(name=block_name)
+        _blocks.append(block)
+        _columns[name] = np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf)
+
+@lru_cache(maxsize=8)
+def _rsi(period: int) -> np.ndarray:
+    return np.round(rsi_series(_columns["bid_c"], period)[0], 2)
+
+@lru_cache(maxsize=8)
+def _macd_histogram(fast: int, slow: int, signal: int) -> np.ndarray:
+    return np.round(macd_series(_columns["bid_c"], fast, slow, signal)[2][0], 5)
+
+@lru_cache(maxsize=8)
+def _bb_position(period: int) -> np.ndarray:
+    return np.round(bollinger_series(_columns["bid_c"], period)[3][0], 3)
+
+def _clear_caches():
+    _rsi.cache_clear()
+    _macd_histogram.cache_clear()
+    _bb_position.cache_clear()
+
+def _evaluate(batch: List[Dict[str, Any]], units: float, exit_on_hold: bool) -> List[Dict[str, Any]]:
+    """Backtest each parameter set against the worker's shared columns"""
+    results = []
+    for params in batch:
+        indicators, thresholds = split_params(params)
+        p = dict(INDICATOR_DEFAULTS, **indicators)
+        score = score_signals(_rsi(p['rsi_period']),
+                              _macd_histogram(p['macd_fast'], p['macd_slow'], p['macd_signal']),
+                              _bb_position(p['bb_period']), **thresholds)
+        target = positions_from_scores(score, exit_on_hold, warmup_bars(**p), **thresholds)
+        result = simulate(_columns, target, units)
+        result["params"] = params
+        results.append(result)
+    return results
+
+def _batches(param_sets: List[Dict[str, Any]], workers: int) -> List[List[Dict[str, Any]]]:
+    """Split into ~4 batches per worker, keeping sets with the same indicator periods together"""
+    ordered = sorted(param_sets, key=lambda p: tuple(p.get(k, v) for k, v in INDICATOR_DEFAULTS.items()))
+    size = max(1, -(-len(ordered) // (workers * 4)))
+    return [ordered[i:i + size] for i in range(0, len(ordered), size)]
+
+def rank_results(results: List[Dict[str, Any]], metric: str = "sharpe") -> List[Dict[str, Any]]:
+    return sorted(results, key=lambda r: r[metric], reverse=metric not in ASCENDING_METRICS)
+
+def optimize(columns: Dict[str, np.ndarray], param_sets: List[Dict[str, Any]], workers: Optional[int] = None,
+             metric: str = "sharpe", units: float = 1.0, exit_on_hold: bool = False) -> Dict[str, Any]:
+    """Backtest every parameter set and rank them by ``metric``.
+
+    ``workers=1`` runs in this process (the serial baseline); otherwise a
+    process pool of ``workers`` (default: all cores) shares the columns.
+    """
+    if len(columns["time"]) < 2:
+        raise ValueError("Optimization needs at least two candles")
+    for params in param_sets:
+        split_params(params)  # fail fast on unknown names, before starting workers
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    if workers == 1:
+        _columns.update({name: np.asarray(columns[name]) for name in SIM_COLUMNS})
+        try:
+            results = _evaluate(param_sets, units, exit_on_hold)
+        finally:
+            _columns.clear()
+            _clear_caches()
+    else:
+        blocks, descriptors = _share(columns)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(descriptors,)) as pool:
+                futures = [pool.submit(_evaluate, batch, units, exit_on_hold)
+                           for batch in _batches(param_sets, workers)]
+                results = [result for future in futures for result in future.result()]
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    return {
+        "results": rank_results(results, metric),
+        "metric": metric,
+        "evaluations": len(results),
+        "workers": workers,
+        "bars": len(columns["time"]),
+        "elapsed_seconds": round(time.perf_counter() - started, 3)
+    }
+
+def measure_scaling(columns: Dict[str, np.ndarray], param_sets: List[Dict[str, Any]],
+                    worker_counts: Sequence[int], **kwargs) -> List[Dict[str, Any]]:
+    """Wall time of the same search at each worker count, relative to the first"""
+    rows = []
+    for workers in worker_counts:
+        elapsed = optimize(columns, param_sets, workers=workers, **kwargs)["elapsed_seconds"]
+        rows.append({"workers": workers, "elapsed_seconds": elapsed,
+                     "speedup": round(rows[0]["elapsed_seconds"] / elapsed, 2) if rows else 1.0})
+    return rows
+
+def format_table(results: List[Dict[str, Any]], top: int = 20) -> str:
+    """Ranked results as a fixed-width text table"""
+    if not results:
+        return "(no results)"
+    names = sorted({name for r in results[:top] for name in r["params"]})
+    header = ["rank", *names, "pnl", "sharpe", "max_dd", "trades"]
+    rows = [[str(i), *(f"{r['params'].get(n, ''):g}" for n in names), f"{r['total_pnl']:.5f}",
+             f"{r['sharpe']:.3f}", f"{r['max_drawdown']:.5f}", str(r['trades'])]
+            for i, r in enumerate(results[:top], 1)]
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    return "\n".join(" ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header] + rows)
+
+def _parse_space(specs: List[str]) -> Dict[str, Any]:
+    """key=v1,v2,v3 (values) or key=low:high (random-search range)"""
+    space = {}
+    for spec in specs:
+        key, sep, values = spec.partition("=")
+        if not sep:
+            raise SystemExit(f"--space expects key=values, got {spec!r}")
+        number = lambda v: int(v) if v.lstrip("-").isdigit() else float(v)
+        if ":" in values:
+            low, high = values.split(":", 1)
+            space[key] = (number(low), number(high))
+        else:
+            space[key] = [number(v) for v in values.split(",")]
+    return space
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.backtest.optimizer", description=__doc__.splitlines()[0])
+    parser.add_argument("instrument")
+    parser.add_argument("--granularity", default="M1")
+    parser.add_argument("--start", help="ISO date/time of the first bar")
+    parser.add_argument("--store", help="candle store directory (default: CANDLE_STORE_DIR)")
+    parser.add_argument("--space", action="append", default=[], metavar="KEY=V1,V2|LOW:HIGH",
+                        help="values to search for one parameter (default: DEFAULT_SPACE)")
+    parser.add_argument("--random", type=int, metavar="N", help="random search with N samples instead of the full grid")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, help="processes (default: all cores)")
+    parser.add_argument("--metric", default="sharpe")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--exit-on-hold", action="store_true")
+    parser.add_argument("--scaling", action="store_true", help="also time the search at 1, 2, 4... workers")
+    args = parser.parse_args(argv)
+
+    space = _parse_space(args.space) if args.space else DEFAULT_SPACE
+    if args.random:
+        param_sets = random_parameters(space, args.random, args.seed)
+    elif any(isinstance(values, tuple) for values in space.values()):
+        raise SystemExit("Ranges (low:high) need --random")
+    else:
+        param_sets = parameter_grid(space)
+
+    store = CandleStore(args.store) if args.store else candle_store
+    start_ns = int(np.datetime64(args.start, "ns").astype(np.int64)) if args.start else None
+    columns = store.read(args.instrument, args.granularity, start_ns=start_ns)
+    try:
+        report = optimize(columns, param_sets, workers=args.workers, metric=args.metric,
+                          exit_on_hold=args.exit_on_hold)
+    except ValueError as e:
+        print(f"Optimization failed: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{report['evaluations']} parameter sets over {report['bars']} bars "
+          f"on {report['workers']} workers in {report['elapsed_seconds']}s, ranked by {report['metric']}")
+    print(format_table(report["results"], args.top))
+
+    if args.scaling:
+        counts, cores = [1], os.cpu_count() or 1
+        while counts[-1] * 2 <= cores:
+            counts.append(counts[-1] * 2)
+        if counts[-1] != cores:
+            counts.append(cores)
+        print(f"\n{'workers':>7} {'seconds':>8} {'speedup':>8}")
+        for row in measure_scaling(columns, param_sets, counts, metric=args.metric, exit_on_hold=args.exit_on_hold):
+            print(f"{row['workers']:>7} {row['elapsed_seconds']:>8.2f} {row['speedup']:>7.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while a circuit is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit '{name}' is open, next probe in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one upstream endpoint.
+
+    Closed: calls go through and outcomes land in a rolling time window; once
+    the window holds ``min_calls`` and the failure rate reaches
+    ``failure_rate`` the circuit opens. Open: calls are rejected immediately
+    for ``open_seconds``. Half-open: up to ``half_open_probes`` trial calls go
+    through; a success closes the circuit, a failure opens it again.
+    """
+
+    def __init__(self, name: str, window: float = 30.0, min_calls: int = 5, failure_rate: float = 0.5,
+                 open_seconds: float = 15.0, half_open_probes: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self._state = CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()  # (time, failed)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opens = 0
+        self.rejected = 0
+        self.hedges = 0
+        self.retries = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN  # timed probe window
+            self._probes = 0
+        return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (self.clock() - self._opened_at))
+
+    def _prune(self, now: float):
+        while self._outcomes and self._outcomes[0][0] <= now - self.window:
+            _, failed = self._outcomes.popleft()
+            self._failures -= failed
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; in half-open this claims a probe slot"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def _open(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._probes = 0
+        self.opens += 1
+
+    def record_success(self):
+        now = self.clock()
+        if self.state == HALF_OPEN:
+            self._state = CLOSED
+            self._outcomes.clear()
+            self._failures = 0
+            self._probes = 0
+            return
+        self._outcomes.append((now, False))
+        self._prune(now)
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        now = self.clock()
+        if error is not None:
+            self.last_error = f"{type(error).__name__}: {error}"[:200]
+        state = self.state
+        if state == HALF_OPEN:
+            self._open(now)
+            return
+        if state == OPEN:
+            return  # a straggler from before the circuit opened
+        self._outcomes.append((now, True))
+        self._failures += 1
+        self._prune(now)
+        if len(self._outcomes) >= self.min_calls and self._failures / len(self._outcomes) >= self.failure_rate:
+            self._open(now)
+
+    def release(self):
+        """Give back a half-open probe slot whose call was cancelled without an outcome"""
+        self._probes = max(0, self._probes - 1)
+
+    async def _attempt(self, fn: Callable[[], Awaitable[Any]], hedge_after: Optional[float]) -> Any:
+        """One logical call: a single outcome is recorded however many hedged copies ran"""
+        try:
+            result = await self._hedged(fn, hedge_after)
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    async def _hedged(self, fn: Callable[[], Awaitable[Any]], hedge_after: Optional[float]) -> Any:
+        """Run ``fn``; if it is still pending after ``hedge_after`` seconds, race a second copy"""
+        if hedge_after is None:
+            return await fn()
+        first = asyncio.ensure_future(fn())
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if done or self.state != CLOSED:
+                return await first  # never hedge a half-open probe
+            self.hedges += 1
+            pending.add(asyncio.ensure_future(fn()))
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():  # exception() would raise CancelledError here
+                        error = error or asyncio.CancelledError()
+                        continue
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], retries: int = 0, hedge_after: Optional[float] = None,
+                   backoff: float = 0.1, max_backoff: float = 2.0) -> Any:
+        """Call ``fn`` through the breaker with hedging and jittered-backoff retries.
+
+        Raises CircuitOpenError without calling ``fn`` while the circuit is
+        open, including between retries, so callers can fall back at once.
+        """
+        for attempt in range(retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(random.uniform(0, min(max_backoff, backoff * 2 ** attempt)))  # full jitter
+            if not self.allow():
+                raise CircuitOpenError(self.name, self.retry_in())
+            try:
+                return await self._attempt(fn, hedge_after)
+            except Exception:
+                if attempt == retries:
+                    raise
+
+    def stats(self) -> Dict[str, Any]:
+        now = self.clock()
+        self._prune(now)
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "calls_in_window": calls,
+            "failures_in_window": self._failures,
+            "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+            "retry_in_seconds": round(self.retry_in(), 2),
+            "opens": self.opens,
+            "rejected": self.rejected,
+            "hedges": self.hedges,
+            "retries": self.retries,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,93 @@
+import httpx
+from typing import Optional, Dict, Any, List, Union
+
+from app.clients.gateway import NoAccountError, UpstreamGateway, gateway as default_gateway
+
+DEFAULT_STREAM_URL = "https://stream-fxpractice.oanda.com/v3"
+
+class AsyncOANDAClient:
+    """Asyncio-native OANDA client.
+
+    REST calls go through the upstream gateway (shared pool, rate limit and
+    priority lanes); only the long-lived pricing stream, which lives on a
+    separate host, keeps a connection of its own.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 account_id: Optional[str] = None, timeout: Union[float, httpx.Timeout] = 5.0,
+                 max_connections: int = 20, gateway: Optional[UpstreamGateway] = None):
+        self.gateway = gateway or default_gateway
+        self.api_key = api_key if api_key is not None else self.gateway.api_key
+        self.base_url = (base_url or self.gateway.base_url).rstrip("/")
+        self._account_id = account_id
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=30.0
+        )
+        self._session: Optional[httpx.AsyncClient] = None
+
+    @property
+    def account_id(self) -> Optional[str]:
+        """Explicit account id, else the gateway's cached one"""
+        return self._account_id or self.gateway.current_account_id()
+
+    async def _account_path(self, suffix: str) -> str:
+        """``accounts/<id>/<suffix>``, looking the id up if needed; NoAccountError without one"""
+        account_id = self._account_id or await self.gateway.get_account_id()
+        if account_id is None:
+            raise NoAccountError()
+        return f"accounts/{account_id}/{suffix}"
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """Lazily create the stream session so it binds to the running event loop"""
+        if self._session is None or self._session.is_closed:
+            self._session = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                timeout=self.timeout,
+                limits=self.limits
+            )
+        return self._session
+
+    async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                  lane: str = "interactive") -> httpx.Response:
+        """GET an endpoint relative to the REST base URL; transport errors propagate"""
+        return await self.gateway.request(endpoint, params, lane=lane)
+
+    async def get_accounts(self) -> httpx.Response:
+        return await self.get("accounts")
+
+    async def get_instruments(self) -> httpx.Response:
+        return await self.get(await self._account_path("instruments"))
+
+    async def get_pricing(self, instruments: List[str]) -> httpx.Response:
+        return await self.get(
+            await self._account_path("pricing"),
+            params={"instruments": ",".join(instruments)}
+        )
+
+    def stream_pricing(self, instruments: List[str]):
+        """Open the chunked pricing stream (newline-delimited JSON); use with ``async with``.
+
+        Only meaningful when ``base_url`` points at the streaming host.
+        Raises NoAccountError until the account id is known.
+        """
+        if self.account_id is None:
+            raise NoAccountError()
+        return self.session.stream(
+            "GET",
+            f"/accounts/{self.account_id}/pricing/stream",
+            params={"instruments": ",".join(instruments)}
+        )
+
+    async def aclose(self):
+        """Close the stream session (the gateway's pool is closed on application shutdown)"""
+        if self._session is not None and not self._session.is_closed:
+            await self._session.aclose()
+        self._session = None
@@ -0,0 +1,155 @@
+"""Decode OANDA bid/ask candle payloads straight into NumPy columns.
+
+The fast path works on the raw response bytes: OANDA emits compact JSON with
+a fixed key layout per candle, so every field can be located from the
+positions of the quote characters and converted with vectorized digit
+arithmetic, without building a Python object per candle. Payloads that do
+not match the expected layout fall back to a regular JSON decode.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional speed-up
+    _loads = json.loads
+
+PRICE_COLUMNS = ["bid_o", "bid_h", "bid_l", "bid_c", "ask_o", "ask_h", "ask_l", "ask_c"]
+
+# Quote pairs per candle in {"complete":..,"volume":..,"time":"..","bid":{"o":"..",..},"ask":{..}}
+_PAIRS_PER_CANDLE = 22
+# (pair index, first letter, key length) of every key, used to validate the layout
+_KEYS = [(0, b"c", 8), (1, b"v", 6), (2, b"t", 4), (4, b"b", 3), (5, b"o", 1), (7, b"h", 1),
+         (9, b"l", 1), (11, b"c", 1), (13, b"a", 3), (14, b"o", 1), (16, b"h", 1), (18, b"l", 1), (20, b"c", 1)]
+_PRICE_PAIRS = [6, 8, 10, 12, 15, 17, 19, 21]
+_TIME_PAIR = 3
+_POW10 = 10.0 ** np.arange(23)  # exact doubles
+
+def _empty_columns(n: int) -> Dict[str, np.ndarray]:
+    columns = {"time": np.empty(n, dtype=np.int64), "volume": np.empty(n, dtype=np.int64)}
+    for column in PRICE_COLUMNS:
+        columns[column] = np.empty(n, dtype=np.float64)
+    return columns
+
+def _parse_fixed_width(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                       allow_dot: bool) -> Optional[np.ndarray]:
+    """Vectorized float()/int() for plain numeric strings such as 1.08264; None if any is not one.
+
+    Fields are grouped by width (OANDA prints each instrument with a fixed
+    precision, so there are only a handful), and within a group every digit
+    column has a fixed place value, so the mantissa is one matrix product.
+    """
+    widths = ends - starts
+    if len(widths) == 0:
+        return np.empty(0)
+    if widths.min() < 1 or widths.max() > 15:
+        return None
+    values = np.empty(len(starts))
+    for width in np.flatnonzero(np.bincount(widths)):
+        rows = np.flatnonzero(widths == width)
+        chars = buf[starts[rows, np.newaxis] + np.arange(width)]
+        dot_columns = np.flatnonzero(chars[0] == 46) if allow_dot else np.empty(0, dtype=np.int64)
+        if len(dot_columns) > 1 or (len(dot_columns) and not (chars[:, dot_columns[0]] == 46).all()):
+            return None
+        digit_columns = np.setdiff1d(np.arange(width), dot_columns)
+        digits = chars[:, digit_columns] - np.uint8(48)
+        if len(digit_columns) == 0 or digits.max() > 9:  # non-digits wrap around past 9
+            return None
+        place_values = 10.0 ** np.arange(len(digit_columns) - 1, -1, -1)
+        decimals = width - 1 - dot_columns[0] if len(dot_columns) else 0
+        # mantissa < 2**53 is exact, and one division by an exact power of ten rounds like float()
+        values[rows] = (digits @ place_values) / _POW10[decimals]
+    return values
+
+def _parse_rfc3339_ns(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Optional[np.ndarray]:
+    """Epoch nanoseconds from YYYY-MM-DDTHH:MM:SS.nnnnnnnnnZ strings"""
+    if not (ends - starts == 30).all():
+        return None
+    chars = buf[starts[:, np.newaxis] + np.arange(30)].astype(np.int64)
+    separators = chars[:, [4, 7, 10, 13, 16, 19, 29]]
+    if not (separators == np.array([45, 45, 84, 58, 58, 46, 90])).all():  # - - T : : . Z
+        return None
+    digits = chars - 48
+
+    def number(first: int, last: int) -> np.ndarray:
+        value = np.zeros(len(starts), dtype=np.int64)
+        for column in range(first, last):
+            value = value * 10 + digits[:, column]
+        return value
+
+    year, month, day = number(0, 4), number(5, 7), number(8, 10)
+    # Days since 1970-01-01 from a civil date (H. Hinnant's algorithm)
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    days = era * 146097 + day_of_era - 719468
+    seconds = days * 86400 + number(11, 13) * 3600 + number(14, 16) * 60 + number(17, 19)
+    return seconds * 1_000_000_000 + number(20, 29)
+
+def _parse_fixed_layout(raw: bytes) -> Optional[Dict[str, np.ndarray]]:
+    start = raw.find(b'"candles":[')
+    end = raw.rfind(b"]")
+    if start < 0 or end < start:
+        return None
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    quotes = np.flatnonzero(buf[start + 11:end] == 34) + start + 11
+    if len(quotes) % (2 * _PAIRS_PER_CANDLE):
+        return None
+    pairs = quotes.reshape(-1, _PAIRS_PER_CANDLE, 2)
+    n = len(pairs)
+    if n == 0:
+        return _empty_columns(0)
+    if raw.count(b'"complete":', start, end) != n:
+        return None
+
+    opens, closes = pairs[:, :, 0], pairs[:, :, 1]
+    for pair, letter, length in _KEYS:
+        if not ((buf[opens[:, pair] + 1] == letter[0]) & (closes[:, pair] - opens[:, pair] - 1 == length)).all():
+            return None
+
+    flag = buf[closes[:, 0] + 2]
+    if not np.isin(flag, (ord("t"), ord("f"))).all():
+        return None
+    complete = flag == ord("t")
+
+    volume = _parse_fixed_width(buf, closes[:, 1] + 2, opens[:, 2] - 1, allow_dot=False)  # between ": and ,
+    times = _parse_rfc3339_ns(buf, opens[:, _TIME_PAIR] + 1, closes[:, _TIME_PAIR])
+    price_pairs = np.array(_PRICE_PAIRS)
+    prices = _parse_fixed_width(buf, (opens[:, price_pairs] + 1).ravel(), closes[:, price_pairs].ravel(), allow_dot=True)
+    if volume is None or times is None or prices is None:
+        return None
+    prices = prices.reshape(n, len(_PRICE_PAIRS))
+
+    columns = _empty_columns(int(complete.sum()))
+    columns["time"][:] = times[complete]
+    columns["volume"][:] = volume[complete]  # float64 holds these integers exactly
+    for i, column in enumerate(PRICE_COLUMNS):
+        columns[column][:] = prices[complete, i]
+    return columns
+
+def columns_from_candles(candles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Columns of complete candles from already-decoded JSON (the general path)"""
+    complete = [c for c in candles if c['complete']]
+    n = len(complete)
+    columns = _empty_columns(n)
+    columns["time"][:] = np.array([c['time'].rstrip('Z') for c in complete], dtype="datetime64[ns]").view(np.int64)
+    columns["volume"][:] = np.fromiter((c['volume'] for c in complete), dtype=np.int64, count=n)
+    prices = np.array(
+        [c[side][field] for c in complete for side in ('bid', 'ask') for field in ('o', 'h', 'l', 'c')],
+        dtype=np.float64
+    ).reshape(n, len(PRICE_COLUMNS))
+    for i, column in enumerate(PRICE_COLUMNS):
+        columns[column][:] = prices[:, i]
+    return columns
+
+def parse_candles(raw: bytes) -> Dict[str, np.ndarray]:
+    """Complete candles of a ``price=BA`` candles response as NumPy columns"""
+    columns = _parse_fixed_layout(raw)
+    if columns is None:
+        columns = columns_from_candles(_loads(raw).get('candles', []))
+    return columns
@@ -1,48 +1,166 @@
 import os
-import requests
+import time
+import httpx
+import numpy as np
 import pandas as pd
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+from app.circuit_breaker import CircuitBreaker
+from app.tracing import span
+from app.clients.candle_parser import parse_candles, columns_from_candles
+from app.clients.gateway import UpstreamGateway, gateway as default_gateway
+from app.storage.candle_store import GRANULARITY_SECONDS, CandleStore, candle_store, columns_to_frame
+from app.storage.timeframes import (
+    ALIGNMENT_TIMEZONE, DAILY_ALIGNMENT, TimeframeAggregator, check_timeframes, timeframe_aggregator
+)
+
+MAX_CANDLES_PER_REQUEST = 5000  # OANDA's limit for the candles endpoint
+
+class HistoryPending(Exception):
+    """The base history needs more than one candles request; fetch it off the request path"""
+
+    def __init__(self, instrument: str, granularity: str, count: int):
+        super().__init__(f"Backfilling {count} {granularity} candles for {instrument}")
+        self.instrument = instrument
+        self.granularity = granularity
+        self.count = count
 
 class ForexDataClient:
-    def __init__(self):
-        self.api_key = os.getenv('OANDA_API_KEY')
-        self.base_url = "https://api-fxpractice.oanda.com/v3"
-        self.account_id = "101-001-36257109-001"  # Your working account ID
-        
-    def _make_request(self, endpoint: str) -> Optional[Dict[str, Any]]:
-        """Make authenticated requests to OANDA API"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+    def __init__(self, candle_store: Optional[CandleStore] = None, fast_parse: bool = True,
+                 aggregator: Optional[TimeframeAggregator] = None, gateway: Optional[UpstreamGateway] = None,
+                 max_history: int = 50000):
+        self.gateway = gateway or default_gateway  # shared pool and rate limit; candles use the bulk lane
+        self.candle_store = candle_store
+        self.fast_parse = fast_parse  # decode candles straight from bytes into NumPy columns
+        self.aggregator = aggregator if aggregator is not None else timeframe_aggregator
+        self.timeout = 10
+        self.breaker = CircuitBreaker("candles")  # skip upstream at once while OANDA is failing
+        self.max_history = max_history  # base candles one multi-timeframe call may need
         
-        url = f"{self.base_url}/{endpoint}"
+    @property
+    def account_id(self) -> Optional[str]:
+        return self.gateway.get_account_id_sync()
+
+    def _make_request(self, endpoint: str, raw: bool = False, lane: str = "bulk") -> Optional[Any]:
+        """Make authenticated requests to OANDA API through the gateway (raw=True returns the body bytes)"""
+        if not self.gateway.api_key:
+            print(f"OANDA_API_KEY not set, skipping {endpoint.split('?')[0]}")
+            return None
+        if not self.breaker.allow():
+            print(f"OANDA circuit open, skipping {endpoint} for {self.breaker.retry_in():.1f}s")
+            return None
         try:
-            response = requests.get(url, headers=headers)
+            response = self.gateway.request_sync(endpoint, lane=lane, timeout=self.timeout)
+            if response.status_code >= 500 or response.status_code == 429:
+                self.breaker.record_failure(httpx.HTTPError(f"{response.status_code} from OANDA"))
+            else:
+                self.breaker.record_success()
             if response.status_code == 200:
-                return response.json()
+                return response.content if raw else response.json()
             else:
                 print(f"OANDA API Error: {response.status_code} - {response.text}")
                 return None
         except Exception as e:
+            self.breaker.record_failure(e)
             print(f"Request failed: {e}")
             return None
     
     def get_instruments(self) -> List[str]:
         """Get available Forex instruments"""
-        response = self._make_request(f"accounts/{self.account_id}/instruments")
+        account_id = self.account_id
+        if account_id is None:
+            print("No OANDA account id: set OANDA_ACCOUNT_ID")
+            return []
+        response = self._make_request(f"accounts/{account_id}/instruments")
         if response and 'instruments' in response:
             return [inst['name'] for inst in response['instruments']]
         return []
     
     def get_live_prices(self, instruments: List[str]) -> Dict[str, Any]:
         """Get live prices for specified instruments"""
+        account_id = self.account_id
+        if account_id is None:
+            print("No OANDA account id: set OANDA_ACCOUNT_ID")
+            return {}
         instr_str = ",".join(instruments)
-        response = self._make_request(f"accounts/{self.account_id}/pricing?instruments={instr_str}")
+        response = self._make_request(f"accounts/{account_id}/pricing?instruments={instr_str}", lane="interactive")
         return response or {}
     
-    def get_historical_data(self, instrument: str, count: int = 100, granularity: str = "H1") -> pd.DataFrame:
-        """Get historical OHLC data for technical analysis"""
+    def fetch_candles(self, instrument: str, granularity: str = "H1", count: int = 100,
+                      from_ns: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Fetch complete bid/ask candles as columns, optionally starting at ``from_ns``"""
+        endpoint = (
+            f"instruments/{instrument}/candles"
+            f"?count={min(count, MAX_CANDLES_PER_REQUEST)}&granularity={granularity}&price=BA"
+            f"&dailyAlignment={DAILY_ALIGNMENT}&alignmentTimezone={ALIGNMENT_TIMEZONE}"  # same clock as resampling
+        )
+        if from_ns is not None:
+            endpoint += f"&from={np.datetime_as_string(np.datetime64(from_ns, 'ns'))}Z"
+        if self.fast_parse:
+            with span("fetch"):
+                body = self._make_request(endpoint, raw=True)
+            with span("parse"):
+                return parse_candles(body) if body else None
+        with span("fetch"):
+            response = self._make_request(endpoint)  # JSON decode happens here on this path
+        with span("parse"):
+            if response and 'candles' in response:
+                return columns_from_candles(response['candles'])
+        return None
+
+    def sync_candles(self, instrument: str, granularity: str = "H1", count: int = 100) -> int:
+        """Bring the candle store up to date, fetching only candles after the last stored one"""
+        store = self.candle_store
+        if store.is_current(instrument, granularity, time.time_ns()) and store.length(instrument, granularity) >= count:
+            return 0  # No newer candle can have closed yet
+        
+        written = 0
+        if store.length(instrument, granularity) < count:
+            # Not enough history stored to extend forward from: rebuild from the latest `count`
+            if count < MAX_CANDLES_PER_REQUEST:
+                columns = self.fetch_candles(instrument, granularity, count + 1)  # newest may be incomplete
+                if not columns or len(columns["time"]) == 0:
+                    return 0
+                return store.replace(instrument, granularity, columns)
+            # More than one request holds: start far enough back (markets close at weekends) and page forward
+            period_ns = GRANULARITY_SECONDS.get(granularity, 3600) * 1_000_000_000
+            columns = self.fetch_candles(instrument, granularity, MAX_CANDLES_PER_REQUEST,
+                                         from_ns=time.time_ns() - int(count * 1.4) * period_ns)
+            if not columns or len(columns["time"]) == 0:
+                return 0
+            written = store.replace(instrument, granularity, columns)
+        
+        while True:
+            columns = self.fetch_candles(instrument, granularity, MAX_CANDLES_PER_REQUEST,
+                                         from_ns=store.last_time(instrument, granularity))
+            if not columns:
+                return written
+            appended = store.append(instrument, granularity, columns)
+            written += appended
+            if appended == 0 or len(columns["time"]) < MAX_CANDLES_PER_REQUEST - 1:
+                return written
+
+    def get_historical_data(self, instrument: str, count: int = 100, granularity: str = "H1",
+                            as_arrays: bool = False) -> Union[pd.DataFrame, Dict[str, np.ndarray]]:
+        """Get historical OHLC data for technical analysis.
+
+        as_arrays=True returns the bid/ask/volume/time NumPy columns instead of
+        a bid OHLC DataFrame.
+        """
+        if self.candle_store is not None:
+            self.sync_candles(instrument, granularity, count)
+            if as_arrays:
+                return self.candle_store.read(instrument, granularity, last=count)
+            with span("frame"):
+                return self.candle_store.to_frame(instrument, granularity, last=count)
+        
+        if self.fast_parse or as_arrays:
+            columns = self.fetch_candles(instrument, granularity, count)
+            if as_arrays:
+                return columns or {}
+            with span("frame"):
+                return columns_to_frame(columns) if columns else pd.DataFrame()
+        
         response = self._make_request(
             f"instruments/{instrument}/candles"
             f"?count={count}&granularity={granularity}&price=BA"
@@ -64,5 +182,48 @@ class ForexDataClient:
             return pd.DataFrame(data)
         return pd.DataFrame()
 
-# Global instance
-forex_client = ForexDataClient()
+    def needs_backfill(self, instrument: str, granularity: str, count: int) -> bool:
+        """True when bringing ``count`` stored candles up to date takes more than one request"""
+        store = self.candle_store
+        if store.length(instrument, granularity) < count:
+            return count >= MAX_CANDLES_PER_REQUEST
+        period_ns = GRANULARITY_SECONDS.get(granularity, 3600) * 1_000_000_000
+        return (time.time_ns() - store.last_time(instrument, granularity)) // period_ns >= MAX_CANDLES_PER_REQUEST
+
+    def base_history(self, timeframes: List[str], bars: int, base: Optional[str] = None) -> Tuple[str, int]:
+        """The base granularity and how many of its candles ``bars`` of every timeframe need"""
+        base = base or min(timeframes, key=lambda t: GRANULARITY_SECONDS.get(t, 0))
+        check_timeframes(base, timeframes)
+        ratio = max(GRANULARITY_SECONDS[t] for t in timeframes) // GRANULARITY_SECONDS[base]
+        if bars * ratio > self.max_history:
+            raise ValueError(f"{bars} bars of {', '.join(timeframes)} need {bars * ratio} {base} candles "
+                             f"(at most {self.max_history}); ask for fewer bars or a larger base timeframe")
+        return base, bars * ratio
+
+    def get_timeframes(self, instrument: str, timeframes: List[str], bars: int = 100,
+                       base: Optional[str] = None, backfill: bool = True) -> Dict[str, pd.DataFrame]:
+        """Bid OHLC frames of the last ``bars`` candles per timeframe, from one base download.
+
+        Only the base granularity (the smallest timeframe unless given) is
+        fetched and stored; higher timeframes are resampled from it and kept
+        up to date incrementally. With backfill=False, history that needs
+        paging raises HistoryPending instead of being fetched here.
+        """
+        if self.candle_store is None:
+            raise ValueError("Multi-timeframe data needs a candle store")
+        base, count = self.base_history(timeframes, bars, base)
+        if not backfill and self.needs_backfill(instrument, base, count):
+            raise HistoryPending(instrument, base, count)
+        self.sync_candles(instrument, base, count)
+        history = self.candle_store.read(instrument, base)
+        frames = {}
+        for timeframe in timeframes:
+            with span("resample"):
+                columns = self.aggregator.update(instrument, base, timeframe, history)
+            with span("frame"):
+                frames[timeframe] = columns_to_frame({c: v[-bars:] for c, v in columns.items()})
+        return frames
+
+# Global instance, backed by the on-disk candle store
+forex_client = ForexDataClient(candle_store=candle_store,
+                               max_history=int(os.getenv("CANDLE_MAX_HISTORY", "50000")))
@@ -0,0 +1,300 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+import httpx
+
+from app.monitoring import monitor
+
+DEFAULT_BASE_URL = "https://api-fxpractice.oanda.com/v3"
+LANES = ("interactive", "bulk")
+
+class NoAccountError(Exception):
+    """Raised instead of calling an account endpoint while no account id is known"""
+
+    def __init__(self):
+        super().__init__("No OANDA account id: set OANDA_ACCOUNT_ID or use an API key that can list accounts")
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens a second, at most ``burst`` banked.
+
+    After ``share(shared_state)`` the tokens live in the shared state file,
+    so every worker of the deployment draws from the same bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self.shared = None  # SharedState holding the bucket, if any
+        self._lock = threading.Lock()
+
+    def share(self, shared_state):
+        """Draw from ``shared_state``'s bucket from now on (None: back to this process's own)"""
+        with self._lock:
+            self.shared = shared_state
+
+    def _take(self, reserve: float) -> float:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0 + reserve:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 + reserve - self.tokens) / self.rate
+
+    def try_take(self, reserve: float = 0.0) -> float:
+        """Take a token if at least ``reserve`` would be left; else seconds until one would be"""
+        with self._lock:
+            if self.shared is None:
+                return self._take(reserve)
+            with self.shared.locked_bucket() as state:
+                self.tokens, self.updated = state  # a fresh file reads (0, 0): refills to a full burst
+                wait = self._take(reserve)
+                state[0], state[1] = self.tokens, self.updated
+            return wait
+
+class UpstreamGateway:
+    """The one way out to the OANDA REST API.
+
+    Every client's requests share one keep-alive connection pool and one
+    token bucket (one per deployment when shared across workers).
+    Requests travel in two lanes: ``interactive`` (prices for a waiting
+    user) may spend every token, while ``bulk`` (candle backfills) only
+    spends tokens above ``bulk_reserve`` and yields while interactive
+    requests are waiting, so a long backfill never delays a price. The
+    account id is looked up once and cached; callers arriving during the
+    lookup wait for it.
+
+    Blocking callers (the candle client runs in worker threads) are handed
+    to the event loop that owns the async pool; without a running loop, as
+    in the backtest CLI, they use a blocking pool of their own.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 account_id: Optional[str] = None, rate: float = 100.0, burst: Optional[float] = None,
+                 bulk_reserve: float = 0.25, timeout: Union[float, httpx.Timeout] = 5.0,
+                 max_connections: int = 20):
+        self.api_key = api_key if api_key is not None else os.getenv('OANDA_API_KEY')
+        self.base_url = (base_url or os.getenv('OANDA_BASE_URL') or DEFAULT_BASE_URL).rstrip("/")
+        self.account_id = account_id
+        self.bucket = TokenBucket(rate, burst or rate)
+        self.bulk_reserve = bulk_reserve * self.bucket.burst  # tokens only interactive requests may spend
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=30.0
+        )
+        self.waiting = {lane: 0 for lane in LANES}
+        self.requests = {lane: 0 for lane in LANES}
+        self.throttled = {lane: 0 for lane in LANES}
+        self.wait_seconds = {lane: 0.0 for lane in LANES}
+        self.account_lookups = 0
+        self.lookup_retry = 30.0
+        self._next_lookup = 0.0  # after a failed lookup, none before this
+        self._lookup: Optional[asyncio.Future] = None  # the lookup in flight, awaited by every caller
+        self._sync_lookup = threading.Lock()
+        self._session: Optional[httpx.AsyncClient] = None
+        self._sync_session: Optional[httpx.Client] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """The shared pool, created lazily so it binds to the running event loop"""
+        if self._session is None or self._session.is_closed:
+            self._session = httpx.AsyncClient(base_url=self.base_url, headers=self.headers,
+                                              timeout=self.timeout, limits=self.limits)
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+        return self._session
+
+    @property
+    def sync_session(self) -> httpx.Client:
+        if self._sync_session is None or self._sync_session.is_closed:
+            self._sync_session = httpx.Client(base_url=self.base_url, headers=self.headers,
+                                              timeout=self.timeout, limits=self.limits)
+        return self._sync_session
+
+    def _next_wait(self, lane: str) -> float:
+        """0.0 once a token is taken for ``lane``, else how long to wait before asking again"""
+        if lane == "bulk":
+            if self.waiting["interactive"]:
+                return 1.0 / self.bucket.rate
+            return self.bucket.try_take(self.bulk_reserve)
+        return self.bucket.try_take()
+
+    def _enter(self, lane: str):
+        if lane not in LANES:
+            raise ValueError(f"lane must be one of {', '.join(LANES)}")
+        with self._lock:
+            self.waiting[lane] += 1
+
+    def _leave(self, lane: str, started: Optional[float]):
+        """``started`` is when the request first had to wait, None if it never did"""
+        with self._lock:
+            self.waiting[lane] -= 1
+            self.requests[lane] += 1
+            if started is not None:
+                self.wait_seconds[lane] += time.monotonic() - started
+                self.throttled[lane] += 1
+
+    async def acquire(self, lane: str = "interactive"):
+        """Wait for a token in ``lane``"""
+        self._enter(lane)
+        started = None
+        try:
+            while True:
+                wait = self._next_wait(lane)
+                if wait == 0.0:
+                    break
+                started = started or time.monotonic()
+                await asyncio.sleep(wait)
+        finally:
+            self._leave(lane, started)
+
+    def acquire_sync(self, lane: str = "bulk"):
+        self._enter(lane)
+        started = None
+        try:
+            while True:
+                wait = self._next_wait(lane)
+                if wait == 0.0:
+                    break
+                started = started or time.monotonic()
+                time.sleep(wait)
+        finally:
+            self._leave(lane, started)
+
+    @staticmethod
+    def _label(endpoint: str) -> str:
+        return endpoint.split("?")[0].rstrip("/").rsplit("/", 1)[-1]  # e.g. "pricing", without account ids
+
+    async def request(self, endpoint: str, params: Optional[Dict[str, Any]] = None, lane: str = "interactive",
+                      timeout: Optional[float] = None) -> httpx.Response:
+        """GET an endpoint relative to the base URL once a token is granted; transport errors propagate"""
+        await self.acquire(lane)
+        started = time.perf_counter()
+        label = self._label(endpoint)
+        try:
+            response = await self.session.get(f"/{endpoint.lstrip('/')}", params=params,
+                                              timeout=timeout or self.timeout)
+        except Exception:
+            monitor.observe_upstream("oanda", label, time.perf_counter() - started, error=True)
+            raise
+        monitor.observe_upstream("oanda", label, time.perf_counter() - started, error=response.status_code >= 400)
+        return response
+
+    def request_sync(self, endpoint: str, params: Optional[Dict[str, Any]] = None, lane: str = "bulk",
+                     timeout: Optional[float] = None) -> httpx.Response:
+        """Blocking ``request`` for worker threads and scripts"""
+        loop = self._loop
+        if loop is not None and loop.is_running() and threading.get_ident() != self._loop_thread:
+            # Same pool, same bucket: run it on the loop that owns them
+            return asyncio.run_coroutine_threadsafe(self.request(endpoint, params, lane, timeout), loop).result()
+        self.acquire_sync(lane)
+        started = time.perf_counter()
+        label = self._label(endpoint)
+        try:
+            response = self.sync_session.get(f"/{endpoint.lstrip('/')}", params=params, timeout=timeout or self.timeout)
+        except Exception:
+            monitor.observe_upstream("oanda", label, time.perf_counter() - started, error=True)
+            raise
+        monitor.observe_upstream("oanda", label, time.perf_counter() - started, error=response.status_code >= 400)
+        return response
+
+    def _should_look_up(self) -> bool:
+        return self.account_id is None and bool(self.api_key) and time.monotonic() >= self._next_lookup
+
+    def _remember_account(self, response: httpx.Response) -> Optional[str]:
+        accounts = response.json().get("accounts") if response.status_code == 200 else None
+        if accounts:
+            self.account_id = accounts[0]["id"]
+        else:
+            print(f"OANDA account lookup found no account ({response.status_code})")
+        return self.account_id
+
+    def _lookup_done(self):
+        self._lookup = None
+        if self.account_id is None:
+            self._next_lookup = time.monotonic() + self.lookup_retry
+
+    async def _look_up_account(self):
+        try:
+            self._remember_account(await self.request("accounts"))
+        except httpx.HTTPError as e:
+            print(f"OANDA account lookup failed: {e}")
+        finally:
+            self._lookup_done()
+
+    async def get_account_id(self) -> Optional[str]:
+        """The account id: configured, else looked up from /accounts (retried every ``lookup_retry`` s)"""
+        if self._lookup is None and self._should_look_up():
+            self.account_lookups += 1
+            self._lookup = asyncio.ensure_future(self._look_up_account())
+        if self._lookup is not None:
+            # shield: a cancelled caller must not cancel the lookup the others wait for
+            await asyncio.shield(self._lookup)
+        return self.current_account_id()
+
+    def get_account_id_sync(self) -> Optional[str]:
+        loop = self._loop
+        if loop is not None and loop.is_running() and threading.get_ident() != self._loop_thread:
+            # join the event loop's lookup rather than racing it
+            return asyncio.run_coroutine_threadsafe(self.get_account_id(), loop).result()
+        with self._sync_lookup:
+            if self._should_look_up():
+                self.account_lookups += 1
+                try:
+                    self._remember_account(self.request_sync("accounts", lane="interactive"))
+                except httpx.HTTPError as e:
+                    print(f"OANDA account lookup failed: {e}")
+                finally:
+                    self._lookup_done()
+        return self.current_account_id()
+
+    def current_account_id(self) -> Optional[str]:
+        """Cached account id; None until configured or looked up"""
+        return self.account_id
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_second": self.bucket.rate,
+            "burst": self.bucket.burst,
+            "bulk_reserve_tokens": self.bulk_reserve,
+            "tokens": round(self.bucket.tokens, 2),
+            "waiting": dict(self.waiting),
+            "requests": dict(self.requests),
+            "throttled": dict(self.throttled),
+            "wait_seconds": {lane: round(seconds, 3) for lane, seconds in self.wait_seconds.items()},
+            "account_id_cached": self.account_id is not None,
+            "account_lookups": self.account_lookups
+        }
+
+    async def aclose(self):
+        """Close the pools (called on application shutdown)"""
+        if self._session is not None and not self._session.is_closed:
+            await self._session.aclose()
+        self._session = None
+        self._loop = self._loop_thread = None
+        if self._sync_session is not None:
+            self._sync_session.close()
+        self._sync_session = None
+
+# Global gateway shared by every OANDA client
+gateway = UpstreamGateway(
+    account_id=os.getenv("OANDA_ACCOUNT_ID") or None,
+    rate=float(os.getenv("OANDA_RATE_LIMIT", "100")),
+    burst=float(os.getenv("OANDA_RATE_BURST", "0")) or None,
+    bulk_reserve=float(os.getenv("OANDA_BULK_RESERVE", "0.25"))
+)
@@ -1,70 +1,196 @@
+import asyncio
 import os
-import requests
-from typing import Optional, Dict, Any, List
+import time
+import httpx
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 
+from app.analysis.sentiment import CURRENCY_TERMS, NewsCorpus
+from app.monitoring import monitor
+
+# One broad query covering every currency, so a single fetch feeds all of them
+DEFAULT_QUERY = "forex OR currency OR " + " OR ".join(
+    f'"{term}"' if " " in term else term
+    for terms in CURRENCY_TERMS.values() for term in terms
+)
+
 class NewsAPIClient:
-    def __init__(self):
+    """Async NewsAPI client with a cached, indexed corpus of the last day's articles.
+
+    The corpus refreshes at most once per ``ttl`` seconds (concurrent callers
+    share the refresh) and each refresh only asks for articles newer than the
+    newest one already held, revalidating with ETag/Last-Modified when the
+    server sends them. Results come newest first, so a refresh pages back
+    until it meets the articles it already has; when ``max_pages`` runs out
+    first, the stretch it could not reach is remembered as a gap and fetched
+    (bounded with ``to``) on the following refreshes.
+    """
+
+    def __init__(self, query: str = DEFAULT_QUERY, ttl: float = 300.0, page_size: int = 100,
+                 max_pages: int = 5):
         self.api_key = os.getenv('NEWSAPI_KEY')
-        self.base_url = "https://newsapi.org/v2"
-        
-    def _make_request(self, endpoint: str, params: Dict[str, str] = None) -> Optional[Dict[str, Any]]:
-        """Helper method to make requests to NewsAPI"""
-        if params is None:
-            params = {}
-            
-        params['apiKey'] = self.api_key
-        
+        self.base_url = os.getenv('NEWSAPI_BASE_URL', "https://newsapi.org/v2")
+        self.query = query
+        self.ttl = ttl
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.corpus = NewsCorpus()
+        self.refreshed_at = 0.0
+        self.refreshes = 0
+        self.not_modified = 0
+        self.truncated = 0
+        self.gap: Optional[Tuple[Optional[str], str]] = None  # (after, up to) publishedAt not fetched yet
+        self.last_error: Optional[str] = None
+        self._validators: Dict[str, str] = {}
+        self._refresh: Optional[asyncio.Future] = None
+        self._session: Optional[httpx.AsyncClient] = None
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        if self._session is None or self._session.is_closed:
+            self._session = httpx.AsyncClient(base_url=self.base_url, timeout=10.0)
+        return self._session
+
+    async def _make_request(self, endpoint: str, params: Dict[str, str] = None,
+                            headers: Dict[str, str] = None) -> Optional[httpx.Response]:
+        """GET a NewsAPI endpoint; None on transport or HTTP errors (304 is returned)"""
+        params = dict(params or {}, apiKey=self.api_key)
+        started = time.perf_counter()
         try:
-            response = requests.get(f"{self.base_url}/{endpoint}", params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"NewsAPI Error: {e}")
+            response = await self.session.get(f"/{endpoint}", params=params, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            monitor.observe_upstream("newsapi", endpoint, time.perf_counter() - started)
+            return response
+        except httpx.HTTPError as e:
+            monitor.observe_upstream("newsapi", endpoint, time.perf_counter() - started, error=True)
+            self.last_error = str(e).splitlines()[0] if str(e) else type(e).__name__
+            print(f"NewsAPI Error: {self.last_error}")
             return None
-    
-    async def get_forex_news(self, query: str = "forex OR currency OR EUR USD OR Federal Reserve"):
-        """Get recent news articles related to Forex markets"""
-        # Get news from last 24 hours
-        from_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        
+
+    async def get_forex_news(self, query: str = "forex OR currency OR EUR USD OR Federal Reserve",
+                             since: Optional[str] = None, headers: Dict[str, str] = None,
+                             until: Optional[str] = None, page: int = 1) -> Optional[Dict[str, Any]]:
+        """One page of recent articles for ``query``, newest first (last 24 hours unless ``since`` is given)"""
         params = {
             'q': query,
-            'from': from_date,
+            'from': since or (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
             'sortBy': 'publishedAt',
-            'language': 'en'
+            'language': 'en',
+            'pageSize': str(self.page_size),
+            'page': str(page)
         }
-        
-        return self._make_request("everything", params)
-    
+        if until:
+            params['to'] = until
+        response = await self._make_request("everything", params, headers)
+        if response is None:
+            return None
+        if response.status_code == 304:
+            return {"status": "not_modified", "articles": []}
+        if page > 1 or until:
+            return response.json()  # validators describe the first page of the plain query only
+        self._validators = {
+            header: response.headers[source]
+            for header, source in (("If-None-Match", "etag"), ("If-Modified-Since", "last-modified"))
+            if source in response.headers
+        }
+        return response.json()
+
+    async def _fetch_pages(self, since: Optional[str], until: Optional[str] = None,
+                           headers: Dict[str, str] = None) -> Optional[Dict[str, Any]]:
+        """Index pages newest first until one reaches ``since`` or the results end.
+
+        Returns whether it got that far, the oldest publishedAt seen and
+        whether the server answered 304; None when the first page failed.
+        """
+        oldest = until
+        for page in range(1, self.max_pages + 1):
+            data = await self.get_forex_news(self.query, since=since, headers=headers if page == 1 else None,
+                                             until=until, page=page)
+            if data is None:
+                return None if page == 1 else {"complete": False, "oldest": oldest, "not_modified": False}
+            if data.get("status") == "not_modified":
+                return {"complete": True, "oldest": oldest, "not_modified": True}
+            articles = data.get("articles") or []
+            self.corpus.add(articles)
+            oldest = min([a["publishedAt"] for a in articles if a.get("publishedAt")] + ([oldest] if oldest else []),
+                         default=None)
+            if (len(articles) < self.page_size or page * self.page_size >= data.get("totalResults", 0)
+                    or (since is not None and oldest is not None and oldest <= since)):
+                return {"complete": True, "oldest": oldest, "not_modified": False}
+        return {"complete": False, "oldest": oldest, "not_modified": False}
+
+    async def _do_refresh(self):
+        # Ask only for what is newer than the newest article already indexed
+        since = self.corpus.newest_published
+        result = await self._fetch_pages(since, headers=self._validators if len(self.corpus) else None)
+        if result is None:
+            self.corpus.prune()
+            return  # keep serving the old corpus; retry after the next TTL
+        if result["not_modified"]:
+            self.not_modified += 1
+        elif not result["complete"]:
+            # More than max_pages of news since the last refresh: the older part is still missing
+            self.truncated += 1
+            self.gap = (since if self.gap is None else self.gap[0], result["oldest"])
+        elif self.gap is not None:
+            gap_start, gap_end = self.gap
+            filled = await self._fetch_pages(gap_start, until=gap_end)
+            if filled is not None:
+                self.gap = None if filled["complete"] else (gap_start, filled["oldest"])
+        self.corpus.prune()
+        self.refreshes += 1
+
+    async def refresh(self, force: bool = False):
+        """Refresh the corpus when older than the TTL; concurrent callers share one fetch"""
+        if not self.api_key or (not force and time.monotonic() - self.refreshed_at < self.ttl):
+            return
+        if self._refresh is None:
+            self._refresh = asyncio.ensure_future(self._do_refresh())
+            self._refresh.add_done_callback(self._refresh_done)
+        try:
+            # shield: a cancelled caller must not cancel the shared refresh
+            await asyncio.shield(self._refresh)
+        except Exception:
+            pass  # recorded in last_error; callers get the cached corpus
+
+    def _refresh_done(self, future: asyncio.Future):
+        self._refresh = None
+        self.refreshed_at = time.monotonic()  # failures also wait a TTL, sparing a struggling API
+        if not future.cancelled() and future.exception() is not None:
+            self.last_error = str(future.exception())
+
     async def get_sentiment_score(self, query: str = "forex") -> Optional[float]:
-        """Basic sentiment analysis based on news titles"""
-        news_data = await self.get_forex_news(query)
-        
-        if not news_data or 'articles' not in news_data:
+        """Average title sentiment (-1 to +1) of cached articles matching ``query``; 0.0 when none match"""
+        await self.refresh()
+        if not len(self.corpus):
             return None
-            
-        # Simple sentiment: count positive vs negative words in titles
-        positive_words = {'up', 'rise', 'gain', 'bullish', 'strong', 'buy', 'positive'}
-        negative_words = {'down', 'fall', 'drop', 'bearish', 'weak', 'sell', 'negative'}
-        
-        sentiment_score = 0
-        article_count = 0
-        
-        for article in news_data['articles'][:10]:  # Analyze first 10 articles
-            title = article.get('title', '').lower()
-            
-            positive_count = sum(1 for word in positive_words if word in title)
-            negative_count = sum(1 for word in negative_words if word in title)
-            
-            if positive_count + negative_count > 0:
-                sentiment_score += (positive_count - negative_count) / (positive_count + negative_count)
-                article_count += 1
-        
-        if article_count > 0:
-            return sentiment_score / article_count  # Average sentiment (-1 to +1)
-        
-        return 0.0  # Neutral if no articles found
+        score, _ = self.corpus.score_query(query)
+        return score if score is not None else 0.0  # Neutral if no articles found
+
+    async def get_currency_sentiment(self, currencies: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Sentiment for many currencies from one cached corpus, at most one upstream call"""
+        await self.refresh()
+        return self.corpus.score_currencies(currencies)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": bool(self.api_key),
+            "articles": len(self.corpus),
+            "indexed_tokens": len(self.corpus.index),
+            "ttl_seconds": self.ttl,
+            "age_seconds": round(time.monotonic() - self.refreshed_at, 1) if self.refreshed_at else None,
+            "refreshes": self.refreshes,
+            "not_modified": self.not_modified,
+            "truncated_refreshes": self.truncated,
+            "gap": list(self.gap) if self.gap else None,
+            "last_error": self.last_error
+        }
+
+    async def aclose(self):
+        if self._session is not None and not self._session.is_closed:
+            await self._session.aclose()
+        self._session = None
 
 # Create a global client instance
-news_client = NewsAPIClient()
\ No newline at end of file
+news_client = NewsAPIClient(ttl=float(os.getenv("NEWS_CACHE_TTL", "300")))
@@ -1,67 +1,48 @@
-import os
-import requests
 from typing import Optional, Dict, Any
 
+import httpx
+
+from app.clients.gateway import UpstreamGateway, gateway as default_gateway
+
 class OANDAClient:
-    def __init__(self):
-        self.api_key = os.getenv('0771210553651bc4cf25ff1fb5a4f6d1-ac4e39abaedcb2622d401f3326fe343f')
-        # Try both possible demo URLs
-        self.demo_base_urls = [
-            "https://api-fxpractice.oanda.com/v3",
-            "https://api-fxtrade.oanda.com/v3"
-        ]
-        
-    def _make_request(self, endpoint: str, method: str = "GET") -> Optional[Dict[str, Any]]:
+    def __init__(self, gateway: Optional[UpstreamGateway] = None):
+        # Key, base URL (OANDA_BASE_URL picks practice or live), pool and rate limit all come from the gateway
+        self.gateway = gateway or default_gateway
+        self.api_key = self.gateway.api_key
+
+    async def _make_request(self, endpoint: str, params: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
         """Helper method to make authenticated requests to OANDA API"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Try each base URL until one works
-        for base_url in self.demo_base_urls:
-            url = f"{base_url}/{endpoint}"
-            try:
-                response = requests.request(method, url, headers=headers)
-                print(f"Trying URL: {url}, Status: {response.status_code}")
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 401:
-                    print("API Key invalid - check if it's a demo key")
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"OANDA API Error for {base_url}: {e}")
-                continue
-        
+        try:
+            response = await self.gateway.request(endpoint, params)
+        except httpx.HTTPError as e:
+            print(f"OANDA API Error for {endpoint}: {e}")
+            return None
+
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 401:
+            print("API Key invalid - check if it's a demo key")
         return None
-    
+
     async def get_account_info(self):
         """Get basic account information to test API connectivity"""
-        return self._make_request("accounts")
-    
+        return await self._make_request("accounts")
+
     async def get_instruments(self, instruments: str = "EUR_USD,GBP_USD,USD_JPY"):
         """Get instrument details for major Forex pairs"""
-        # Try the standard instruments endpoint
-        response = self._make_request(f"instruments?instruments={instruments}")
-        
-        # If that doesn't work, try through accounts endpoint
-        if not response or 'instruments' not in response:
-            accounts_response = self._make_request("accounts")
-            if accounts_response and 'accounts' in accounts_response and accounts_response['accounts']:
-                account_id = accounts_response['accounts'][0]['id']
-                response = self._make_request(f"accounts/{account_id}/instruments?instruments={instruments}")
-        
-        return response
-    
+        account_id = await self.gateway.get_account_id()  # looked up once, then cached
+        if account_id is None:
+            print("No OANDA account id: set OANDA_ACCOUNT_ID")
+            return None
+        return await self._make_request(f"accounts/{account_id}/instruments", {"instruments": instruments})
+
     async def get_prices(self, instruments: str = "EUR_USD,GBP_USD,USD_JPY"):
         """Get current pricing data for specified instruments"""
-        # First get account ID, then use it for pricing
-        accounts_data = self._make_request("accounts")
-        if accounts_data and 'accounts' in accounts_data and accounts_data['accounts']:
-            account_id = accounts_data['accounts'][0]['id']
-            return self._make_request(f"accounts/{account_id}/pricing?instruments={instruments}")
-        return None
+        account_id = await self.gateway.get_account_id()
+        if account_id is None:
+            print("No OANDA account id: set OANDA_ACCOUNT_ID")
+            return None
+        return await self._make_request(f"accounts/{account_id}/pricing", {"instruments": instruments})
 
 # Create a global client instance
 oanda_client = OANDAClient()
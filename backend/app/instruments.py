@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# OANDA metadata for the majors, used until the account's own list is loaded
+BUILTIN_INSTRUMENTS = [
+    {"name": "EUR_USD", "type": "CURRENCY", "displayName": "EUR/USD", "pipLocation": -4, "displayPrecision": 5},
+    {"name": "GBP_USD", "type": "CURRENCY", "displayName": "GBP/USD", "pipLocation": -4, "displayPrecision": 5},
+    {"name": "USD_JPY", "type": "CURRENCY", "displayName": "USD/JPY", "pipLocation": -2, "displayPrecision": 3},
+    {"name": "USD_CHF", "type": "CURRENCY", "displayName": "USD/CHF", "pipLocation": -4, "displayPrecision": 5},
+    {"name": "AUD_USD", "type": "CURRENCY", "displayName": "AUD/USD", "pipLocation": -4, "displayPrecision": 5},
+    {"name": "USD_CAD", "type": "CURRENCY", "displayName": "USD/CAD", "pipLocation": -4, "displayPrecision": 5},
+    {"name": "NZD_USD", "type": "CURRENCY", "displayName": "NZD/USD", "pipLocation": -4, "displayPrecision": 5}
+]
+
+InstrumentFetcher = Callable[[], Awaitable[Optional[List[Dict[str, Any]]]]]
+
+class InstrumentRegistry:
+    """The account's currency pairs, indexed by name and by currency.
+
+    Loaded from the OANDA account's instrument list (at most once per
+    ``max_age``), else from the copy cached on disk, else the built-in
+    majors. Lookups are dict reads; the index is swapped whole on reload.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None, max_age: float = 86400.0):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_age = max_age
+        self.instruments: Dict[str, Dict[str, Any]] = {}
+        self.by_currency: Dict[str, List[str]] = {}
+        self.names: List[str] = []
+        self.source = "none"
+        self.loaded_at = 0.0
+        self.load(BUILTIN_INSTRUMENTS, source="builtin")
+
+    def load(self, raw: List[Dict[str, Any]], source: str, loaded_at: Optional[float] = None) -> int:
+        """Index OANDA instrument records (non-currency instruments are skipped); returns pairs indexed"""
+        instruments: Dict[str, Dict[str, Any]] = {}
+        by_currency: Dict[str, List[str]] = {}
+        for item in raw:
+            name = item.get("name", "")
+            base, _, quote = name.partition("_")
+            if item.get("type", "CURRENCY") != "CURRENCY" or not base or not quote:
+                continue
+            pip_location = int(item.get("pipLocation", -4))
+            instruments[name] = {
+                "name": name,
+                "base": base,
+                "quote": quote,
+                "display_name": item.get("displayName", f"{base}/{quote}"),
+                "pip_location": pip_location,
+                "pip_size": 10.0 ** pip_location,
+                "display_precision": int(item.get("displayPrecision", 5))
+            }
+            by_currency.setdefault(base, []).append(name)
+            by_currency.setdefault(quote, []).append(name)
+        if not instruments:
+            return 0  # keep serving the previous index
+        self.instruments = dict(sorted(instruments.items()))
+        self.by_currency = {currency: sorted(pairs) for currency, pairs in sorted(by_currency.items())}
+        self.names = list(self.instruments)
+        self.source = source
+        self.loaded_at = loaded_at if loaded_at is not None else time.time()
+        return len(instruments)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.instruments
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.instruments.get(name)
+
+    def currencies(self) -> List[str]:
+        return list(self.by_currency)
+
+    def pairs_for(self, currency: str) -> List[str]:
+        return self.by_currency.get(currency, [])
+
+    def split(self, name: str) -> Tuple[str, str]:
+        """(base, quote) of a pair"""
+        entry = self.instruments.get(name)
+        if entry is not None:
+            return entry["base"], entry["quote"]
+        base, _, quote = name.partition("_")
+        return base, quote
+
+    def is_stale(self) -> bool:
+        return self.source == "builtin" or time.time() - self.loaded_at > self.max_age
+
+    def load_cache(self) -> bool:
+        """Load the instrument list saved by the last successful refresh, if any"""
+        if self.cache_path is None or not self.cache_path.exists():
+            return False
+        try:
+            cached = json.loads(self.cache_path.read_text())
+            return self.load(cached["instruments"], source="cache", loaded_at=cached["saved_at"]) > 0
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Instrument cache unreadable: {e}")
+            return False
+
+    def _save_cache(self, raw: List[Dict[str, Any]]):
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            partial = self.cache_path.with_suffix(".tmp")
+            partial.write_text(json.dumps({"saved_at": time.time(), "instruments": raw}))
+            os.replace(partial, self.cache_path)  # atomic, so workers never read half a file
+        except OSError as e:
+            print(f"Instrument cache not saved: {e}")
+
+    async def refresh(self, fetch: InstrumentFetcher) -> bool:
+        """Reload from the account's instrument list; the current index stays on failure"""
+        raw = await fetch()
+        if not raw or not self.load(raw, source="oanda"):
+            return False
+        self._save_cache(raw)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "instruments": len(self.instruments),
+            "currencies": len(self.by_currency),
+            "loaded_at": self.loaded_at or None,
+            "max_age_seconds": self.max_age
+        }
+
+# Global registry, from the cached list until startup refreshes it
+instrument_registry = InstrumentRegistry(
+    os.getenv("INSTRUMENT_CACHE", "data/instruments.json"),
+    max_age=float(os.getenv("INSTRUMENT_CACHE_MAX_AGE", "86400"))
+)
+instrument_registry.load_cache()
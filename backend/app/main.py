@@ -1,11 +1,42 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import time
-import random
-import requests
-from typing import Dict, Any, Optional
+import functools
+import inspect
+import math
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+from pydantic import BaseModel
 import json
+import asyncio
+import httpx
+import numpy as np
+
+from app.alerts import AlertEngine, AlertQueue
+from app.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.instruments import instrument_registry
+from app.clients.async_oanda import AsyncOANDAClient, DEFAULT_STREAM_URL
+from app.clients.gateway import NoAccountError, gateway
+from app.clients.newsapi import news_client
+from app.analysis.composite import SentimentBoard
+from app.analysis.correlation import RollingCorrelation, correlated_pairs, currency_strength, rounded_matrix
+from app.analysis.sentiment import CURRENCY_TERMS
+from app.analysis.tick_stats import average_true_range, realized_volatility, spread_percentiles
+from app.analysis.technical_analyzer import technical_analyzer
+from app.analysis.vectorized import batch_generate_signals
+from app.backtest.engine import warmup_bars
+from app.clients.forex_client import HistoryPending, forex_client
+from app.storage.candle_store import GRANULARITY_SECONDS
+from app.storage.ticks import TickHistory
+from app.quote_cache import QuoteCache
+from app.price_feed import PriceFeed
+from app.push import SignalBroadcaster, Subscription
+from app.shared_state import SharedState, default_directory
+from app.snapshots import SignalSnapshots
+from app.monitoring import MetricsMiddleware, monitor
+from app.tracing import TracingMiddleware, span, tracer
 
 print("🚀 Starting AuraQuant with Real Data Integration...")
 
@@ -18,9 +49,11 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST", "DELETE"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware, tracer=tracer)
+app.add_middleware(MetricsMiddleware, monitor=monitor)
 
 # ===== ENHANCED CACHE WITH REAL DATA SUPPORT =====
 cache = {
@@ -42,34 +75,53 @@ MOCK_FOREX_DATA = {
 }
 
 # ===== SAFE OANDA CLIENT =====
+def _oanda_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        window=float(os.getenv("OANDA_BREAKER_WINDOW", "30")),
+        min_calls=int(os.getenv("OANDA_BREAKER_MIN_CALLS", "5")),
+        failure_rate=float(os.getenv("OANDA_BREAKER_FAILURE_RATE", "0.5")),
+        open_seconds=float(os.getenv("OANDA_BREAKER_OPEN_SECONDS", "15"))
+    )
+
 class SafeOANDAClient:
     def __init__(self):
-        self.api_key = os.getenv('OANDA_API_KEY')
-        self.account_id = "101-001-36257109-001"
-        self.base_url = "https://api-fxpractice.oanda.com/v3"
+        self.api_key = gateway.api_key
         self.timeout = 5  # Short timeout to prevent hanging
+        # Requests go through the upstream gateway: one pooled session, rate limit, priority lanes
+        self.http = AsyncOANDAClient(gateway=gateway)
+        self.base_url = gateway.base_url
+        # Per-endpoint circuit breakers: while one is open we fall back to mock data at once
+        self.breakers = {name: _oanda_breaker(name) for name in ("pricing", "accounts")}
+        self.retries = int(os.getenv("OANDA_RETRIES", "1"))
+        self.hedge_after = float(os.getenv("OANDA_HEDGE_AFTER", "0.75")) or None
+
+    @staticmethod
+    async def _checked(request, *args) -> httpx.Response:
+        """Run a request, raising on answers that mean OANDA itself is struggling"""
+        response = await request(*args)
+        if response.status_code >= 500 or response.status_code == 429:
+            response.raise_for_status()
+        return response
         
-    def test_connection(self) -> Dict[str, Any]:
+    async def test_connection(self) -> Dict[str, Any]:
         """Test OANDA connection safely without crashing"""
         if not self.api_key:
             return {"status": "no_key", "message": "OANDA_API_KEY not set"}
             
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            url = f"{self.base_url}/accounts"
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = await self.breakers["accounts"].call(lambda: self._checked(self.http.get_accounts))
             
             if response.status_code == 200:
+                account_id = await gateway.get_account_id()
+                if account_id is None:
+                    return {"status": "no_account", "message": str(NoAccountError())}
                 cache["real_data_enabled"] = True
                 cache["last_oanda_success"] = time.time()
                 return {
                     "status": "connected",
                     "message": "OANDA API connected successfully",
-                    "account_id": self.account_id
+                    "account_id": account_id
                 }
             else:
                 return {
@@ -78,6 +130,8 @@ class SafeOANDAClient:
                     "details": response.text[:100]  # First 100 chars only
                 }
                 
+        except CircuitOpenError as e:
+            return {"status": "circuit_open", "message": str(e), "retry_in": round(e.retry_in, 1)}
         except Exception as e:
             cache["oanda_error_count"] += 1
             return {
@@ -86,78 +140,371 @@ class SafeOANDAClient:
                 "error_count": cache["oanda_error_count"]
             }
     
-    def get_single_price(self, instrument: str) -> Optional[Dict[str, Any]]:
-        """Get price for one instrument with maximum safety"""
-        if not self.api_key or cache["oanda_error_count"] > 3:
-            return None  # Too many errors, use fallback
+    async def get_prices(self, instruments: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get prices for many instruments in one upstream call, keyed by instrument"""
+        if not instruments or not self.api_key:
+            return {}
+        if await gateway.get_account_id() is None:
+            return {}  # mock prices; /oanda/status reports the missing account
             
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            url = f"{self.base_url}/accounts/{self.account_id}/pricing?instruments={instrument}"
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = await self.breakers["pricing"].call(
+                lambda: self._checked(self.http.get_pricing, instruments),
+                retries=self.retries,
+                hedge_after=self.hedge_after
+            )
             
             if response.status_code == 200:
                 data = response.json()
                 if "prices" in data and data["prices"]:
                     cache["last_oanda_success"] = time.time()
                     cache["real_data_enabled"] = True
-                    return data["prices"][0]  # Return first price
+                    return {price["instrument"]: price for price in data["prices"]}
                     
+        except CircuitOpenError:
+            pass  # Circuit open, use fallback without waiting on upstream
         except Exception as e:
             cache["oanda_error_count"] += 1
-            print(f"OANDA error for {instrument}: {e}")
+            print(f"OANDA error for {','.join(instruments)}: {str(e).splitlines()[0] if str(e) else repr(e)}")
             
+        return {}
+
+    async def get_instruments(self) -> Optional[List[Dict[str, Any]]]:
+        """The account's tradeable instruments (name, type, pipLocation, displayPrecision, ...)"""
+        if not self.api_key or await gateway.get_account_id() is None:
+            return None
+        try:
+            response = await self.breakers["accounts"].call(lambda: self._checked(self.http.get_instruments))
+            if response.status_code == 200:
+                return response.json().get("instruments")
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            print(f"OANDA instruments error: {str(e).splitlines()[0] if str(e) else repr(e)}")
         return None
 
+    @property
+    def account_id(self) -> Optional[str]:
+        return gateway.current_account_id()
+
+    async def get_single_price(self, instrument: str) -> Optional[Dict[str, Any]]:
+        """Get price for one instrument with maximum safety"""
+        prices = await self.get_prices([instrument])
+        return prices.get(instrument)
+
+    async def aclose(self):
+        await self.http.aclose()
+        await gateway.aclose()
+
 # Initialize client
 oanda_client = SafeOANDAClient()
 print("✅ Safe OANDA client initialized")
 
+# Quote cache in front of the client: short TTL, bounded LRU, coalesced misses
+quote_cache = QuoteCache(
+    ttl=float(os.getenv("QUOTE_CACHE_TTL", "1.0")),
+    max_size=int(os.getenv("QUOTE_CACHE_SIZE", "256"))
+)
+
+# Tick history per instrument: fixed-size ring buffers, so memory is bounded by
+# TICK_HISTORY_CAPACITY x TICK_HISTORY_MAX_INSTRUMENTS whatever the tick rate
+tick_history = TickHistory(
+    capacity=int(os.getenv("TICK_HISTORY_CAPACITY", "4096")),
+    max_instruments=int(os.getenv("TICK_HISTORY_MAX_INSTRUMENTS", "256"))
+)
+
+# Background streaming feed keeping a latest-tick table for the instrument universe
+FEED_STALE_AFTER = float(os.getenv("PRICE_FEED_STALE_AFTER", "10"))
+PRICE_FEED_INSTRUMENTS = os.getenv("PRICE_FEED_INSTRUMENTS", ",".join(MOCK_FOREX_DATA)).strip()  # or "all"
+price_feed = PriceFeed(
+    instruments=[i.strip().upper() for i in PRICE_FEED_INSTRUMENTS.split(",") if i.strip()] if PRICE_FEED_INSTRUMENTS.lower() != "all" else [],
+    stream_client=AsyncOANDAClient(
+        api_key=oanda_client.api_key,
+        base_url=os.getenv("OANDA_STREAM_URL", DEFAULT_STREAM_URL),
+        timeout=httpx.Timeout(5.0, read=FEED_STALE_AFTER)
+    ),
+    stale_after=FEED_STALE_AFTER,
+    history=tick_history
+)
+
+# ===== INSTRUMENT REGISTRY =====
+@app.on_event("startup")
+async def load_instruments():
+    """Refresh the instrument index from the account when the cached copy is missing or old"""
+    await gateway.get_account_id()  # every client shares the cached id from here on
+    if instrument_registry.is_stale() and await instrument_registry.refresh(oanda_client.get_instruments):
+        print(f"📚 Loaded {len(instrument_registry)} instruments from OANDA")
+    if PRICE_FEED_INSTRUMENTS.lower() == "all":
+        price_feed.instruments = list(instrument_registry.names)
+
+def _start_feed():
+    if oanda_client.api_key and os.getenv("PRICE_FEED_ENABLED", "1") != "0":
+        price_feed.start()
+        print(f"📡 Price feed streaming {len(price_feed.instruments)} instruments")
+
+# ===== SHARED STATE ACROSS WORKERS =====
+# With several uvicorn workers, one leader worker streams/fetches prices and
+# publishes them; the others read that snapshot instead of calling OANDA
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+SHARED_PUBLISH_INTERVAL = float(os.getenv("SHARED_PUBLISH_INTERVAL", "0.5"))
+shared_state = (
+    SharedState(os.getenv("SHARED_STATE_DIR") or default_directory())
+    if os.getenv("SHARED_STATE", "1" if WORKERS > 1 else "0") == "1" else None
+)
+shared_tasks = {"ingest": None}
+
+def _is_follower() -> bool:
+    return shared_state is not None and not shared_state.is_leader
+
+def counters() -> Dict[str, Any]:
+    """Request and OANDA counters for the deployment (summed over workers when shared)"""
+    if shared_state is None:
+        return cache
+    shared_state.store_counters(cache)
+    return dict(shared_state.counters(), start_time=cache["start_time"])
+
+def _leader_snapshot() -> Optional[Dict[str, Any]]:
+    return shared_state.snapshot() if _is_follower() else None
+
+def breaker_states(detail: bool = False) -> Dict[str, Any]:
+    """Circuit breakers of the worker that talks to OANDA"""
+    snapshot = _leader_snapshot()
+    if snapshot:
+        return {name: stats if detail else stats["state"] for name, stats in snapshot["breakers"].items()}
+    return {name: breaker.stats() if detail else breaker.state for name, breaker in oanda_client.breakers.items()}
+
+def feed_status() -> Dict[str, Any]:
+    snapshot = _leader_snapshot()
+    return snapshot["price_feed"] if snapshot else price_feed.status()
+
+def shared_quotes(instruments: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Quotes the leader published recently (followers only)"""
+    snapshot = _leader_snapshot()
+    if not snapshot or time.time() - snapshot["published_at"] > FEED_STALE_AFTER:
+        return {}
+    quotes = snapshot["quotes"]
+    return {i: quotes[i] for i in instruments if i in quotes}
+
+# Endpoints over state only the leader holds (its tick stream and what is built
+# from it); other workers forward calls to the leader instead of answering
+# from their own, empty copies
+leader_endpoints: Dict[str, Callable[..., Awaitable[Any]]] = {}
+LEADER_TIMEOUT = float(os.getenv("LEADER_TIMEOUT", "10"))
+
+def on_leader(endpoint: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Run ``endpoint`` on the leader worker (place under the route decorator)"""
+    leader_endpoints[endpoint.__name__] = endpoint
+
+    @functools.wraps(endpoint)
+    async def route(**params):
+        if not _is_follower():
+            return await endpoint(**params)
+        return await _forward_to_leader(endpoint.__name__, params)
+    return route
+
+async def _forward_to_leader(name: str, params: Dict[str, Any]) -> Any:
+    timeout = LEADER_TIMEOUT + float(params.get("wait") or 0)  # long polls wait on the leader
+    try:
+        reply = await shared_state.ask_leader({"endpoint": name, "params": jsonable_encoder(params)}, timeout)
+    except (OSError, asyncio.TimeoutError) as e:
+        raise HTTPException(status_code=503, detail=f"Leader worker unavailable, retry shortly ({e!r})")
+    if "error" in reply:
+        raise HTTPException(status_code=reply["error"]["status_code"], detail=reply["error"]["detail"])
+    return reply["result"]
+
+async def answer_worker(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Leader: run an endpoint call forwarded by another worker"""
+    endpoint = leader_endpoints.get(request.get("endpoint"))
+    if endpoint is None:
+        return {"error": {"status_code": 404, "detail": f"No leader endpoint {request.get('endpoint')}"}}
+    params = request["params"]
+    for name, parameter in inspect.signature(endpoint).parameters.items():
+        if inspect.isclass(parameter.annotation) and issubclass(parameter.annotation, BaseModel):
+            params[name] = parameter.annotation(**params[name])  # request bodies travel as JSON
+    try:
+        return {"result": jsonable_encoder(await endpoint(**params))}
+    except HTTPException as e:
+        return {"error": {"status_code": e.status_code, "detail": e.detail}}
+    except Exception as e:
+        return {"error": {"status_code": 500, "detail": f"Leader failed: {e}"}}
+
+async def _ingest_loop():
+    """Leader: refresh the instrument universe and publish it. Followers: stand by to take over"""
+    while True:
+        try:
+            if not shared_state.is_leader and shared_state.try_lead():
+                print(f"👑 Worker {os.getpid()} is the price ingestion leader")
+                previous = shared_state.snapshot()
+                if previous:  # a new leader starts without the old one's alerts; never reuse their ids
+                    alert_engine.next_id = max(alert_engine.next_id, previous.get("alert_next_id", 1))
+                await shared_state.serve(answer_worker)
+                _start_feed()
+            if shared_state.is_leader:
+                quotes = await fetch_quotes(price_feed.instruments)
+                shared_state.publish({
+                    "published_at": time.time(),
+                    "leader_pid": os.getpid(),
+                    "quotes": quotes,
+                    "breakers": {name: breaker.stats() for name, breaker in oanda_client.breakers.items()},
+                    "price_feed": price_feed.status(),
+                    "sentiment": sentiment_board.values(),
+                    "alert_next_id": alert_engine.next_id,
+                    "signals": {"version": signal_snapshots.version, "payloads": signal_snapshots.payloads}
+                    if signal_snapshots.version else None
+                })
+            shared_state.store_counters(cache)
+            shared_state.store_metrics(monitor.export(worker=str(shared_state.slot)))
+        except Exception as e:
+            print(f"Shared state error: {e}")
+        await asyncio.sleep(SHARED_PUBLISH_INTERVAL)
+
+@app.on_event("startup")
+async def start_price_feed():
+    if shared_state is None:
+        _start_feed()
+        return
+    shared_state.open()
+    gateway.bucket.share(shared_state)  # OANDA_RATE_LIMIT holds for all workers together
+    previous = shared_state.slot_metrics()
+    if previous:
+        monitor.merge(previous)  # keep counting from the totals a dead worker left in this slot
+    shared_tasks["ingest"] = asyncio.create_task(_ingest_loop())
+
+@app.on_event("shutdown")
+async def close_upstream_sessions():
+    task = shared_tasks["ingest"]
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    if shared_state is not None:
+        await shared_state.stop_serving()
+        gateway.bucket.share(None)
+        shared_state.close()  # lets another worker take over leadership
+    await price_feed.stop()
+    await oanda_client.aclose()
+
+async def fetch_quotes(instruments: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Latest OANDA prices keyed by instrument.
+
+    Served from the leader's shared snapshot (other workers) or the
+    streaming feed when it is live, then from the quote cache, and only
+    then from a (batched, coalesced) upstream call.
+    """
+    instruments = [i for i in instruments if i in instrument_registry]  # unknown names never reach OANDA
+    quotes = shared_quotes(instruments)
+    quotes.update(price_feed.latest_many([i for i in instruments if i not in quotes]))
+    if quotes:
+        cache["real_data_enabled"] = True
+        cache["last_oanda_success"] = time.time()
+    missing = [i for i in instruments if i not in quotes]
+    if missing:
+        quotes.update(await quote_cache.get_many(missing, oanda_client.get_prices))
+    if not _is_follower():  # tick analytics are served from the leader's history
+        for quote in quotes.values():
+            tick_history.record_quote(quote)  # streamed and repeated quotes are skipped
+    return quotes
+
+# ===== NEWS SENTIMENT =====
+# A background task scores every currency once per news refresh; pairs read
+# their base and quote currency from the board, so requests never wait on NewsAPI
+sentiment_board = SentimentBoard()
+news_state: Dict[str, Any] = {"task": None, "refreshes": -1}
+
+def news_sentiments() -> Dict[str, Dict[str, Optional[float]]]:
+    """Currency and pair sentiment from the board of the worker that reads the news"""
+    snapshot = _leader_snapshot()
+    return snapshot.get("sentiment", {}) if snapshot else sentiment_board.values()
+
+def pair_sentiments(instrument: str, sentiments: Optional[Dict[str, Dict[str, Optional[float]]]] = None) -> Dict[str, Any]:
+    """Base, quote and pair sentiment for an instrument such as EUR_USD"""
+    return sentiment_board.for_pair(instrument, sentiments if sentiments is not None else news_sentiments())
+
+async def refresh_sentiment():
+    await news_client.refresh()
+    if news_client.refreshes != news_state["refreshes"]:
+        news_state["refreshes"] = news_client.refreshes
+        corpus = news_client.corpus
+        currencies = list(dict.fromkeys(list(CURRENCY_TERMS) + instrument_registry.currencies()))
+        mentions = corpus.currency_mentions(currencies)  # one index pass per currency, shared by its pairs
+        scores = corpus.score_currencies(currencies, mentions=mentions)
+        sentiment_board.update(
+            {currency: score["sentiment"] for currency, score in scores.items()},
+            {name: corpus.score_pair(*instrument_registry.split(name), mentions=mentions)["sentiment"]
+             for name in instrument_registry.names}
+        )
+
+async def _news_loop():
+    while True:
+        try:
+            if not _is_follower():  # followers get the leader's board through the snapshot
+                await refresh_sentiment()
+        except Exception as e:
+            print(f"News sentiment error: {e}")
+        await asyncio.sleep(min(news_client.ttl, 60.0))
+
+@app.on_event("startup")
+async def start_news_refresh():
+    if news_client.api_key:
+        news_state["task"] = asyncio.create_task(_news_loop())
+
+@app.on_event("shutdown")
+async def stop_news_refresh():
+    task = news_state["task"]
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await news_client.aclose()
+
 # ===== ENHANCED ENDPOINTS =====
 @app.get("/")
 async def root():
     cache["request_count"] += 1
+    stats = counters()
     return {
         "message": "AuraQuant Trading with Real Data",
         "status": "stable",
         "version": "1.1.0",
-        "real_data": cache["real_data_enabled"],
-        "uptime_seconds": int(time.time() - cache["start_time"]),
-        "total_requests": cache["request_count"]
+        "real_data": stats["real_data_enabled"],
+        "uptime_seconds": int(time.time() - stats["start_time"]),
+        "total_requests": stats["request_count"]
     }
 
 @app.get("/health")
 async def health():
+    stats = counters()
     return {
         "status": "healthy", 
         "timestamp": int(time.time()),
-        "real_data_available": cache["real_data_enabled"],
-        "oanda_errors": cache["oanda_error_count"]
+        "real_data_available": stats["real_data_enabled"],
+        "oanda_errors": stats["oanda_error_count"],
+        "circuit_breakers": breaker_states(),
+        "price_feed_stale": feed_status()["stale"]
     }
 
 @app.get("/oanda/status")
 async def oanda_status():
     """Check OANDA connection status"""
-    status = oanda_client.test_connection()
+    status = await oanda_client.test_connection()
+    stats = counters()
     return {
         "oanda_status": status,
-        "real_data_enabled": cache["real_data_enabled"],
-        "last_success": cache["last_oanda_success"]
+        "circuit_breakers": breaker_states(detail=True),
+        "real_data_enabled": stats["real_data_enabled"],
+        "last_success": stats["last_oanda_success"]
     }
 
-@app.get("/forex/{instrument}")
-async def get_forex(instrument: str):
-    """Get Forex data - tries real OANDA first, falls back to mock data"""
-    cache["request_count"] += 1
-    instrument = instrument.upper()
-    
-    # Try to get real data first
-    real_price = oanda_client.get_single_price(instrument)
-    
+def _parse_instruments(instruments: str) -> List[str]:
+    """Split a comma-separated instrument list, normalised and de-duplicated"""
+    return list(dict.fromkeys(i.strip().upper() for i in instruments.split(",") if i.strip()))
+
+def _forex_payload(instrument: str, real_price: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the /forex response from an OANDA price, falling back to mock data"""
     if real_price:
         return {
             "status": "success",
@@ -168,7 +515,7 @@ async def get_forex(instrument: str):
         }
     
     # Fallback to mock data
-    if instrument in MOCK_FOREX_DATA:
+    if instrument in MOCK_FOREX_DATA and instrument in instrument_registry:
         return {
             "status": "success",
             "instrument": instrument,
@@ -177,79 +524,258 @@ async def get_forex(instrument: str):
             "timestamp": int(time.time()),
             "note": "Real data temporarily unavailable"
         }
+    elif instrument in instrument_registry:
+        return {
+            "status": "error",
+            "instrument": instrument,
+            "message": f"No price available for {instrument} right now"
+        }
     else:
         return {
             "status": "error",
             "message": f"Instrument {instrument} not found",
-            "available_instruments": list(MOCK_FOREX_DATA.keys())
+            "available_instruments": instrument_registry.names
         }
 
-@app.get("/analysis/{instrument}")
-async def analyze_forex(instrument: str):
-    """Technical analysis with real data when available"""
+@app.get("/forex")
+async def get_forex_bulk(instruments: str):
+    """Get Forex data for several instruments (?instruments=EUR_USD,GBP_USD) in one upstream call"""
+    cache["request_count"] += 1
+    names = _parse_instruments(instruments)
+    
+    real_prices = await fetch_quotes(names)
+    
+    return {
+        "status": "success",
+        "data": {name: _forex_payload(name, real_prices.get(name)) for name in names},
+        "real_data_pairs": len([name for name in names if name in real_prices]),
+        "total_pairs": len(names),
+        "timestamp": int(time.time())
+    }
+
+@app.get("/forex/{instrument}")
+async def get_forex(instrument: str):
+    """Get Forex data - tries real OANDA first, falls back to mock data"""
     cache["request_count"] += 1
     instrument = instrument.upper()
     
-    # Get price data (real or mock)
-    price_data = await get_forex(instrument)
+    # Try to get real data first
+    real_price = (await fetch_quotes([instrument])).get(instrument)
+    
+    return _forex_payload(instrument, real_price)
+
+def _analysis_payload(price_data: Dict[str, Any], sentiment: Optional[Dict[str, Any]] = None,
+                      technical_score: Optional[int] = None) -> Dict[str, Any]:
+    """Score a /forex payload into a BUY/SELL/HOLD signal, blending in the pair's news sentiment.
+
+    ``technical_score`` comes from ``technical_scores()``; without one (no
+    candle history yet) there is no score and the signal is HOLD.
+    """
     if price_data["status"] != "success":
         return price_data
     
-    # Enhanced analysis with real data context
+    instrument = price_data["instrument"]
     data = price_data["data"]
     bid_price = data.get("bids", [{}])[0].get("price") if price_data["source"] == "oanda_live" else data["bid"]
     
     if isinstance(bid_price, str):
         bid_price = float(bid_price)
     
-    # More realistic analysis with real prices
-    if price_data["source"] == "oanda_live":
-        # Use real price for analysis
-        signal_score = 50 + int((bid_price - 1.0800) * 1000)  # Simple trend-based
-        signal_score = max(0, min(100, signal_score))
-    else:
-        # Mock analysis for fallback
-        signal_score = random.randint(0, 100)
-    
-    if signal_score > 65:
-        signal = "BUY"
-        strength = "STRONG" if signal_score > 80 else "WEAK"
-    elif signal_score < 35:
-        signal = "SELL" 
-        strength = "STRONG" if signal_score < 20 else "WEAK"
+    if sentiment is None:
+        sentiment = pair_sentiments(instrument)
+    if technical_score is None:
+        signal_score, signal, strength = None, "HOLD", "NEUTRAL"
     else:
-        signal = "HOLD"
-        strength = "NEUTRAL"
+        # Same thresholds and blending as the candle-based /analysis?timeframes= signals
+        signal_score, signal, strength = technical_analyzer.blend_sentiment(technical_score, sentiment["pair"])
     
-    return {
+    payload = {
         "status": "success",
         "instrument": instrument,
         "signal": signal,
         "strength": strength,
         "score": signal_score,
+        "technical_score": technical_score,
+        "sentiment": sentiment,
         "price": bid_price,
         "data_source": price_data["source"],
         "timestamp": int(time.time())
     }
+    if technical_score is None:
+        payload["note"] = f"Not enough {ANALYSIS_GRANULARITY} candles for a technical score yet"
+    return payload
 
-@app.get("/signals/dashboard")
-async def signals_dashboard():
-    """Dashboard with mixed real/mock data"""
+# Candle downloads for multi-timeframe analysis run one at a time per worker; the
+# candle store's file locks keep workers from writing a series at the same time.
+# History needing more than one candles request is paged in by a background
+# backfill (one per series), so requests never hold the lock while it pages.
+candle_lock = asyncio.Lock()
+candle_backfills: Dict[Any, asyncio.Task] = {}
+MAX_TIMEFRAME_BARS = int(os.getenv("MAX_TIMEFRAME_BARS", "1000"))
+
+async def _backfill_candles(instrument: str, granularity: str, count: int):
+    try:
+        written = await asyncio.to_thread(forex_client.sync_candles, instrument, granularity, count)
+        print(f"Backfilled {written} {granularity} candles for {instrument}")
+    except Exception as e:
+        print(f"Candle backfill error for {instrument} {granularity}: {e}")
+    finally:
+        candle_backfills.pop((instrument, granularity), None)
+
+def _backfill_pending(pending: HistoryPending) -> JSONResponse:
+    """Start (or join) the series' backfill and tell the client to come back"""
+    key = (pending.instrument, pending.granularity)
+    if key not in candle_backfills:
+        candle_backfills[key] = asyncio.create_task(_backfill_candles(*key, pending.count))
+    return JSONResponse(status_code=202, headers={"Retry-After": "5"}, content={
+        "status": "pending",
+        "instrument": pending.instrument,
+        "base_granularity": pending.granularity,
+        "message": str(pending)
+    })
+
+@app.on_event("shutdown")
+async def stop_candle_backfills():
+    tasks = list(candle_backfills.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+# ===== TECHNICAL SCORES =====
+# Single-timeframe signals score each instrument's last ANALYSIS_BARS stored
+# candles with the vectorized batch scorer, every instrument of a length in
+# one pass; scores are rechecked every TECHNICAL_REFRESH seconds, and the
+# candle store only goes upstream once a new candle can have closed
+ANALYSIS_GRANULARITY = os.getenv("ANALYSIS_GRANULARITY", "H1")
+ANALYSIS_BARS = int(os.getenv("ANALYSIS_BARS", "200"))
+TECHNICAL_REFRESH = float(os.getenv("TECHNICAL_REFRESH", "60"))
+technical_state: Dict[str, Dict[str, Any]] = {"scores": {}, "checked_at": {}}
+
+def _read_candles(instruments: List[str]) -> Dict[str, Dict[str, np.ndarray]]:
+    """Stored candle columns of the instruments with enough bars to score"""
+    candles = {}
+    for instrument in instruments:
+        try:
+            columns = forex_client.get_historical_data(instrument, ANALYSIS_BARS, ANALYSIS_GRANULARITY, as_arrays=True)
+        except Exception as e:
+            print(f"Candle read error for {instrument}: {e}")
+            continue
+        if columns and len(columns["time"]) >= warmup_bars():
+            candles[instrument] = columns
+    return candles
+
+def _score_candles(candles: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, int]:
+    by_length: Dict[int, List[str]] = {}
+    for instrument, columns in candles.items():
+        by_length.setdefault(len(columns["time"]), []).append(instrument)
+    scores = {}
+    for names in by_length.values():
+        batch = batch_generate_signals(*(np.vstack([candles[n][c] for n in names]) for c in ("bid_c", "bid_h", "bid_l")))
+        scores.update(zip(names, batch["score"].tolist()))
+    return scores
+
+async def technical_scores(instruments: List[str]) -> Dict[str, int]:
+    """Candle-based 0-100 score per instrument; instruments without enough history are left out"""
+    now = time.monotonic()
+    checked_at, scores = technical_state["checked_at"], technical_state["scores"]
+    due = [i for i in instruments if now - checked_at.get(i, -TECHNICAL_REFRESH) >= TECHNICAL_REFRESH]
+    if due:
+        async with candle_lock:
+            candles = await asyncio.to_thread(_read_candles, due)
+        with span("technical"):
+            fresh = _score_candles(candles)
+        for instrument in due:
+            checked_at[instrument] = now
+            if instrument in fresh:
+                scores[instrument] = fresh[instrument]
+            else:
+                scores.pop(instrument, None)
+    return {i: scores[i] for i in instruments if i in scores}
+
+async def _multi_timeframe_analysis(instrument: str, timeframes: List[str], bars: int) -> Any:
+    """Signals per timeframe, all resampled from one stored base granularity"""
+    if instrument not in instrument_registry:
+        raise HTTPException(status_code=404, detail=f"Instrument {instrument} not found")
+    try:
+        base, count = forex_client.base_history(timeframes, bars)
+        if (instrument, base) in candle_backfills:
+            return _backfill_pending(HistoryPending(instrument, base, count))
+        async with candle_lock:
+            # forex_client times its own fetch/parse/resample spans
+            frames = await asyncio.to_thread(forex_client.get_timeframes, instrument, timeframes, bars, base, False)
+    except HistoryPending as e:
+        return _backfill_pending(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sentiment = pair_sentiments(instrument)
+    results = {}
+    with span("signals"):  # generate_signal adds its indicator and scoring spans inside
+        for timeframe, frame in frames.items():
+            if len(frame) < warmup_bars():
+                results[timeframe] = {"status": "error", "message": f"Only {len(frame)} candles available"}
+                continue
+            signal = technical_analyzer.generate_signal(frame, sentiment=sentiment["pair"])
+            results[timeframe] = dict(signal, status="success", bars=len(frame),
+                                      last_candle=frame["time"].iloc[-1].isoformat())
+    return {
+        "status": "success",
+        "instrument": instrument,
+        "base_granularity": min(timeframes, key=lambda t: GRANULARITY_SECONDS.get(t, 0)),
+        "timeframes": results,
+        "sentiment": sentiment,
+        "timestamp": int(time.time())
+    }
+
+@app.get("/analysis/{instrument}")
+async def analyze_forex(request: Request, instrument: str, timeframes: Optional[str] = None,
+                        bars: int = Query(100, ge=1, le=MAX_TIMEFRAME_BARS)):
+    """Technical analysis with real data when available.
+
+    Instruments in the signal snapshot are served from it (ETag / 304 aware).
+    With ?timeframes=M5,M15,H1,H4,D, candle-based signals for every timeframe
+    from a single download of the smallest one; 202 while a long history is
+    backfilled, 400 when it would exceed CANDLE_MAX_HISTORY base candles.
+    """
     cache["request_count"] += 1
+    instrument = instrument.upper()
+    if timeframes:
+        return await _multi_timeframe_analysis(instrument, _parse_instruments(timeframes), bars)
+    snapshot_response = _snapshot_response(f"analysis:{instrument}", request)
+    if snapshot_response is not None:
+        return snapshot_response
     
-    major_pairs = ["EUR_USD", "GBP_USD", "USD_JPY", "USD_CHF", "AUD_USD"]
+    # Not in the snapshot: get price data (real or mock); stages show up in traces (?trace=1 with TRACING_ENABLED=1)
+    with span("fetch"):
+        real_price = (await fetch_quotes([instrument])).get(instrument)
+    with span("parse"):
+        price_data = _forex_payload(instrument, real_price)
+    technical = (await technical_scores([instrument])).get(instrument) if price_data["status"] == "success" else None
+    with span("scoring"):
+        return _analysis_payload(price_data, technical_score=technical)
+
+DASHBOARD_PAIRS = [p.strip().upper() for p in os.getenv("DASHBOARD_PAIRS", "EUR_USD,GBP_USD,USD_JPY,USD_CHF,AUD_USD").split(",") if p.strip()]
+
+def _dashboard_payload(real_prices: Dict[str, Dict[str, Any]],
+                       analyses: Optional[Dict[str, Dict[str, Any]]] = None,
+                       pairs: List[str] = DASHBOARD_PAIRS,
+                       technicals: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Dashboard from already-fetched prices, reusing analyses computed for them when given"""
     signals = {}
+    sentiments = news_sentiments()
     
-    for pair in major_pairs:
+    for pair in pairs:
         try:
-            analysis = await analyze_forex(pair)
+            analysis = (analyses or {}).get(pair) or _analysis_payload(
+                _forex_payload(pair, real_prices.get(pair)), pair_sentiments(pair, sentiments),
+                (technicals or {}).get(pair))
             if analysis["status"] == "success":
                 signals[pair] = {
                     "signal": analysis["signal"],
                     "strength": analysis["strength"],
                     "score": analysis["score"],
                     "price": analysis["price"],
-                    "source": analysis["data_source"]
+                    "source": analysis["data_source"],
+                    "sentiment": analysis["sentiment"]["pair"]
                 }
         except Exception as e:
             # Never crash the dashboard
@@ -270,18 +796,486 @@ async def signals_dashboard():
         "timestamp": int(time.time())
     }
 
+@app.get("/signals/dashboard")
+async def signals_dashboard(request: Request, currency: Optional[str] = None):
+    """Dashboard with mixed real/mock data, from the signal snapshot when it is current.
+
+    ?currency=JPY shows every pair of that currency instead of the default pairs.
+    """
+    cache["request_count"] += 1
+    if currency:
+        pairs = instrument_registry.pairs_for(currency.upper())
+        if not pairs:
+            raise HTTPException(status_code=404, detail=f"No instruments for currency {currency.upper()}")
+        # Pairs already in the snapshot reuse its analysis; one batched upstream call for the rest
+        fresh = signal_snapshots.payloads if signal_snapshots.is_fresh(SNAPSHOT_STALE_AFTER) else {}
+        analyses = {p: fresh[f"analysis:{p}"] for p in pairs if f"analysis:{p}" in fresh}
+        missing = [p for p in pairs if p not in analyses]
+        real_prices = await fetch_quotes(missing)
+        return _dashboard_payload(real_prices, analyses, pairs, await technical_scores(missing))
+    snapshot_response = _snapshot_response("dashboard", request)
+    if snapshot_response is not None:
+        return snapshot_response
+    
+    # One batched upstream call for every pair
+    return _dashboard_payload(await fetch_quotes(DASHBOARD_PAIRS), technicals=await technical_scores(DASHBOARD_PAIRS))
+
+@app.get("/instruments")
+async def list_instruments(currency: Optional[str] = None):
+    """Tradeable pairs with pip location and precision (?currency=EUR for one currency's pairs)"""
+    names = instrument_registry.pairs_for(currency.upper()) if currency else instrument_registry.names
+    return {
+        "status": "success",
+        "instruments": [instrument_registry.get(name) for name in names],
+        "currencies": instrument_registry.currencies(),
+        "registry": instrument_registry.stats()
+    }
+
+# ===== TICK ANALYTICS =====
+def _tick_window(instrument: str, window: float) -> Dict[str, Any]:
+    instrument = instrument.upper()
+    if instrument not in instrument_registry:
+        raise HTTPException(status_code=404, detail=f"Instrument {instrument} not found")
+    if not math.isfinite(window) or window <= 0:  # nan/inf would end as non-JSON floats
+        raise HTTPException(status_code=400, detail="window must be a positive number")
+    held, span_seconds = tick_history.coverage(instrument)
+    return {
+        "instrument": instrument,
+        "ticks": tick_history.window(instrument, window),
+        "pip_size": instrument_registry.get(instrument)["pip_size"],
+        "history": {"ticks_held": held, "span_seconds": span_seconds}
+    }
+
+def _tick_response(selected: Dict[str, Any], window: float, stats: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": "success",
+        "instrument": selected["instrument"],
+        "window_seconds": window,
+        **stats,
+        "history": selected["history"],
+        "timestamp": int(time.time())
+    }
+
+@app.get("/ticks/{instrument}/spread")
+@on_leader
+async def tick_spread(instrument: str, window: float = 300, percentiles: str = "50,90,99"):
+    """Percentiles of the quoted spread over the last ``window`` seconds of ticks"""
+    cache["request_count"] += 1
+    try:
+        levels = [float(p) for p in percentiles.split(",") if p.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="percentiles must be numbers, e.g. 50,90,99")
+    if not levels or not all(0 <= p <= 100 for p in levels):
+        raise HTTPException(status_code=400, detail="percentiles must be between 0 and 100")
+    selected = _tick_window(instrument, window)
+    return _tick_response(selected, window, spread_percentiles(selected["ticks"], levels, selected["pip_size"]))
+
+@app.get("/ticks/{instrument}/volatility")
+@on_leader
+async def tick_volatility(instrument: str, window: float = 3600, sample_seconds: float = 1.0):
+    """Realized volatility of the mid price over the last ``window`` seconds"""
+    cache["request_count"] += 1
+    if not math.isfinite(sample_seconds) or sample_seconds <= 0:
+        raise HTTPException(status_code=400, detail="sample_seconds must be a positive number")
+    selected = _tick_window(instrument, window)
+    return _tick_response(selected, window, realized_volatility(selected["ticks"], sample_seconds))
+
+@app.get("/ticks/{instrument}/atr")
+@on_leader
+async def tick_atr(instrument: str, bar_seconds: float = 60, period: int = 14):
+    """Average true range of ``bar_seconds`` bars built from ticks (the last ``period`` bars)"""
+    cache["request_count"] += 1
+    if not math.isfinite(bar_seconds) or bar_seconds <= 0 or period < 1:
+        raise HTTPException(status_code=400, detail="bar_seconds and period must be positive numbers")
+    window = bar_seconds * (period + 1)  # one extra bar for the first true range's previous close
+    selected = _tick_window(instrument, window)
+    return _tick_response(selected, window,
+                          average_true_range(selected["ticks"], bar_seconds, period, selected["pip_size"]))
+
+# ===== PRICE ALERTS =====
+# Every stored tick is checked against the instrument's sorted thresholds;
+# triggered alerts wait in a deduplicating queue collected from /alerts/events.
+# Alerts live on the leader, which sees every tick; other workers forward to it
+alert_engine = AlertEngine(
+    queue=AlertQueue(max_size=int(os.getenv("ALERT_QUEUE_SIZE", "10000"))),
+    default_cooldown=float(os.getenv("ALERT_COOLDOWN", "60")),
+    max_alerts=int(os.getenv("ALERT_MAX", "200000")),
+    rsi_bar_seconds=int(os.getenv("ALERT_RSI_BAR_SECONDS", "60"))
+)
+tick_history.listeners.append(alert_engine.on_tick)
+
+class AlertRequest(BaseModel):
+    instrument: str
+    field: str = "bid"  # bid, ask, mid or rsi
+    condition: str = "crosses"  # above, below or crosses
+    threshold: float
+    cooldown: Optional[float] = None
+    once: bool = False
+    note: Optional[str] = None
+
+@app.post("/alerts", status_code=201)
+@on_leader
+async def create_alert(alert: AlertRequest):
+    """Register an alert, e.g. {"instrument": "EUR_USD", "field": "bid", "condition": "above", "threshold": 1.09}"""
+    instrument = alert.instrument.upper()
+    if instrument not in instrument_registry:
+        raise HTTPException(status_code=404, detail=f"Instrument {instrument} not found")
+    try:
+        created = alert_engine.add(instrument, alert.field.lower(), alert.condition.lower(), alert.threshold,
+                                   alert.cooldown, alert.once, alert.note)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "alert": created, "current": alert_engine.current(instrument, created["field"])}
+
+@app.get("/alerts")
+@on_leader
+async def list_alerts(instrument: Optional[str] = None, limit: int = 1000):
+    """Registered alerts (?instrument=EUR_USD for one instrument's)"""
+    alerts = alert_engine.list_alerts(instrument.upper() if instrument else None)
+    return {"status": "success", "total": len(alerts), "alerts": alerts[:max(0, limit)]}
+
+@app.get("/alerts/events")
+@on_leader
+async def alert_events(max_events: int = 100, wait: float = 0.0):
+    """Collect triggered alerts, oldest first; ?wait=N long-polls up to N seconds for the first one"""
+    events = await alert_engine.queue.get_batch(max(1, min(max_events, 1000)), max(0.0, min(wait, 30.0)))
+    return {"status": "success", "events": events, "pending": len(alert_engine.queue.pending)}
+
+@app.get("/alerts/{alert_id}")
+@on_leader
+async def get_alert(alert_id: int):
+    alert = alert_engine.get(alert_id)
+    if alert is None:
+        raise HTTPException(status_code=404, detail=f"Alert {alert_id} not found")
+    return {"status": "success", "alert": alert}
+
+@app.delete("/alerts/{alert_id}")
+@on_leader
+async def delete_alert(alert_id: int):
+    if not alert_engine.remove(alert_id):
+        raise HTTPException(status_code=404, detail=f"Alert {alert_id} not found")
+    return {"status": "success", "deleted": alert_id}
+
+# ===== CORRELATION & CURRENCY STRENGTH =====
+# Bar returns of every ticking instrument feed one rolling correlation matrix
+# (on the leader, which has the full tick stream)
+correlation_tracker = RollingCorrelation(
+    bar_seconds=float(os.getenv("CORRELATION_BAR_SECONDS", "60")),
+    window=int(os.getenv("CORRELATION_WINDOW", "120"))
+)
+tick_history.listeners.append(correlation_tracker.on_tick)
+
+@app.get("/correlation")
+@on_leader
+async def correlation_matrix(instruments: Optional[str] = None, min_abs: float = 0.7):
+    """Rolling return correlations between pairs, the strongly correlated ones, and currency strength"""
+    cache["request_count"] += 1
+    requested = _parse_instruments(instruments) if instruments else None
+    names, cov = correlation_tracker.covariance(requested)
+    _, corr = correlation_tracker.correlation(names)
+    _, returns = correlation_tracker.window_returns(names)
+    warming = [n for n in (requested or correlation_tracker.names) if n not in names]
+    return {
+        "status": "success",
+        "instruments": names,
+        "matrix": rounded_matrix(corr),
+        "correlated_pairs": correlated_pairs(names, corr, min_abs),
+        "currency_strength": currency_strength(names, returns, cov, instrument_registry.split),
+        "warming_up": warming,
+        "window": correlation_tracker.stats(),
+        "timestamp": int(time.time())
+    }
+
+@app.get("/news/sentiment")
+@on_leader
+async def news_sentiment(currencies: Optional[str] = None):
+    """Headline sentiment per currency (-1 to +1) from the leader's news corpus.
+
+    Only _news_loop fetches from NewsAPI; this reads what it last indexed.
+    """
+    cache["request_count"] += 1
+    names = _parse_instruments(currencies) if currencies else instrument_registry.currencies()
+    return {
+        "status": "success",
+        "sentiment": news_client.corpus.score_currencies(names),
+        "news": news_client.stats(),
+        "timestamp": int(time.time())
+    }
+
+# ===== SIGNAL SNAPSHOTS =====
+# A scheduler recomputes every instrument's signal and the dashboard when
+# prices or sentiment change (checked every SIGNAL_SNAPSHOT_INTERVAL seconds)
+# and publishes them as one pre-serialized version; requests just send bytes
+SNAPSHOT_INTERVAL = float(os.getenv("SIGNAL_SNAPSHOT_INTERVAL", "1.0"))
+SNAPSHOT_STALE_AFTER = max(10.0, 5 * SNAPSHOT_INTERVAL)  # past this, endpoints compute live again
+signal_snapshots = SignalSnapshots()
+snapshot_state: Dict[str, Any] = {"task": None, "inputs": None, "adopted": None}
+
+def snapshot_universe() -> List[str]:
+    return list(dict.fromkeys(price_feed.instruments + DASHBOARD_PAIRS))
+
+def _snapshot_response(key: str, request: Request) -> Optional[Response]:
+    if not signal_snapshots.is_fresh(SNAPSHOT_STALE_AFTER):
+        return None
+    return signal_snapshots.response(key, request.headers.get("if-none-match"))
+
+async def refresh_snapshot() -> bool:
+    """Publish a new snapshot version if its inputs changed; True when it did"""
+    snapshot = _leader_snapshot()
+    if snapshot and snapshot.get("signals"):
+        # Followers serve the leader's version, so every worker gives the same answer
+        signals = snapshot["signals"]
+        source = (snapshot["leader_pid"], signals["version"])
+        if source == snapshot_state["adopted"]:
+            signal_snapshots.touch()
+            return False
+        snapshot_state["adopted"] = source
+        signal_snapshots.publish(signals["payloads"], version=signals["version"])
+        return True
+    
+    instruments = snapshot_universe()
+    real_prices = await fetch_quotes(instruments)
+    sentiments = news_sentiments()
+    technicals = await technical_scores(instruments)
+    price_data = {i: _forex_payload(i, real_prices.get(i)) for i in instruments}
+    inputs = ({i: _bid_ask(p) for i, p in price_data.items() if p["status"] == "success"}, sentiments, technicals)
+    if inputs == snapshot_state["inputs"]:
+        signal_snapshots.touch()
+        return False
+    snapshot_state["inputs"] = inputs
+    analyses = {i: _analysis_payload(p, pair_sentiments(i, sentiments), technicals.get(i)) for i, p in price_data.items()}
+    payloads: Dict[str, Any] = {f"analysis:{i}": a for i, a in analyses.items()}
+    payloads["dashboard"] = _dashboard_payload(real_prices, analyses)
+    signal_snapshots.publish(payloads)
+    return True
+
+async def _snapshot_loop():
+    while True:
+        try:
+            await refresh_snapshot()
+        except Exception as e:
+            print(f"Signal snapshot error: {e}")
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+
+@app.on_event("startup")
+async def start_signal_snapshots():
+    snapshot_state["task"] = asyncio.create_task(_snapshot_loop())
+
+@app.on_event("shutdown")
+async def stop_signal_snapshots():
+    task = snapshot_state["task"]
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+# ===== LIVE PUSH (WebSocket / SSE) =====
+broadcaster = SignalBroadcaster(max_skipped=int(os.getenv("PUSH_MAX_SKIPPED", "200")))
+PUSH_INTERVAL = float(os.getenv("SIGNAL_PUSH_INTERVAL", "1.0"))
+PUSH_KEEPALIVE = 15.0
+push_state: Dict[str, Any] = {"task": None}
+
+def _bid_ask(price_data: Dict[str, Any]) -> Dict[str, float]:
+    data = price_data["data"]
+    if price_data["source"] == "oanda_live":
+        return {"bid": float(data["bids"][0]["price"]), "ask": float(data["asks"][0]["price"])}
+    return {"bid": data["bid"], "ask": data["ask"]}
+
+async def publish_signals():
+    """Compute price and signal once per watched instrument and fan out the changes"""
+    instruments = sorted(broadcaster.watched_instruments())
+    if not instruments:
+        return
+    real_prices = await fetch_quotes(instruments)
+    sentiments = news_sentiments()
+    technicals = await technical_scores(instruments)
+    for instrument in instruments:
+        price_data = _forex_payload(instrument, real_prices.get(instrument))
+        if price_data["status"] != "success":
+            continue
+        # Same signal the snapshot serves, when the instrument is in it
+        analysis = ((signal_snapshots.is_fresh(SNAPSHOT_STALE_AFTER) and signal_snapshots.payloads.get(f"analysis:{instrument}"))
+                    or _analysis_payload(price_data, pair_sentiments(instrument, sentiments), technicals.get(instrument)))
+        broadcaster.publish("price", instrument, dict(_bid_ask(price_data), source=price_data["source"]))
+        broadcaster.publish("signal", instrument, {
+            "signal": analysis["signal"],
+            "strength": analysis["strength"],
+            "score": analysis["score"]
+        })
+
+async def _push_loop():
+    while True:
+        try:
+            await publish_signals()
+        except Exception as e:
+            print(f"Signal push error: {e}")
+        await asyncio.sleep(PUSH_INTERVAL)
+
+@app.on_event("startup")
+async def start_signal_push():
+    push_state["task"] = asyncio.create_task(_push_loop())
+
+@app.on_event("shutdown")
+async def stop_signal_push():
+    task = push_state["task"]
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    for subscription in list(broadcaster.subscriptions.values()):
+        broadcaster.unsubscribe(subscription)
+
+def _push_subscription(instruments: str) -> Subscription:
+    return broadcaster.subscribe(_parse_instruments(instruments) or price_feed.instruments)
+
+@app.websocket("/ws/signals")
+async def signals_websocket(websocket: WebSocket, instruments: str = ""):
+    """Push price/signal changes; send {"subscribe": [...]} or {"unsubscribe": [...]} to adjust"""
+    await websocket.accept()
+    subscription = _push_subscription(instruments)
+    
+    async def receive_commands():
+        try:
+            while True:
+                command = await websocket.receive_json()
+                if command.get("subscribe"):
+                    broadcaster.add_instruments(subscription, _parse_instruments(",".join(command["subscribe"])))
+                if command.get("unsubscribe"):
+                    subscription.instruments -= set(_parse_instruments(",".join(command["unsubscribe"])))
+        except (WebSocketDisconnect, ValueError, AttributeError, TypeError):
+            pass
+        finally:
+            subscription.close()
+    
+    receiver = asyncio.create_task(receive_commands())
+    try:
+        while not subscription.closed:
+            for message in await subscription.next_batch(timeout=PUSH_KEEPALIVE):
+                await websocket.send_json(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        lagging = subscription.lagging
+        receiver.cancel()
+        broadcaster.unsubscribe(subscription)
+        if lagging:
+            try:
+                await websocket.close(code=1013, reason="client too slow")
+            except RuntimeError:
+                pass  # already closed by the client
+
+@app.get("/stream/signals")
+async def signals_sse(request: Request, instruments: str = ""):
+    """Server-Sent Events stream of price/signal changes (?instruments=EUR_USD,GBP_USD)"""
+    subscription = _push_subscription(instruments)
+    
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not subscription.closed and not await request.is_disconnected():
+                batch = await subscription.next_batch(timeout=PUSH_KEEPALIVE)
+                if not batch:
+                    yield ": keepalive\n\n"
+                for message in batch:
+                    yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ===== METRICS =====
+monitor.register_gauge("auraquant_quote_cache_hit_ratio", "Quote cache hit ratio since start.",
+                       lambda: quote_cache.stats()["hit_ratio"])
+monitor.register_gauge("auraquant_quote_cache_entries", "Quotes currently cached.",
+                       lambda: quote_cache.stats()["size"])
+monitor.register_gauge("auraquant_price_feed_stale", "1 when the streamed prices are stale.",
+                       lambda: feed_status()["stale"])
+monitor.register_gauge("auraquant_push_subscribers", "Open WebSocket/SSE subscriptions.",
+                       lambda: len(broadcaster.subscriptions))
+
+@app.on_event("startup")
+async def start_monitor():
+    monitor.start()
+
+@app.on_event("shutdown")
+async def stop_monitor():
+    await monitor.stop()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text-format metrics, summed over every worker of the deployment"""
+    exports = None
+    if shared_state is not None:
+        shared_state.store_metrics(monitor.export(worker=str(shared_state.slot)))  # our own, current
+        exports = shared_state.all_metrics()
+    return PlainTextResponse(monitor.render_prometheus(exports), media_type="text/plain; version=0.0.4")
+
+# ===== DEBUG TRACES =====
+# Only with TRACING_ENABLED=1: traces expose other clients' requests
+def _require_tracing():
+    if not tracer.enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.get("/debug/traces")
+async def debug_traces():
+    """Recent traced requests (send X-Trace: 1 or ?trace=1, or "profile" to also sample stacks)"""
+    _require_tracing()
+    return {"buffer_size": tracer.traces.maxlen, "traces": tracer.recent()}
+
+@app.get("/debug/traces/{trace_id}")
+async def debug_trace(trace_id: str):
+    _require_tracing()
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found (it may have left the ring buffer)")
+    return trace.to_dict()
+
+@app.get("/debug/traces/{trace_id}/collapsed")
+async def debug_trace_collapsed(trace_id: str):
+    """Collapsed stacks of a profiled trace, ready for flamegraph.pl or speedscope"""
+    _require_tracing()
+    trace = tracer.get(trace_id)
+    if trace is None or not trace.profile:
+        raise HTTPException(status_code=404, detail="No profiled trace with that id")
+    return PlainTextResponse(trace.collapsed())
+
 @app.get("/status")
 async def system_status():
     """Enhanced system status with OANDA info"""
+    stats = counters()
     return {
         "status": "operational",
         "version": "1.1.0",
-        "uptime_seconds": int(time.time() - cache["start_time"]),
-        "total_requests": cache["request_count"],
-        "oanda_connected": cache["real_data_enabled"],
-        "oanda_errors": cache["oanda_error_count"],
-        "memory_usage": "low",
-        "performance": "optimized"
+        "uptime_seconds": int(time.time() - stats["start_time"]),
+        "total_requests": stats["request_count"],
+        "oanda_connected": stats["real_data_enabled"],
+        "oanda_errors": stats["oanda_error_count"],
+        "circuit_breakers": breaker_states(),
+        "workers": {
+            "pid": os.getpid(),
+            "shared_state": shared_state is not None,
+            "leader": shared_state is None or shared_state.is_leader,
+            "live_workers": shared_state.workers() if shared_state is not None else [os.getpid()]
+        },
+        "instruments": instrument_registry.stats(),
+        "upstream_gateway": gateway.stats(),
+        "quote_cache": quote_cache.stats(),
+        "price_feed": feed_status(),
+        "tick_history": tick_history.stats(),
+        "alerts": alert_engine.stats(),
+        "correlation": correlation_tracker.stats(),
+        "push": broadcaster.stats(),
+        "signal_snapshot": signal_snapshots.stats(),
+        "news": dict(news_client.stats(), sentiment=dict(sentiment_board.stats(), **news_sentiments())),
+        "performance": monitor.get_stats()
     }
 
 print("✅ Real Data Integration Complete!")
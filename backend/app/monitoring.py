@@ -1,19 +1,305 @@
+import asyncio
+import os
+import resource
 import time
-from typing import Dict, Any
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Log-spaced bucket bounds, 2**(1/4) apart (~19%), from 0.1 ms to ~30 s
+BUCKET_BOUNDS = [0.0001 * 2 ** (i / 4) for i in range(73)]
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is a bisect and three increments"""
+
+    def __init__(self, bounds: List[float] = BUCKET_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    def export(self) -> Dict[str, Any]:
+        """JSON-safe state, non-empty buckets only"""
+        return {"counts": [[i, n] for i, n in enumerate(self.counts) if n], "sum": self.sum, "count": self.count}
+
+    def merge(self, exported: Dict[str, Any]):
+        """Add another histogram's exported observations (same bounds) into this one"""
+        for i, n in exported["counts"]:
+            self.counts[i] += n
+        self.count += exported["count"]
+        self.sum += exported["sum"]
+
+    def summary(self) -> Dict[str, Any]:
+        quantiles = {f"p{int(q * 100)}_ms": self.quantile(q) for q in QUANTILES}
+        return dict(
+            {key: round(value * 1000, 3) if value is not None else None for key, value in quantiles.items()},
+            count=self.count,
+            mean_ms=round(self.sum / self.count * 1000, 3) if self.count else None
+        )
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+def _format_float(value: float) -> str:
+    return repr(float(value)) if value == value else "NaN"
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
 
 class PerformanceMonitor:
+    """Request, upstream and runtime metrics for this worker process.
+
+    Everything is recorded with plain increments on preallocated structures:
+    there are no locks, and recording from the event loop thread (the
+    middleware and the async clients) is exact. Blocking clients running
+    in worker threads may, rarely, lose an increment under contention.
+
+    ``export`` and ``merge`` move the counters between processes, so one
+    worker can render the totals of every worker of a deployment.
+    """
+
     def __init__(self):
         self.start_time = time.time()
         self.requests = 0
-        
+        self.routes: Dict[Tuple[str, str], Histogram] = {}
+        self.statuses: Dict[Tuple[str, str, str], int] = {}
+        self.upstream: Dict[Tuple[str, str], Histogram] = {}
+        self.upstream_errors: Dict[Tuple[str, str], int] = {}
+        self.loop_lag = Histogram()
+        self.loop_lag_last = 0.0
+        self.loop_lag_max = 0.0
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self._lag_task: Optional[asyncio.Task] = None
+
     def track_request(self):
         self.requests += 1
-        
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        self.requests += 1
+        key = (method, route)
+        histogram = self.routes.get(key)
+        if histogram is None:
+            histogram = self.routes[key] = Histogram()
+        histogram.observe(seconds)
+        status_key = (method, route, f"{status // 100}xx")
+        self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+
+    def observe_upstream(self, service: str, endpoint: str, seconds: float, error: bool = False):
+        """Record one upstream call; ``error`` covers transport failures and error statuses"""
+        key = (service, endpoint)
+        histogram = self.upstream.get(key)
+        if histogram is None:
+            histogram = self.upstream[key] = Histogram()
+            self.upstream_errors[key] = 0
+        histogram.observe(seconds)
+        if error:
+            self.upstream_errors[key] += 1
+
+    def export(self, worker: str = "0") -> Dict[str, Any]:
+        """JSON-safe counters and histograms, plus this process's gauges at export time"""
+        gauges = {}
+        for name, (_, read) in list(self.gauges.items()):
+            try:
+                gauges[name] = float(read())
+            except Exception:
+                continue
+        return {
+            "worker": worker,
+            "requests": self.requests,
+            "routes": [[method, route, h.export()] for (method, route), h in list(self.routes.items())],
+            "statuses": [[*key, n] for key, n in list(self.statuses.items())],
+            "upstream": [[service, endpoint, h.export(), self.upstream_errors[(service, endpoint)]]
+                         for (service, endpoint), h in list(self.upstream.items())],
+            "loop_lag": self.loop_lag.export(),
+            "rss_bytes": rss_bytes(),
+            "start_time": self.start_time,
+            "gauges": gauges
+        }
+
+    def merge(self, exported: Dict[str, Any]):
+        """Add another monitor's exported counters and histograms into this one"""
+        self.requests += exported["requests"]
+        for method, route, histogram in exported["routes"]:
+            self.routes.setdefault((method, route), Histogram()).merge(histogram)
+        for method, route, status, n in exported["statuses"]:
+            self.statuses[(method, route, status)] = self.statuses.get((method, route, status), 0) + n
+        for service, endpoint, histogram, errors in exported["upstream"]:
+            self.upstream.setdefault((service, endpoint), Histogram()).merge(histogram)
+            self.upstream_errors[(service, endpoint)] = self.upstream_errors.get((service, endpoint), 0) + errors
+        self.loop_lag.merge(exported["loop_lag"])
+
+    def register_gauge(self, name: str, help_text: str, read: Callable[[], float]):
+        """Expose a value computed at scrape time (e.g. a cache hit ratio)"""
+        self.gauges[name] = (help_text, read)
+
+    async def _measure_loop_lag(self, interval: float):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - expected)
+            self.loop_lag.observe(lag)
+            self.loop_lag_last = lag
+            self.loop_lag_max = max(self.loop_lag_max, lag)
+
+    def start(self, interval: float = 0.5):
+        """Start sampling event-loop lag (how late a timer fires) on the running loop"""
+        if self._lag_task is None or self._lag_task.done():
+            self._lag_task = asyncio.get_running_loop().create_task(self._measure_loop_lag(interval))
+
+    async def stop(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            try:
+                await self._lag_task
+            except asyncio.CancelledError:
+                pass
+            self._lag_task = None
+
     def get_stats(self) -> Dict[str, Any]:
         return {
             "uptime_seconds": round(time.time() - self.start_time),
             "total_requests": self.requests,
-            "requests_per_minute": self.requests / max(1, (time.time() - self.start_time) / 60)
+            "requests_per_minute": self.requests / max(1, (time.time() - self.start_time) / 60),
+            "rss_mb": round(rss_bytes() / 1048576, 1),
+            "event_loop_lag_ms": {
+                "last": round(self.loop_lag_last * 1000, 3),
+                "max": round(self.loop_lag_max * 1000, 3),
+                "p99": round((self.loop_lag.quantile(0.99) or 0.0) * 1000, 3)
+            },
+            "routes": {f"{method} {route}": h.summary() for (method, route), h in self.routes.items()},
+            "upstream": {
+                f"{service} {endpoint}": dict(h.summary(), errors=self.upstream_errors[(service, endpoint)])
+                for (service, endpoint), h in self.upstream.items()
+            }
         }
 
+    @staticmethod
+    def _histogram_lines(name: str, labels: Dict[str, str], histogram: Histogram) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, n in zip(histogram.bounds, histogram.counts):
+            cumulative += n
+            lines.append(f"{name}_bucket{{{_labels(**labels, le=f'{bound:.6g}')}}} {cumulative}")
+        lines.append(f'{name}_bucket{{{_labels(**labels, le="+Inf")}}} {histogram.count}')
+        lines.append(f"{name}_sum{{{_labels(**labels)}}} {_format_float(histogram.sum)}")
+        lines.append(f"{name}_count{{{_labels(**labels)}}} {histogram.count}")
+        return lines
+
+    def render_prometheus(self, exports: Optional[List[Dict[str, Any]]] = None) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4).
+
+        Given ``exports`` (one per worker, this one's included), counters and
+        histograms are summed over all of them and per-process values carry
+        a ``worker`` label for each live worker.
+        """
+        total = self
+        if exports is not None:
+            total = PerformanceMonitor()
+            for exported in exports:
+                total.merge(exported)
+        lines = [
+            "# HELP auraquant_http_request_duration_seconds Time to response headers per route.",
+            "# TYPE auraquant_http_request_duration_seconds histogram"
+        ]
+        for (method, route), histogram in list(total.routes.items()):
+            lines += self._histogram_lines("auraquant_http_request_duration_seconds",
+                                           {"method": method, "route": route}, histogram)
+        lines += ["# HELP auraquant_http_responses_total Responses per route and status class.",
+                  "# TYPE auraquant_http_responses_total counter"]
+        for (method, route, status), n in list(total.statuses.items()):
+            lines.append(f"auraquant_http_responses_total{{{_labels(method=method, route=route, status=status)}}} {n}")
+
+        lines += ["# HELP auraquant_upstream_request_duration_seconds Upstream API call latency.",
+                  "# TYPE auraquant_upstream_request_duration_seconds histogram"]
+        for (service, endpoint), histogram in list(total.upstream.items()):
+            lines += self._histogram_lines("auraquant_upstream_request_duration_seconds",
+                                           {"service": service, "endpoint": endpoint}, histogram)
+        lines += ["# HELP auraquant_upstream_errors_total Failed upstream API calls.",
+                  "# TYPE auraquant_upstream_errors_total counter"]
+        for (service, endpoint), n in list(total.upstream_errors.items()):
+            lines.append(f"auraquant_upstream_errors_total{{{_labels(service=service, endpoint=endpoint)}}} {n}")
+
+        lines += ["# HELP auraquant_event_loop_lag_seconds How late event-loop timers fire.",
+                  "# TYPE auraquant_event_loop_lag_seconds histogram"]
+        lines += self._histogram_lines("auraquant_event_loop_lag_seconds", {}, total.loop_lag)
+
+        processes = [e for e in exports if e.get("live", True)] if exports is not None else [self.export()]
+
+        def per_process(name: str, help_text: str, read: Callable[[Dict[str, Any]], Optional[float]]):
+            samples = [(e, read(e)) for e in processes]
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge"])
+            for exported, value in samples:
+                if value is not None:
+                    labels = f"{{{_labels(worker=exported['worker'])}}}" if exports is not None else ""
+                    lines.append(f"{name}{labels} {_format_float(value)}")
+
+        per_process("process_resident_memory_bytes", "Resident memory size in bytes.", lambda e: e["rss_bytes"])
+        per_process("process_start_time_seconds", "Start time of the process since unix epoch in seconds.",
+                    lambda e: e["start_time"])
+        for name, (help_text, _) in list(self.gauges.items()):
+            per_process(name, help_text, lambda e, name=name: e["gauges"].get(name))
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by route template, not raw path"""
+
+    def __init__(self, app, monitor: "PerformanceMonitor"):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        recorded = False
+
+        def record(status: int):
+            nonlocal recorded
+            recorded = True
+            # FastAPI stores the matched route in the scope during routing
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.monitor.observe_request(scope["method"], route, status, time.perf_counter() - started)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and not recorded:
+                # Time to headers, so long-lived streams (SSE) don't swamp the histogram
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not recorded:
+                record(500)
+            raise
+
 monitor = PerformanceMonitor()
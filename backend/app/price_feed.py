@@ -0,0 +1,135 @@
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.clients.async_oanda import AsyncOANDAClient
+from app.storage.ticks import TickHistory
+
+class PriceFeed:
+    """Background ingestion of the OANDA pricing stream into a latest-tick table.
+
+    One long-lived streaming connection keeps ``ticks`` current for a fixed
+    instrument universe, so endpoints can read prices without a network round
+    trip; with a ``history`` every tick is also kept in its ring buffer. The
+    feed reconnects with jittered exponential backoff and flags itself stale
+    when no message (price or heartbeat) arrived recently. Heartbeats only
+    prove the connection is alive, so each instrument's tick also expires
+    on its own once it is ``stale_after`` seconds old.
+    """
+
+    def __init__(self, instruments: List[str], stream_client: AsyncOANDAClient,
+                 stale_after: float = 10.0, min_backoff: float = 0.5, max_backoff: float = 30.0,
+                 history: Optional[TickHistory] = None):
+        self.instruments = instruments
+        self.stream_client = stream_client
+        self.history = history
+        self.stale_after = stale_after
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.ticks: Dict[str, Dict[str, Any]] = {}
+        self.tick_times: Dict[str, float] = {}
+        self.last_message_at = 0.0
+        self.connected = False
+        self.reconnects = 0
+        self.messages = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+        await self.stream_client.aclose()
+
+    async def _run(self):
+        backoff = self.min_backoff
+        while True:
+            try:
+                await self._consume()
+                self.last_error = "stream closed by upstream"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Price feed error: {self.last_error}")
+            self.connected = False
+            # Healthy connections reset the backoff; repeated failures double it
+            if time.monotonic() - self.last_message_at < self.stale_after:
+                backoff = self.min_backoff
+            await asyncio.sleep(random.uniform(0, backoff))
+            backoff = min(self.max_backoff, backoff * 2)
+            self.reconnects += 1
+
+    async def _consume(self):
+        async with self.stream_client.stream_pricing(self.instruments) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise httpx.HTTPStatusError(
+                    f"stream returned {response.status_code}",
+                    request=response.request, response=response
+                )
+            self.connected = True
+            async for line in response.aiter_lines():
+                if line:
+                    self.handle_message(json.loads(line))
+
+    def handle_message(self, message: Dict[str, Any]):
+        """Apply one stream message (PRICE or HEARTBEAT) to the tick table"""
+        now = time.monotonic()
+        self.last_message_at = now
+        self.messages += 1
+        if message.get("type") == "PRICE" and "instrument" in message:
+            self.ticks[message["instrument"]] = message
+            self.tick_times[message["instrument"]] = now
+            if self.history is not None:
+                self.history.record_quote(message)
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self.last_message_at > self.stale_after
+
+    def _is_fresh(self, instrument: str, now: float) -> bool:
+        return now - self.tick_times.get(instrument, float("-inf")) <= self.stale_after
+
+    def latest(self, instrument: str) -> Optional[Dict[str, Any]]:
+        """Latest streamed price, or None when unknown, too old or the feed has fallen behind"""
+        return self.latest_many([instrument]).get(instrument)
+
+    def latest_many(self, instruments: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fresh streamed prices; instruments left out fall through to REST"""
+        if self.is_stale():
+            return {}
+        now = time.monotonic()
+        return {i: self.ticks[i] for i in instruments if i in self.ticks and self._is_fresh(i, now)}
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "running": self.running,
+            "connected": self.connected,
+            "stale": self.is_stale(),
+            "instruments": len(self.instruments),
+            "instruments_with_ticks": len(self.ticks),
+            "instruments_with_stale_ticks": sum(not self._is_fresh(i, now) for i in self.ticks),
+            "seconds_since_message": round(now - self.last_message_at, 3) if self.last_message_at else None,
+            "tick_age_seconds": {i: round(now - t, 3) for i, t in self.tick_times.items()},
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,122 @@
+import asyncio
+import itertools
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+UpdateKey = Tuple[str, str]  # (kind, instrument)
+
+class Subscription:
+    """One push client's instrument set and its conflated pending updates.
+
+    Pending updates are keyed by (kind, instrument), so a slow consumer only
+    ever holds the newest update per key: memory stays bounded and the client
+    is downsampled instead of queueing every intermediate value.
+    """
+
+    def __init__(self, subscription_id: int, instruments: Iterable[str], max_skipped: int):
+        self.id = subscription_id
+        self.instruments: Set[str] = set(instruments)
+        self.max_skipped = max_skipped
+        self.pending: Dict[UpdateKey, Dict[str, Any]] = {}
+        self.skipped = 0
+        self.delivered = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def offer(self, key: UpdateKey, message: Dict[str, Any]):
+        if key in self.pending:
+            self.skipped += 1  # overwritten since the client last read
+        self.pending[key] = message
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()  # wake the consumer so it notices
+
+    @property
+    def lagging(self) -> bool:
+        return self.skipped > self.max_skipped
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Wait for pending updates and drain them; [] on timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        batch = list(self.pending.values())
+        self.pending.clear()
+        self.skipped = 0
+        self.delivered += len(batch)
+        return batch
+
+class SignalBroadcaster:
+    """Fan-out of price/signal updates to subscribed push clients.
+
+    Each update is computed once and offered to every matching subscriber, and
+    only values that changed since the last publish are sent at all. Clients
+    that let more than ``max_skipped`` updates be overwritten between two
+    reads are dropped.
+    """
+
+    def __init__(self, max_skipped: int = 200):
+        self.max_skipped = max_skipped
+        self.subscriptions: Dict[int, Subscription] = {}
+        self.last_published: Dict[UpdateKey, Dict[str, Any]] = {}
+        self.published = 0
+        self.unchanged = 0
+        self.dropped_clients = 0
+        self._ids = itertools.count(1)
+
+    def subscribe(self, instruments: Iterable[str]) -> Subscription:
+        subscription = Subscription(next(self._ids), [], self.max_skipped)
+        self.subscriptions[subscription.id] = subscription
+        # Prime the new client with the current values it asked for
+        self.add_instruments(subscription, instruments)
+        return subscription
+
+    def add_instruments(self, subscription: Subscription, instruments: Iterable[str]):
+        new = set(instruments) - subscription.instruments
+        subscription.instruments |= new
+        for key, message in self.last_published.items():
+            if key[1] in new:
+                subscription.offer(key, message)
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        self.subscriptions.pop(subscription.id, None)
+
+    def watched_instruments(self) -> Set[str]:
+        watched: Set[str] = set()
+        for subscription in self.subscriptions.values():
+            watched |= subscription.instruments
+        return watched
+
+    def publish(self, kind: str, instrument: str, value: Dict[str, Any]) -> int:
+        """Offer an update to subscribers if it changed; returns the fan-out count"""
+        key = (kind, instrument)
+        if self.last_published.get(key, {}).get("data") == value:
+            self.unchanged += 1
+            return 0
+        message = {"type": kind, "instrument": instrument, "data": value}
+        self.last_published[key] = message
+        self.published += 1
+
+        fanout = 0
+        for subscription in list(self.subscriptions.values()):
+            if instrument not in subscription.instruments:
+                continue
+            subscription.offer(key, message)
+            fanout += 1
+            if subscription.lagging:
+                self.dropped_clients += 1
+                self.unsubscribe(subscription)
+        return fanout
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscriptions),
+            "watched_instruments": len(self.watched_instruments()),
+            "published": self.published,
+            "unchanged_skipped": self.unchanged,
+            "dropped_clients": self.dropped_clients
+        }
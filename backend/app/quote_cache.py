@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+BatchFetcher = Callable[[List[str]], Awaitable[Dict[str, Any]]]
+
+class QuoteCache:
+    """TTL + LRU cache for quotes keyed by instrument, with request coalescing.
+
+    Concurrent misses for the same instrument share one in-flight fetch, so a
+    burst of identical requests costs a single upstream call.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_size: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh cached value (refreshing its LRU position) or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_many(self, keys: List[str], fetch_many: BatchFetcher) -> Dict[str, Any]:
+        """Resolve keys from cache, joining in-flight fetches and batching the rest.
+
+        ``fetch_many`` receives only the keys nobody is fetching yet and returns
+        a dict of the values it found; missing keys are not cached.
+        """
+        results: Dict[str, Any] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        missing: List[str] = []
+
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                results[key] = value
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[key] = self._inflight[key]
+            else:
+                self.misses += 1
+                missing.append(key)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            self._inflight.update(futures)
+            fetched: Dict[str, Any] = {}
+            try:
+                fetched = await fetch_many(missing) or {}
+                for key, value in fetched.items():
+                    if value is not None:
+                        self.set(key, value)
+            finally:
+                # Waiters always get an answer, even if the leader failed
+                for key, future in futures.items():
+                    self._inflight.pop(key, None)
+                    if not future.done():
+                        future.set_result(fetched.get(key))
+            for key in missing:
+                if fetched.get(key) is not None:
+                    results[key] = fetched[key]
+
+        for key, future in waiting.items():
+            # shield: a cancelled waiter must not cancel the shared fetch
+            value = await asyncio.shield(future)
+            if value is not None:
+                results[key] = value
+
+        return results
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+        }
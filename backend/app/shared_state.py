@@ -0,0 +1,298 @@
+import asyncio
+import fcntl
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Per-worker counters, one row of float64s per worker slot
+SLOT_FIELDS = ["pid", "heartbeat", "request_count", "oanda_error_count", "last_oanda_success", "real_data_enabled"]
+LEADER_SOCKET = "leader.sock"  # Unix socket the leader answers other workers' requests on
+HEADER_BYTES = 64  # blob sequence number and length, then the rate limit bucket, padded
+BLOB_HEADER = struct.Struct("QQ")  # sequence number (odd while a write is in progress), length
+BUCKET_FIELDS = 2  # upstream token bucket: tokens, last refill (time.monotonic(), system-wide on Linux)
+
+def _process_started(pid: int) -> str:
+    """Start time of a process (clock ticks since boot), so a reused pid gets a new name"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return "0"
+
+def default_directory() -> str:
+    """Per-deployment directory: uvicorn workers share their supervisor's pid and start time"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    ppid = os.getppid()
+    return os.path.join(base, f"auraquant-{ppid}-{_process_started(ppid)}")
+
+class SharedState:
+    """State shared by the uvicorn workers of one deployment through a memory-mapped file.
+
+    Every worker owns a slot of counters it alone writes, so counting needs
+    no locks; readers sum the slots. One worker at a time holds the leader
+    lock: it fetches prices and publishes a JSON snapshot (quotes, breaker
+    states, feed status) that the other workers read. The snapshot is
+    guarded by a sequence lock, so readers never see a half-written one.
+    Each slot also has a metrics blob, written only by its worker, from
+    which any worker can render metrics for the whole deployment. The
+    upstream rate limit's token bucket lives in the header under its own
+    record lock, so the deployment as a whole keeps to it. State that
+    only the leader holds (its tick stream, alerts) is reached through the
+    leader's Unix socket: one JSON request and one JSON reply per connection.
+    Slots and leadership are POSIX record locks, released by the kernel
+    when a worker dies, so a surviving worker takes over. The last worker
+    to close removes the files.
+    """
+
+    def __init__(self, directory: str, max_workers: int = 64, blob_size: int = 1 << 20,
+                 metrics_size: int = 1 << 17):
+        self.directory = Path(directory)
+        self.max_workers = max_workers
+        self.blob_size = blob_size
+        self.metrics_size = metrics_size
+        self.slot: Optional[int] = None
+        self.is_leader = False
+        self._map: Optional[mmap.mmap] = None
+        self._lock_fd: Optional[int] = None
+        self._base: Dict[str, float] = {}
+        self._cached_seq = -1
+        self._cached: Optional[Dict[str, Any]] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def _slots_offset(self) -> int:
+        return HEADER_BYTES
+
+    @property
+    def _blob_offset(self) -> int:
+        return HEADER_BYTES + self.max_workers * len(SLOT_FIELDS) * 8
+
+    def _metrics_header(self, slot: int) -> int:
+        return self._blob_offset + self.blob_size + slot * (BLOB_HEADER.size + self.metrics_size)
+
+    def open(self):
+        """Map the state file and claim a free worker slot"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        size = self._metrics_header(self.max_workers)
+        fd = os.open(self.directory / "state.bin", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)  # new pages read as zeros
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self._slots = memoryview(self._map)[self._slots_offset:self._blob_offset].cast("d")
+        self._bucket = memoryview(self._map)[BLOB_HEADER.size:BLOB_HEADER.size + 8 * BUCKET_FIELDS].cast("d")
+
+        # Record locks live on a separate file: closing any descriptor of a
+        # file drops all of this process's locks on it
+        self._lock_fd = os.open(self.directory / "locks", os.O_RDWR | os.O_CREAT, 0o600)
+        for slot in range(self.max_workers):
+            if self._try_lock(slot):
+                self.slot = slot
+                break
+        if self.slot is None:
+            raise RuntimeError(f"All {self.max_workers} shared state slots are taken")
+        # A slot freed by a dead worker keeps its totals; keep counting from them
+        self._base = {field: self._column(field)[self.slot] for field in ("request_count", "oanda_error_count")}
+        self._set_field("pid", os.getpid())
+        self.heartbeat()
+
+    def _try_lock(self, offset: int) -> bool:
+        try:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, offset)
+            return True
+        except OSError:
+            return False
+
+    def _try_lock_all(self) -> bool:
+        try:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 0, 0)
+            return True
+        except OSError:
+            return False
+
+    def _remove_files(self):
+        for name in ("state.bin", "locks", LEADER_SOCKET):
+            try:
+                os.unlink(self.directory / name)
+            except FileNotFoundError:
+                pass
+        try:
+            self.directory.rmdir()
+        except OSError:
+            pass  # not empty: someone else's files share the directory
+
+    @contextmanager
+    def locked_bucket(self) -> Iterator[memoryview]:
+        """Exclusive use of the shared (tokens, last refill) pair; hold it only for the arithmetic"""
+        offset = self.max_workers + 1
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, offset)
+        try:
+            yield self._bucket
+        finally:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, offset)
+
+    def try_lead(self) -> bool:
+        """Become the ingestion leader if no live worker is"""
+        if not self.is_leader:
+            self.is_leader = self._try_lock(self.max_workers)
+        return self.is_leader
+
+    def _set_field(self, field: str, value: float, slot: Optional[int] = None):
+        row = self.slot if slot is None else slot
+        self._slots[row * len(SLOT_FIELDS) + SLOT_FIELDS.index(field)] = float(value)
+
+    def _column(self, field: str) -> List[float]:
+        index = SLOT_FIELDS.index(field)
+        return [self._slots[slot * len(SLOT_FIELDS) + index] for slot in range(self.max_workers)]
+
+    def heartbeat(self):
+        self._set_field("heartbeat", time.time())
+
+    def store_counters(self, counters: Dict[str, Any]):
+        """Copy this worker's own counters into its slot"""
+        for field in ("request_count", "oanda_error_count"):
+            self._set_field(field, self._base[field] + counters[field])
+        for field in ("last_oanda_success", "real_data_enabled"):
+            self._set_field(field, counters[field])
+        self.heartbeat()
+
+    def counters(self) -> Dict[str, Any]:
+        """Counters across all workers, past and present"""
+        return {
+            "request_count": int(sum(self._column("request_count"))),
+            "oanda_error_count": int(sum(self._column("oanda_error_count"))),
+            "last_oanda_success": max(self._column("last_oanda_success")),
+            "real_data_enabled": any(self._column("real_data_enabled"))
+        }
+
+    def workers(self, within: float = 10.0) -> List[int]:
+        """Pids of workers that heartbeated in the last ``within`` seconds"""
+        now = time.time()
+        return [int(pid) for pid, beat in zip(self._column("pid"), self._column("heartbeat"))
+                if pid and now - beat < within]
+
+    def _write_blob(self, header: int, start: int, data: bytes):
+        """Sequence-locked write of the blob at ``start`` described by ``header``"""
+        seq, _ = BLOB_HEADER.unpack_from(self._map, header)
+        seq += seq % 2  # a previous writer may have died mid-write
+        BLOB_HEADER.pack_into(self._map, header, seq + 1, len(data))  # odd: write in progress
+        self._map[start:start + len(data)] = data
+        BLOB_HEADER.pack_into(self._map, header, seq + 2, len(data))
+
+    def _read_blob(self, header: int, start: int, known_seq: int = -1) -> Tuple[int, Optional[bytes]]:
+        """(sequence, data) of a consistent read; data is None when the sequence is ``known_seq``"""
+        for _ in range(100):
+            seq, length = BLOB_HEADER.unpack_from(self._map, header)
+            if seq == known_seq:
+                return seq, None
+            if seq % 2:
+                continue  # writer mid-write
+            data = self._map[start:start + length]
+            if BLOB_HEADER.unpack_from(self._map, header)[0] == seq:
+                return seq, data
+        return known_seq, None
+
+    def publish(self, snapshot: Dict[str, Any]):
+        """Leader only: replace the shared snapshot"""
+        data = json.dumps(snapshot, separators=(",", ":")).encode()
+        if len(data) > self.blob_size:
+            raise ValueError(f"Shared snapshot of {len(data)} bytes exceeds {self.blob_size}")
+        self._write_blob(0, self._blob_offset, data)
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest published snapshot, decoded once per version; None before the first"""
+        seq, data = self._read_blob(0, self._blob_offset, self._cached_seq)
+        if data is not None:
+            self._cached = json.loads(data) if seq else None
+            self._cached_seq = seq
+        return self._cached
+
+    def store_metrics(self, metrics: Dict[str, Any]):
+        """Replace this worker's metrics blob"""
+        data = json.dumps(metrics, separators=(",", ":")).encode()
+        if len(data) > self.metrics_size:
+            raise ValueError(f"Metrics of {len(data)} bytes exceed {self.metrics_size}")
+        header = self._metrics_header(self.slot)
+        self._write_blob(header, header + BLOB_HEADER.size, data)
+
+    def slot_metrics(self, slot: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Metrics last stored in a slot (by default our own, left there by a worker that died)"""
+        header = self._metrics_header(self.slot if slot is None else slot)
+        seq, data = self._read_blob(header, header + BLOB_HEADER.size)
+        return json.loads(data) if seq and data else None
+
+    def all_metrics(self, within: float = 10.0) -> List[Dict[str, Any]]:
+        """Every slot's metrics, past workers' included, marked ``live`` if it heartbeated in ``within`` s"""
+        now = time.time()
+        heartbeats = self._column("heartbeat")
+        exports = []
+        for slot in range(self.max_workers):
+            metrics = self.slot_metrics(slot)
+            if metrics is not None:
+                exports.append(dict(metrics, live=now - heartbeats[slot] < within))
+        return exports
+
+    async def serve(self, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]):
+        """Leader only: answer other workers' requests with ``handler``"""
+        path = self.directory / LEADER_SOCKET
+        try:
+            os.unlink(path)  # left by a leader that died
+        except FileNotFoundError:
+            pass
+
+        async def answer(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                reply = await handler(json.loads(await reader.readline()))
+                writer.write(json.dumps(reply, separators=(",", ":")).encode())
+                await writer.drain()
+            except Exception as e:
+                print(f"Leader request failed: {e}")  # the asker sees an empty reply
+            finally:
+                writer.close()
+
+        self._server = await asyncio.start_unix_server(answer, path=str(path))
+
+    async def stop_serving(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def ask_leader(self, request: Dict[str, Any], timeout: float = 10.0) -> Dict[str, Any]:
+        """The leader's reply to ``request``; OSError or TimeoutError when no leader answers"""
+        async def exchange() -> bytes:
+            reader, writer = await asyncio.open_unix_connection(str(self.directory / LEADER_SOCKET))
+            try:
+                writer.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+                return await reader.read()  # the leader closes after replying
+            finally:
+                writer.close()
+
+        data = await asyncio.wait_for(exchange(), timeout)
+        if not data:
+            raise ConnectionError("Leader closed the connection without a reply")
+        return json.loads(data)
+
+    def close(self):
+        if self._lock_fd is not None:
+            # Our own locks never conflict, so the whole file locks only when no other worker holds one
+            if self._try_lock_all():
+                self._remove_files()
+            os.close(self._lock_fd)  # releases slot and leadership
+            self._lock_fd = None
+        self.is_leader = False
+        self._cached = None
+        if self._map is not None:
+            self._slots.release()
+            self._bucket.release()
+            self._map.close()
+            self._map = None
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi.responses import Response
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header value"""
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+class SignalSnapshots:
+    """The latest signal payloads, versioned and serialized once per version.
+
+    A scheduler publishes every payload (one per instrument plus the
+    dashboard) as a new version; requests only look up bytes and an ETag.
+    The ETag hashes the body, so a payload that did not change between
+    versions keeps its ETag and clients polling it keep getting 304s.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.published_at = 0.0
+        self.checked_at = 0.0
+        self.payloads: Dict[str, Any] = {}
+        self._bodies: Dict[str, Tuple[bytes, str]] = {}
+        self.served = 0
+        self.not_modified = 0
+
+    def publish(self, payloads: Dict[str, Any], version: Optional[int] = None) -> int:
+        bodies = {}
+        for key, payload in payloads.items():
+            body = json.dumps(payload, separators=(",", ":")).encode()
+            bodies[key] = (body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"')
+        # Swap whole dicts so requests never see half a version
+        self.payloads, self._bodies = payloads, bodies
+        self.version = version if version is not None else self.version + 1
+        self.published_at = self.checked_at = time.time()
+        return self.version
+
+    def touch(self):
+        """The scheduler looked and nothing changed: the current version is still current"""
+        self.checked_at = time.time()
+
+    def is_fresh(self, within: float) -> bool:
+        return self.version > 0 and time.time() - self.checked_at < within
+
+    def response(self, key: str, if_none_match: Optional[str] = None) -> Optional[Response]:
+        """Pre-serialized body (or a bodyless 304) for ``key``; None when it is not in the snapshot"""
+        entry = self._bodies.get(key)
+        if entry is None:
+            return None
+        body, etag = entry
+        headers = {"ETag": etag, "X-Snapshot-Version": str(self.version), "Cache-Control": "no-cache"}
+        if if_none_match and etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        self.served += 1
+        return Response(body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "entries": len(self._bodies),
+            "published_at": self.published_at or None,
+            "checked_at": self.checked_at or None,
+            "served": self.served,
+            "not_modified": self.not_modified
+        }
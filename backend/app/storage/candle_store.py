@@ -0,0 +1,175 @@
+import fcntl
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Fixed-width columns, one append-only file each. Times are epoch nanoseconds.
+COLUMNS: Dict[str, np.dtype] = {
+    "time": np.dtype(np.int64),
+    "bid_o": np.dtype(np.float64),
+    "bid_h": np.dtype(np.float64),
+    "bid_l": np.dtype(np.float64),
+    "bid_c": np.dtype(np.float64),
+    "ask_o": np.dtype(np.float64),
+    "ask_h": np.dtype(np.float64),
+    "ask_l": np.dtype(np.float64),
+    "ask_c": np.dtype(np.float64),
+    "volume": np.dtype(np.int64)
+}
+
+GRANULARITY_SECONDS = {
+    "S5": 5, "S10": 10, "S15": 15, "S30": 30,
+    "M1": 60, "M2": 120, "M4": 240, "M5": 300, "M10": 600, "M15": 900, "M30": 1800,
+    "H1": 3600, "H2": 7200, "H3": 10800, "H4": 14400, "H6": 21600, "H8": 28800, "H12": 43200,
+    "D": 86400, "W": 604800, "M": 2678400
+}
+
+def columns_to_frame(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Bid OHLC + volume DataFrame from candle columns"""
+    if len(columns["time"]) == 0:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        'time': pd.to_datetime(np.asarray(columns["time"]), utc=True),
+        'open': columns["bid_o"],
+        'high': columns["bid_h"],
+        'low': columns["bid_l"],
+        'close': columns["bid_c"],
+        'volume': columns["volume"]
+    })
+
+class CandleStore:
+    """On-disk candle history per instrument and granularity.
+
+    Each column lives in its own append-only file of fixed-width values, so
+    reads are zero-copy ``np.memmap`` views and appends never rewrite old data.
+    A crash between column writes is repaired on the next append by trimming
+    every column to the shortest one. Writers take an exclusive ``flock`` on
+    the series' lock file and readers a shared one, so worker processes
+    syncing the same series never interleave appends or read a half-replaced
+    history.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        # (instrument, granularity, column) -> (inode, map); a replace elsewhere gives a new inode
+        self._maps: Dict[Tuple[str, str, str], Tuple[int, np.memmap]] = {}
+
+    def _dir(self, instrument: str, granularity: str) -> Path:
+        return self.root / instrument / granularity
+
+    def _path(self, instrument: str, granularity: str, column: str) -> Path:
+        return self._dir(instrument, granularity) / f"{column}.bin"
+
+    @contextmanager
+    def _locked(self, instrument: str, granularity: str, shared: bool = False) -> Iterator[None]:
+        directory = self._dir(instrument, granularity)
+        if shared and not directory.exists():
+            yield  # nothing stored yet, nothing to guard
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield  # closing the file releases the lock
+
+    def length(self, instrument: str, granularity: str) -> int:
+        """Number of complete rows (the shortest column wins)"""
+        sizes = []
+        for column, dtype in COLUMNS.items():
+            path = self._path(instrument, granularity, column)
+            sizes.append(path.stat().st_size // dtype.itemsize if path.exists() else 0)
+        return min(sizes)
+
+    def last_time(self, instrument: str, granularity: str) -> Optional[int]:
+        with self._locked(instrument, granularity, shared=True):
+            return self._last_time(instrument, granularity)
+
+    def _last_time(self, instrument: str, granularity: str) -> Optional[int]:
+        n = self.length(instrument, granularity)
+        if n == 0:
+            return None
+        return int(self._column(instrument, granularity, "time", n)[n - 1])
+
+    def _column(self, instrument: str, granularity: str, column: str, n: int) -> np.ndarray:
+        if n == 0:
+            return np.empty(0, dtype=COLUMNS[column])
+        key = (instrument, granularity, column)
+        path = self._path(instrument, granularity, column)
+        inode = path.stat().st_ino
+        cached = self._maps.get(key)
+        if cached is None or cached[0] != inode or len(cached[1]) < n:
+            cached = (inode, np.memmap(path, dtype=COLUMNS[column], mode="r"))
+            self._maps[key] = cached
+        return cached[1][:n]
+
+    def _repair(self, instrument: str, granularity: str) -> int:
+        n = self.length(instrument, granularity)
+        for column, dtype in COLUMNS.items():
+            path = self._path(instrument, granularity, column)
+            if path.exists() and path.stat().st_size != n * dtype.itemsize:
+                os.truncate(path, n * dtype.itemsize)
+                self._maps.pop((instrument, granularity, column), None)
+        return n
+
+    def append(self, instrument: str, granularity: str, columns: Dict[str, np.ndarray]) -> int:
+        """Append rows newer than the last stored candle; returns rows written"""
+        with self._locked(instrument, granularity):
+            return self._append(instrument, granularity, columns)
+
+    def _append(self, instrument: str, granularity: str, columns: Dict[str, np.ndarray]) -> int:
+        self._repair(instrument, granularity)
+
+        times = np.asarray(columns["time"], dtype=np.int64)
+        last = self._last_time(instrument, granularity)
+        keep = np.ones(len(times), dtype=bool) if last is None else times > last
+        if len(times) > 1:
+            keep[1:] &= np.diff(times) > 0  # history must stay strictly increasing
+        if not keep.any():
+            return 0
+
+        for column, dtype in COLUMNS.items():
+            values = np.ascontiguousarray(np.asarray(columns[column], dtype=dtype)[keep])
+            with open(self._path(instrument, granularity, column), "ab") as f:
+                f.write(values.tobytes())
+        return int(keep.sum())
+
+    def replace(self, instrument: str, granularity: str, columns: Dict[str, np.ndarray]) -> int:
+        """Discard stored history and write ``columns`` instead (used to extend backwards)"""
+        with self._locked(instrument, granularity):
+            for column in COLUMNS:
+                path = self._path(instrument, granularity, column)
+                if path.exists():
+                    path.unlink()  # readers keep their maps of the old file
+                self._maps.pop((instrument, granularity, column), None)
+            return self._append(instrument, granularity, columns)
+
+    def read(self, instrument: str, granularity: str, last: Optional[int] = None,
+             start_ns: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy column views, optionally the ``last`` N rows or rows from ``start_ns`` on"""
+        with self._locked(instrument, granularity, shared=True):
+            n = self.length(instrument, granularity)
+            data = {column: self._column(instrument, granularity, column, n) for column in COLUMNS}
+        begin = 0
+        if start_ns is not None:
+            begin = int(np.searchsorted(data["time"], start_ns, side="left"))
+        if last is not None:
+            begin = max(begin, n - last)
+        return {column: values[begin:] for column, values in data.items()}
+
+    def to_frame(self, instrument: str, granularity: str, last: Optional[int] = None) -> pd.DataFrame:
+        """Bid OHLC frame in the shape ``ForexDataClient.get_historical_data`` returns"""
+        return columns_to_frame(self.read(instrument, granularity, last=last))
+
+    def is_current(self, instrument: str, granularity: str, now_ns: int) -> bool:
+        """True when no newer candle can have closed since the last stored one"""
+        last = self.last_time(instrument, granularity)
+        if last is None or granularity not in GRANULARITY_SECONDS:
+            return False
+        # A stored candle opened at `last`; the next one closes two periods later
+        return now_ns < last + 2 * GRANULARITY_SECONDS[granularity] * 1_000_000_000
+
+# Global store
+candle_store = CandleStore(os.getenv("CANDLE_STORE_DIR", "data/candles"))
@@ -0,0 +1,128 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+TICK_COLUMNS = ("time", "bid", "ask")
+
+TickListener = Callable[[str, float, float, float], None]  # (instrument, time, bid, ask)
+
+class TickRing:
+    """Fixed-capacity tick history for one instrument in preallocated float64 columns.
+
+    Every tick is written twice, at ``pos`` and ``pos + capacity``, so the
+    newest ``n`` ticks are always one contiguous slice: appends are O(1),
+    windows are zero-copy views, and memory never grows past
+    ``2 * capacity * 3 * 8`` bytes however long the feed runs.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros((len(TICK_COLUMNS), 2 * capacity), dtype=np.float64)
+        self.pos = 0
+        self.count = 0
+        self.appended = 0
+
+    def append(self, timestamp: float, bid: float, ask: float) -> float:
+        """Store a tick; returns the time it was stored under"""
+        data, pos = self._data, self.pos
+        if self.count and timestamp < data[0, pos + self.capacity - 1]:
+            timestamp = data[0, pos + self.capacity - 1]  # keep times sorted through clock steps
+        data[:, pos] = data[:, pos + self.capacity] = (timestamp, bid, ask)
+        self.pos = (pos + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.appended += 1
+        return timestamp
+
+    def __len__(self) -> int:
+        return self.count
+
+    def last(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Views of the newest ``n`` ticks (all held ticks by default), oldest first"""
+        n = self.count if n is None else max(0, min(n, self.count))
+        end = self.pos + self.capacity
+        return {column: self._data[i, end - n:end] for i, column in enumerate(TICK_COLUMNS)}
+
+    def since(self, start: float) -> Dict[str, np.ndarray]:
+        """Views of the ticks at or after ``start`` (epoch seconds)"""
+        times = self.last()["time"]
+        return self.last(len(times) - int(np.searchsorted(times, start, side="left")))
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+class TickHistory:
+    """Tick rings for the instrument universe, allocated on an instrument's first tick.
+
+    ``record_quote`` takes OANDA price objects from any source (stream,
+    REST or the leader's snapshot) and skips quotes it has already seen, so
+    the same quote arriving through several paths is stored once. Each
+    stored tick is passed on to the ``listeners``.
+    """
+
+    def __init__(self, capacity: int = 4096, max_instruments: int = 256):
+        self.capacity = capacity
+        self.max_instruments = max_instruments
+        self.rings: Dict[str, TickRing] = {}
+        self._last_quote: Dict[str, str] = {}
+        self.listeners: List[TickListener] = []
+        self.dropped = 0
+
+    def ring(self, instrument: str) -> Optional[TickRing]:
+        return self.rings.get(instrument)
+
+    def record(self, instrument: str, bid: float, ask: float, timestamp: Optional[float] = None) -> bool:
+        ring = self.rings.get(instrument)
+        if ring is None:
+            if len(self.rings) >= self.max_instruments:
+                self.dropped += 1
+                return False
+            ring = self.rings[instrument] = TickRing(self.capacity)
+        stored_at = ring.append(time.time() if timestamp is None else timestamp, bid, ask)
+        for listener in self.listeners:
+            listener(instrument, stored_at, bid, ask)
+        return True
+
+    def record_quote(self, quote: Dict[str, Any]) -> bool:
+        """Store an OANDA price (``bids``/``asks`` books); False for repeats and unusable quotes"""
+        instrument, quote_time = quote.get("instrument"), quote.get("time")
+        if not instrument or (quote_time is not None and self._last_quote.get(instrument) == quote_time):
+            return False
+        try:
+            bid, ask = float(quote["bids"][0]["price"]), float(quote["asks"][0]["price"])
+        except (KeyError, IndexError, TypeError, ValueError):
+            return False
+        if quote_time is not None:
+            self._last_quote[instrument] = quote_time
+        return self.record(instrument, bid, ask)
+
+    def window(self, instrument: str, seconds: float) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the instrument's ticks from the last ``seconds``"""
+        ring = self.rings.get(instrument)
+        if ring is None:
+            return {column: np.empty(0) for column in TICK_COLUMNS}
+        return ring.since(time.time() - seconds)
+
+    def coverage(self, instrument: str) -> Tuple[int, Optional[float]]:
+        """(ticks held, seconds they span)"""
+        ring = self.rings.get(instrument)
+        if ring is None or not len(ring):
+            return 0, None
+        times = ring.last()["time"]
+        return len(times), float(times[-1] - times[0])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "instruments": len(self.rings),
+            "capacity_per_instrument": self.capacity,
+            "max_instruments": self.max_instruments,
+            "ticks_held": sum(len(ring) for ring in self.rings.values()),
+            "ticks_recorded": sum(ring.appended for ring in self.rings.values()),
+            "memory_bytes": sum(ring.nbytes for ring in self.rings.values()),
+            "memory_limit_bytes": self.max_instruments * 2 * self.capacity * len(TICK_COLUMNS) * 8,
+            "dropped": self.dropped
+        }
+
+    def instruments(self) -> List[str]:
+        return sorted(self.rings)
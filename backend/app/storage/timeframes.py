@@ -0,0 +1,150 @@
+import os
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+from zoneinfo import ZoneInfo
+
+from app.storage.candle_store import COLUMNS, GRANULARITY_SECONDS
+
+# Timeframes up to a day (W and M follow calendar rules, so they are not built here)
+RESAMPLABLE = [g for g, seconds in GRANULARITY_SECONDS.items() if seconds <= 86400]
+
+# OANDA starts D and multi-hour candles at dailyAlignment o'clock in alignmentTimezone
+# (17:00 New York by default); resampled buckets use the same clock to match its bars
+DAILY_ALIGNMENT = int(os.getenv("CANDLE_DAILY_ALIGNMENT", "17"))
+ALIGNMENT_TIMEZONE = os.getenv("CANDLE_ALIGNMENT_TIMEZONE", "America/New_York")
+ALIGNMENT_ZONE = ZoneInfo(ALIGNMENT_TIMEZONE)
+HOUR_NS = 3600 * 1_000_000_000
+DAY_NS = 24 * HOUR_NS
+
+# UTC day -> zone offsets at its first and last instant
+_day_offsets: Dict[int, Tuple[int, int]] = {}
+
+def _period_ns(granularity: str) -> int:
+    if granularity not in RESAMPLABLE:
+        raise ValueError(f"Cannot resample to {granularity}; supported: {', '.join(RESAMPLABLE)}")
+    return GRANULARITY_SECONDS[granularity] * 1_000_000_000
+
+def check_timeframes(base: str, timeframes: List[str]) -> None:
+    """Raise ValueError unless every timeframe is a whole multiple of ``base``"""
+    base_ns = _period_ns(base)
+    for timeframe in timeframes:
+        period = _period_ns(timeframe)
+        if period < base_ns or period % base_ns:
+            raise ValueError(f"{timeframe} is not a multiple of the {base} base granularity")
+
+def _utc_offset(ns: int) -> int:
+    return int(datetime.fromtimestamp(ns // 1_000_000_000, ALIGNMENT_ZONE).utcoffset().total_seconds()) * 1_000_000_000
+
+def _utc_offsets(times: np.ndarray) -> np.ndarray:
+    """Offset of ``ALIGNMENT_ZONE`` from UTC at each time, looked up once per UTC day"""
+    days = times // DAY_NS
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(days)) + 1, [len(times)]))
+    offsets = np.empty(len(times), dtype=np.int64)
+    for begin, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        day = int(days[begin])
+        edges = _day_offsets.get(day)
+        if edges is None:
+            edges = _day_offsets[day] = (_utc_offset(day * DAY_NS), _utc_offset((day + 1) * DAY_NS - 1))
+        if edges[0] == edges[1]:
+            offsets[begin:end] = edges[0]
+        else:  # the clocks change today
+            offsets[begin:end] = [_utc_offset(t) for t in times[begin:end].tolist()]
+    return offsets
+
+def bucket_times(times: np.ndarray, granularity: str) -> np.ndarray:
+    """Start (epoch ns, UTC) of the ``granularity`` bucket each time falls in.
+
+    Up to H1 buckets sit on the UTC grid. Longer ones are laid out on the
+    wall clock of ``ALIGNMENT_TIMEZONE`` from ``DAILY_ALIGNMENT`` o'clock, so
+    they move with daylight saving time like OANDA's own candles.
+    """
+    period = _period_ns(granularity)
+    if period <= HOUR_NS:
+        return times - times % period
+    offsets = _utc_offsets(times)
+    wall = times + offsets
+    wall_buckets = wall - (wall - DAILY_ALIGNMENT * HOUR_NS) % period
+    # Back to UTC with the offset at each bucket's start, which differs from
+    # its candles' when the clocks change inside the bucket
+    firsts = np.concatenate(([0], np.flatnonzero(np.diff(wall_buckets)) + 1))
+    guesses = wall_buckets[firsts] - offsets[firsts]
+    starts = wall_buckets[firsts] - _utc_offsets(guesses)
+    return np.repeat(starts, np.diff(np.append(firsts, len(times))))
+
+def resample_columns(columns: Dict[str, np.ndarray], granularity: str) -> Dict[str, np.ndarray]:
+    """Aggregate candle columns into ``granularity`` buckets (see ``bucket_times``).
+
+    Opens come from each bucket's first candle, closes from its last, highs
+    and lows are the extremes and volumes add up; the newest bucket may be
+    still forming. Vectorized with ``ufunc.reduceat`` over bucket starts.
+    """
+    times = np.asarray(columns["time"], dtype=np.int64)
+    if len(times) == 0:
+        return {column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+    buckets = bucket_times(times, granularity)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.concatenate((starts[1:], [len(times)])) - 1
+    result = {"time": buckets[starts]}
+    for side in ("bid", "ask"):
+        result[f"{side}_o"] = np.asarray(columns[f"{side}_o"])[starts]
+        result[f"{side}_h"] = np.maximum.reduceat(np.asarray(columns[f"{side}_h"]), starts)
+        result[f"{side}_l"] = np.minimum.reduceat(np.asarray(columns[f"{side}_l"]), starts)
+        result[f"{side}_c"] = np.asarray(columns[f"{side}_c"])[ends]
+    result["volume"] = np.add.reduceat(np.asarray(columns["volume"], dtype=np.int64), starts)
+    return result
+
+class TimeframeAggregator:
+    """Higher-timeframe candles kept in step with a base granularity's history.
+
+    Each update only re-aggregates base candles from the start of the newest
+    (possibly incomplete) higher-timeframe bucket instead of the whole base
+    history. Splicing that tail onto the cached frame still copies the
+    resampled rows once (``np.concatenate``), but there are only 1/ratio as
+    many of those as base candles.
+    """
+
+    def __init__(self):
+        # (instrument, base, timeframe) -> (resampled columns, last base time folded in)
+        self._frames: Dict[Tuple[str, str, str], Tuple[Dict[str, np.ndarray], int]] = {}
+        self.full_builds = 0
+        self.incremental_updates = 0
+
+    def update(self, instrument: str, base: str, timeframe: str,
+               base_columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Resampled columns for ``timeframe`` given the full base history"""
+        key = (instrument, base, timeframe)
+        times = base_columns["time"]
+        if len(times) == 0:
+            self._frames.pop(key, None)
+            return resample_columns(base_columns, timeframe)
+        last_base = int(times[-1])
+        cached = self._frames.get(key)
+        if cached is not None:
+            frame, folded = cached
+            if folded == last_base:
+                return frame
+            tail_start = int(frame["time"][-1]) if len(frame["time"]) else None
+            # Usable only if the base history still covers the cached buckets and grew forward
+            if tail_start is not None and folded < last_base and int(times[0]) <= tail_start:
+                begin = int(np.searchsorted(times, tail_start, side="left"))
+                tail = resample_columns({c: base_columns[c][begin:] for c in COLUMNS}, timeframe)
+                frame = {c: np.concatenate((frame[c][:-1], tail[c])) for c in COLUMNS}
+                self._frames[key] = (frame, last_base)
+                self.incremental_updates += 1
+                return frame
+        frame = resample_columns(base_columns, timeframe)
+        self._frames[key] = (frame, last_base)
+        self.full_builds += 1
+        return frame
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "series": len(self._frames),
+            "full_builds": self.full_builds,
+            "incremental_updates": self.incremental_updates
+        }
+
+# Global aggregator
+timeframe_aggregator = TimeframeAggregator()
@@ -0,0 +1,245 @@
+"""Opt-in per-request tracing spans and a sampling profiler.
+
+Tracing is off unless the tracer is enabled (TRACING_ENABLED=1): traces
+hold other clients' request paths and the profiler runs a sampling
+thread, so neither is for public deployments. When enabled, a request is
+traced when it carries ``X-Trace: 1`` or ``?trace=1``; with ``profile``
+instead of ``1`` the event-loop thread is also sampled into collapsed
+stacks for flame graphs. Untraced requests pay one context variable
+lookup per ``span()``.
+"""
+import contextvars
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import parse_qs
+
+_current: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+
+class Trace:
+    """Timed spans of one request, plus stack samples when profiling"""
+
+    def __init__(self, method: str, path: str, profile: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.profile = profile
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self.duration = None
+        self.status = None
+        self.spans: List[Dict[str, Any]] = []
+        self.samples: Counter = Counter()
+        self._depth = 0
+
+    def totals(self) -> Dict[str, float]:
+        """Milliseconds per span name, summed over repeats"""
+        totals: Dict[str, float] = {}
+        for s in self.spans:
+            totals[s["name"]] = round(totals.get(s["name"], 0.0) + s["duration_ms"], 3)
+        return totals
+
+    def collapsed(self) -> str:
+        """Samples as ``frame;frame;frame count`` lines (flamegraph.pl / speedscope input)"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def to_dict(self, spans: bool = True) -> Dict[str, Any]:
+        result = {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "stages_ms": self.totals()
+        }
+        if spans:
+            result["spans"] = self.spans
+        if self.profile:
+            result["profile_samples"] = sum(self.samples.values())
+        return result
+
+class _Span:
+    __slots__ = ("trace", "name", "started", "depth")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.trace._depth
+        self.trace._depth += 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ended = time.perf_counter()
+        self.trace._depth -= 1
+        self.trace.spans.append({
+            "name": self.name,
+            "start_ms": round((self.started - self.trace._origin) * 1000, 3),
+            "duration_ms": round((ended - self.started) * 1000, 3),
+            "depth": self.depth
+        })
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(name: str):
+    """Time a pipeline stage when the current request is traced; a no-op otherwise"""
+    trace = _current.get()
+    return _NULL_SPAN if trace is None else _Span(trace, name)
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every ``interval`` seconds into the active profiled traces.
+
+    Requests share the event-loop thread, so concurrent profiled requests
+    each see every sample taken while they were in flight.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._active = ()  # tuple swapped whole, so the sampler never sees it mid-update
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[int] = None
+        self._wake = threading.Event()
+
+    def add(self, trace: Trace):
+        self._target = threading.get_ident()
+        self._active = self._active + (trace,)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def remove(self, trace: Trace):
+        self._active = tuple(t for t in self._active if t is not trace)
+
+    @staticmethod
+    def _stack(frame) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(frames))
+
+    def _run(self):
+        while True:
+            if not self._active:
+                self._wake.wait()  # idle until a profiled request starts
+                self._wake.clear()
+                continue
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                stack = self._stack(frame)
+                for trace in self._active:
+                    trace.samples[stack] += 1
+            del frame
+            time.sleep(self.interval)
+
+class Tracer:
+    """Keeps the most recent finished traces in a bounded ring buffer"""
+
+    def __init__(self, buffer_size: int = 200, profile_dir: Optional[str] = None,
+                 profile_interval: float = 0.005, enabled: bool = False):
+        self.enabled = enabled
+        self.traces: Deque[Trace] = deque(maxlen=buffer_size)
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.profiler = SamplingProfiler(profile_interval)
+
+    def start(self, method: str, path: str, profile: bool = False) -> Trace:
+        trace = Trace(method, path, profile)
+        if profile:
+            self.profiler.add(trace)
+        return trace
+
+    def finish(self, trace: Trace, status: Optional[int]):
+        trace.duration = time.perf_counter() - trace._origin
+        trace.status = status
+        if trace.profile:
+            self.profiler.remove(trace)
+            if self.profile_dir is not None and trace.samples:
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                (self.profile_dir / f"{trace.id}.collapsed").write_text(trace.collapsed())
+        self.traces.append(trace)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        return next((t for t in self.traces if t.id == trace_id), None)
+
+    def recent(self) -> List[Dict[str, Any]]:
+        return [t.to_dict(spans=False) for t in reversed(self.traces)]
+
+def _requested_mode(scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == b"x-trace":
+            return value.decode("latin-1").strip().lower()
+    if b"trace=" in scope.get("query_string", b""):
+        values = parse_qs(scope["query_string"].decode("latin-1")).get("trace")
+        if values:
+            return values[-1].strip().lower()
+    return None
+
+class TracingMiddleware:
+    """ASGI middleware starting a trace when requested.
+
+    Stage timings go back in a ``Server-Timing`` header (shown by browser
+    dev tools) with the trace id in ``X-Trace-Id``; the full trace stays in
+    the tracer's ring buffer.
+    """
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        mode = _requested_mode(scope) if self.tracer.enabled and scope["type"] == "http" else None
+        if mode not in ("1", "true", "profile"):
+            await self.app(scope, receive, send)
+            return
+
+        trace = self.tracer.start(scope["method"], scope["path"], profile=mode == "profile")
+        token = _current.set(trace)
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = ", ".join(f"{name};dur={ms}" for name, ms in trace.totals().items())
+                headers = list(message.get("headers", [])) + [(b"x-trace-id", trace.id.encode())]
+                if timing:
+                    headers.append((b"server-timing", timing.encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self.tracer.finish(trace, status)
+
+# Global tracer
+tracer = Tracer(
+    buffer_size=int(os.getenv("TRACE_BUFFER_SIZE", "200")),
+    profile_dir=os.getenv("PROFILE_DIR") or None,
+    profile_interval=float(os.getenv("PROFILE_INTERVAL", "0.005")),
+    enabled=os.getenv("TRACING_ENABLED", "0") == "1"
+)
@@ -0,0 +1,93 @@
+"""Alert drill: per-tick cost of checking 100k registered alerts.
+
+Registers ``--alerts`` price alerts spread over ``--instruments`` pairs,
+with thresholds scattered around each price, then replays random-walk ticks
+through TickHistory (ring buffer + alert engine) and reports the per-tick
+latency, the sustainable tick rate against ``--rate`` and how many alerts
+fired. A linear scan over the same alerts is timed for comparison.
+
+    cd backend && python -m benchmarks.bench_alerts --alerts 100000
+"""
+import argparse
+import statistics
+import time
+from typing import List
+
+import numpy as np
+
+from app.alerts import AlertEngine, AlertQueue
+from app.storage.ticks import TickHistory
+
+def _linear_scan(alerts: List[dict], instrument: str, previous: float, value: float) -> int:
+    """What checking a tick costs without the index: every alert, every tick"""
+    fired = 0
+    for alert in alerts:
+        if alert["instrument"] != instrument:
+            continue
+        threshold = alert["threshold"]
+        if previous < threshold <= value or value <= threshold < previous:
+            fired += 1
+    return fired
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--alerts", type=int, default=100000)
+    parser.add_argument("--instruments", type=int, default=28)
+    parser.add_argument("--ticks", type=int, default=50000, help="ticks replayed")
+    parser.add_argument("--rate", type=float, default=2000.0, help="target ticks per second over all pairs")
+    parser.add_argument("--cooldown", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(5)
+    instruments = [f"P{i:02d}_USD" for i in range(args.instruments)]
+    prices = {name: float(rng.uniform(0.6, 1.6)) for name in instruments}
+    engine = AlertEngine(queue=AlertQueue(max_size=args.alerts), default_cooldown=args.cooldown,
+                         max_alerts=args.alerts)
+    history = TickHistory(capacity=4096, max_instruments=args.instruments)
+    history.listeners.append(engine.on_tick)
+
+    started = time.perf_counter()
+    names = rng.choice(instruments, args.alerts)
+    offsets = rng.normal(0, 0.002, args.alerts)  # most thresholds within ~20 pips of the price
+    fields = rng.choice(["bid", "ask", "mid"], args.alerts)
+    conditions = rng.choice(["above", "below", "crosses"], args.alerts)
+    for name, offset, field, condition in zip(names, offsets, fields, conditions):
+        engine.add(str(name), str(field), str(condition), prices[name] * (1 + offset))
+    registered = time.perf_counter() - started
+
+    # 0.2 pip-ish random-walk steps, 1 pip spread
+    walk = rng.normal(0, 2e-5, args.ticks)
+    picks = rng.integers(0, args.instruments, args.ticks)
+    latencies = []
+    clock = time.time()
+    for step, pick in zip(walk, picks):
+        name = instruments[pick]
+        prices[name] *= 1 + step
+        clock += 1 / args.rate
+        tick_started = time.perf_counter()
+        history.record(name, prices[name] - 5e-5, prices[name] + 5e-5, clock)
+        latencies.append(time.perf_counter() - tick_started)
+
+    alerts = engine.list_alerts()
+    scans = []
+    for _ in range(20):
+        name = instruments[int(rng.integers(0, args.instruments))]
+        scan_started = time.perf_counter()
+        _linear_scan(alerts, name, prices[name], prices[name] * 1.0001)
+        scans.append(time.perf_counter() - scan_started)
+
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    print(f"alerts registered      {args.alerts} over {args.instruments} pairs in {registered:.2f} s")
+    print(f"ticks replayed         {args.ticks}")
+    print(f"per tick  p50 / p99    {latencies[len(latencies) // 2] * 1e6:.1f} / "
+          f"{latencies[int(len(latencies) * 0.99)] * 1e6:.1f} us (mean {mean * 1e6:.1f} us)")
+    print(f"sustainable tick rate  {1 / mean:,.0f}/s vs target {args.rate:,.0f}/s "
+          f"({1 / mean / args.rate:.0f}x headroom)")
+    print(f"linear scan per tick   {statistics.median(scans) * 1e6:,.0f} us")
+    print(f"alerts                 {engine.stats()}")
+    if 1 / mean < args.rate:
+        raise SystemExit("alert checks cannot keep up with the target tick rate")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Load benchmark: concurrent /forex requests against a stub OANDA server.
+
+Compares the async pooled client used by the app with the old pattern of a
+blocking ``requests.get`` inside an ``async def`` route. With the blocking
+path a burst of N requests takes roughly N x upstream latency; with the
+async path it stays close to a single upstream latency.
+
+    cd backend && python -m benchmarks.bench_async_oanda
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+import requests
+from fastapi import FastAPI
+
+from benchmarks.stub_oanda import create_stub_app, free_port, serve_in_thread, stop_servers
+
+def create_blocking_app(base_url: str) -> FastAPI:
+    """The pre-async request path, kept here only as a comparison baseline"""
+    blocking = FastAPI()
+
+    @blocking.get("/forex/{instrument}")
+    async def get_forex(instrument: str):
+        response = requests.get(
+            f"{base_url}/accounts/101-001-36257109-001/pricing?instruments={instrument}",
+            headers={"Authorization": "Bearer stub"},
+            timeout=5
+        )
+        return response.json()["prices"][0]
+
+    return blocking
+
+async def _burst(base_url: str, concurrency: int) -> Dict[str, float]:
+    async with httpx.AsyncClient(timeout=60) as client:
+        async def one(n: int) -> float:
+            # Distinct instruments so the quote cache cannot coalesce the burst
+            started = time.perf_counter()
+            response = await client.get(f"{base_url}/forex/BENCH_{n}_{time.monotonic_ns()}")
+            response.raise_for_status()
+            return time.perf_counter() - started
+
+        await one(-1)  # warm the connection pools
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(one(n) for n in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    latencies = sorted(latencies)
+    return {
+        "wall_ms": wall * 1000,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "max_ms": latencies[-1] * 1000
+    }
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latencies", default="0.02,0.05,0.1,0.2",
+                        help="comma-separated upstream latencies in seconds")
+    args = parser.parse_args(argv)
+
+    stub = create_stub_app()
+    stub_port = free_port()
+    base_url = f"http://127.0.0.1:{stub_port}/v3"
+    os.environ["OANDA_API_KEY"] = "stub"
+    os.environ["OANDA_BASE_URL"] = base_url
+    os.environ["PRICE_FEED_ENABLED"] = "0"  # measure the request path, not the stream
+
+    from app.main import app  # imported after the env points at the stub
+
+    app_port, blocking_port = free_port(), free_port()
+    servers = [
+        serve_in_thread(stub, stub_port),
+        serve_in_thread(app, app_port),
+        serve_in_thread(create_blocking_app(base_url), blocking_port)
+    ]
+
+    print(f"concurrency={args.concurrency}")
+    print(f"{'upstream':>9} {'path':>9} {'wall ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    try:
+        for latency in (float(x) for x in args.latencies.split(",")):
+            stub.state.latency = latency
+            for name, port in (("async", app_port), ("blocking", blocking_port)):
+                result = asyncio.run(_burst(f"http://127.0.0.1:{port}", args.concurrency))
+                print(f"{latency * 1000:>7.0f}ms {name:>9} {result['wall_ms']:>9.1f} "
+                      f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['max_ms']:>9.1f}")
+    finally:
+        stop_servers(servers)
+
+if __name__ == "__main__":
+    main()
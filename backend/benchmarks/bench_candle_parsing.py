@@ -0,0 +1,71 @@
+"""Candle payload parsing: legacy per-candle loop vs NumPy column decoders.
+
+Uses a 5,000-candle bid/ask fixture in OANDA's compact layout and compares
+the original ``get_historical_data`` loop (json + dict per candle +
+DataFrame) with the decoded-JSON column path and the raw-bytes fast path.
+
+    cd backend && python -m benchmarks.bench_candle_parsing
+"""
+import argparse
+import json
+import time
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from app.clients.candle_parser import _parse_fixed_layout, columns_from_candles, parse_candles
+from benchmarks.stub_oanda import stub_candles
+
+def candle_fixture(count: int = 5000) -> bytes:
+    payload = {"instrument": "EUR_USD", "granularity": "M1", "candles": stub_candles("EUR_USD", "M1", count)}
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+def legacy_parse(raw: bytes) -> pd.DataFrame:
+    """The original parsing loop from ForexDataClient.get_historical_data"""
+    data = []
+    for candle in json.loads(raw)['candles']:
+        if candle['complete']:
+            data.append({
+                'time': candle['time'],
+                'open': float(candle['bid']['o']),
+                'high': float(candle['bid']['h']),
+                'low': float(candle['bid']['l']),
+                'close': float(candle['bid']['c']),
+                'volume': candle['volume']
+            })
+    return pd.DataFrame(data)
+
+def _time(fn: Callable, raw: bytes, repeats: int) -> float:
+    fn(raw)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn(raw)
+    return (time.perf_counter() - started) / repeats
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candles", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    raw = candle_fixture(args.candles)
+    fast = _parse_fixed_layout(raw)
+    general = columns_from_candles(json.loads(raw)['candles'])
+    if fast is None or any(not np.array_equal(fast[k], general[k]) for k in general):
+        raise SystemExit("fast path did not reproduce the JSON decode")
+
+    cases = [
+        ("legacy loop + DataFrame", legacy_parse),
+        ("json + columns", lambda body: columns_from_candles(json.loads(body)['candles'])),
+        ("raw bytes fast path", parse_candles)
+    ]
+    print(f"{args.candles} candles, {len(raw) / 1e6:.2f} MB payload")
+    baseline = None
+    for name, fn in cases:
+        elapsed = _time(fn, raw, args.repeats)
+        baseline = baseline or elapsed
+        print(f"{name:>24}: {elapsed * 1000:8.2f} ms  ({baseline / elapsed:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Outage drill: /forex latency while a stub OANDA fails, with the circuit breaker.
+
+Runs healthy -> outage (slow 503s) -> recovery against the stub and reports
+per-phase latency and data source. Once the breaker opens, requests should
+fall back to mock data immediately instead of waiting on upstream, and a
+half-open probe should bring live data back after the outage ends.
+
+    cd backend && python -m benchmarks.bench_circuit_breaker
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.stub_oanda import create_stub_app, free_port, serve_in_thread, stop_servers
+
+def _phase(client: httpx.Client, requests: int) -> Dict[str, Any]:
+    latencies, sources = [], []
+    for _ in range(requests):
+        started = time.perf_counter()
+        body = client.get("/forex/EUR_USD").json()
+        latencies.append((time.perf_counter() - started) * 1000)
+        sources.append(body["source"])
+    state = client.get("/health").json()["circuit_breakers"]["pricing"]
+    return {"latencies": latencies, "sources": sources, "state": state}
+
+def _report(name: str, result: Dict[str, Any]):
+    latencies = result["latencies"]
+    live = result["sources"].count("oanda_live")
+    print(f"{name:>9} {statistics.median(latencies):>8.1f} {max(latencies):>8.1f} "
+          f"{live:>5}/{len(latencies):<4} {result['state']:>10}")
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--outage-latency", type=float, default=1.0, help="seconds before each failing 503")
+    parser.add_argument("--open-seconds", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    stub = create_stub_app(latency=0.01)
+    stub_port = free_port()
+    os.environ.update({
+        "OANDA_API_KEY": "stub",
+        "OANDA_BASE_URL": f"http://127.0.0.1:{stub_port}/v3",
+        "PRICE_FEED_ENABLED": "0",
+        "QUOTE_CACHE_TTL": "0",  # every request goes through the breaker
+        "OANDA_BREAKER_OPEN_SECONDS": str(args.open_seconds)
+    })
+    from app.main import app  # imported after the env points at the stub
+
+    app_port = free_port()
+    servers = [serve_in_thread(stub, stub_port), serve_in_thread(app, app_port)]
+    print(f"{'phase':>9} {'p50 ms':>8} {'max ms':>8} {'live':>10} {'breaker':>10}")
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{app_port}", timeout=30) as client:
+            healthy = _phase(client, args.requests)
+            _report("healthy", healthy)
+
+            stub.state.latency, stub.state.fail_rate = args.outage_latency, 1.0
+            outage = _phase(client, args.requests)
+            _report("outage", outage)
+
+            stub.state.latency, stub.state.fail_rate = 0.01, 0.0
+            time.sleep(args.open_seconds)
+            recovery = _phase(client, args.requests)
+            _report("recovery", recovery)
+    finally:
+        stop_servers(servers)
+
+    # Calls until the breaker opens: min_calls failures, each possibly retried once
+    tail = outage["latencies"][10:]
+    problems = []
+    if outage["state"] != "open" or max(tail) > 100:
+        problems.append("outage requests kept waiting on upstream after the breaker should have opened")
+    if recovery["state"] != "closed" or recovery["sources"][-1] != "oanda_live":
+        problems.append("breaker did not close again after the outage")
+    if problems:
+        raise SystemExit("; ".join(problems))
+
+if __name__ == "__main__":
+    main()
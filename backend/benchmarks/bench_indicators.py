@@ -0,0 +1,98 @@
+"""Batch vs incremental indicators: equivalence check and per-candle cost.
+
+For each history size, checks that ``IncrementalIndicators`` reproduces
+the batch ``TechnicalAnalyzer`` values at every bar of a trailing sample,
+then times the cost of refreshing RSI/MACD/Bollinger for one new candle:
+a full batch recomputation vs one O(1) incremental update.
+
+    cd backend && python -m benchmarks.bench_indicators
+"""
+import argparse
+import math
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from app.analysis.incremental import IncrementalIndicators
+from app.analysis.technical_analyzer import TechnicalAnalyzer
+
+def random_candles(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.08 * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+    spread = np.abs(rng.normal(0, 0.0003, n))
+    return pd.DataFrame({'close': close, 'high': close + spread, 'low': close - spread})
+
+def _same(a, b, tol: float) -> bool:
+    if isinstance(a, dict):
+        return all(_same(a[k], b[k], tol) for k in a)
+    if (isinstance(a, float) and math.isnan(a)) or (isinstance(b, float) and math.isnan(b)):
+        return (isinstance(a, float) and math.isnan(a)) and (isinstance(b, float) and math.isnan(b))
+    return abs(a - b) <= tol
+
+def check_equivalence(candles: pd.DataFrame, sample: int) -> int:
+    """Compare incremental and batch values at each of the last ``sample`` bars"""
+    analyzer = TechnicalAnalyzer()
+    state = IncrementalIndicators()
+    start = len(candles) - sample
+    mismatches = 0
+    for i, (close, high, low) in enumerate(candles[['close', 'high', 'low']].itertuples(index=False)):
+        state.update(close, high, low)
+        if i < start:
+            continue
+        prefix = candles.iloc[:i + 1]
+        pairs = [
+            (analyzer.calculate_rsi(prefix['close']), state.rsi(), 0.011),
+            (analyzer.calculate_macd(prefix['close']), state.macd(), 1.1e-5),
+            (analyzer.calculate_bollinger_bands(prefix['close']), state.bollinger_bands(), 1.1e-3),
+            (analyzer.calculate_support_resistance(prefix), state.support_resistance(), 1.1e-5)
+        ]
+        for batch, incremental, tol in pairs:
+            if not _same(batch, incremental, tol):
+                mismatches += 1
+                print(f"  mismatch at bar {i}: batch={batch} incremental={incremental}")
+    return mismatches
+
+def time_per_candle(candles: pd.DataFrame, repeats: int) -> List[float]:
+    analyzer = TechnicalAnalyzer()
+    closes = candles['close']
+    started = time.perf_counter()
+    for _ in range(repeats):
+        analyzer.calculate_rsi(closes)
+        analyzer.calculate_macd(closes)
+        analyzer.calculate_bollinger_bands(closes)
+    batch = (time.perf_counter() - started) / repeats
+
+    state = IncrementalIndicators().seed(candles)
+    last = float(closes.iloc[-1])
+    started = time.perf_counter()
+    for _ in range(repeats):
+        state.update(last)
+        state.rsi()
+        state.macd()
+        state.bollinger_bands()
+    incremental = (time.perf_counter() - started) / repeats
+    return [batch, incremental]
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000,100000")
+    parser.add_argument("--sample", type=int, default=200, help="bars checked for equivalence per size")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    failures = 0
+    print(f"{'history':>8} {'batch us':>10} {'incr us':>9} {'speedup':>8} {'mismatches':>11}")
+    for size in (int(x) for x in args.sizes.split(",")):
+        candles = random_candles(size)
+        mismatches = check_equivalence(candles, min(args.sample, size))
+        failures += mismatches
+        batch, incremental = time_per_candle(candles, args.repeats)
+        print(f"{size:>8} {batch * 1e6:>10.1f} {incremental * 1e6:>9.2f} "
+              f"{batch / incremental:>7.0f}x {mismatches:>11}")
+    if failures:
+        raise SystemExit(f"{failures} indicator mismatches between batch and incremental")
+
+if __name__ == "__main__":
+    main()
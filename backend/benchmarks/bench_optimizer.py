@@ -0,0 +1,64 @@
+"""Parameter sweep: naive run_backtest loop vs the cached, pooled optimizer.
+
+Checks that the optimizer scores every parameter set exactly as
+``run_backtest`` does, then times the same grid serially and across 1, 2,
+4... worker processes.
+
+    cd backend && python -m benchmarks.bench_optimizer --years 1
+"""
+import argparse
+import os
+import time
+from typing import List
+
+from app.backtest.engine import run_backtest
+from app.backtest.optimizer import format_table, measure_scaling, optimize, parameter_grid
+from benchmarks.bench_backtest import MINUTES_PER_YEAR, synthetic_candles
+
+SPACE = {
+    'rsi_period': [10, 14, 21],
+    'bb_period': [20, 30],
+    'buy_above': [55, 60, 65],
+    'sell_below': [35, 40, 45]
+}
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--workers", default=None, help="comma-separated worker counts (default: 1,2,4..cores)")
+    args = parser.parse_args(argv)
+
+    columns = synthetic_candles(int(args.years * MINUTES_PER_YEAR))
+    param_sets = parameter_grid(SPACE)
+    print(f"{len(param_sets)} parameter sets over {len(columns['time'])} M1 bars, {os.cpu_count()} cores")
+
+    started = time.perf_counter()
+    naive = {tuple(sorted(p.items())): run_backtest(columns, **p) for p in param_sets}
+    naive_seconds = time.perf_counter() - started
+
+    report = optimize(columns, param_sets, workers=1)
+    mismatches = sum(1 for r in report["results"]
+                     if r["total_pnl"] != naive[tuple(sorted(r["params"].items()))]["total_pnl"]
+                     or r["trades"] != naive[tuple(sorted(r["params"].items()))]["trades"])
+    pooled = optimize(columns, param_sets, workers=2)
+    pooled_pnl = {tuple(sorted(r["params"].items())): r["total_pnl"] for r in pooled["results"]}
+    mismatches += sum(1 for key, r in naive.items() if pooled_pnl.get(key) != r["total_pnl"])
+    print(f"naive run_backtest loop {naive_seconds:.2f}s, cached serial optimizer "
+          f"{report['elapsed_seconds']:.2f}s ({naive_seconds / report['elapsed_seconds']:.1f}x from indicator reuse)")
+    print(format_table(report["results"], 5))
+
+    if args.workers:
+        counts = [int(x) for x in args.workers.split(",")]
+    else:
+        counts, cores = [1], os.cpu_count() or 1
+        while counts[-1] * 2 <= cores:
+            counts.append(counts[-1] * 2)
+    print(f"\n{'workers':>7} {'seconds':>8} {'speedup':>8}")
+    for row in measure_scaling(columns, param_sets, counts):
+        print(f"{row['workers']:>7} {row['elapsed_seconds']:>8.2f} {row['speedup']:>7.2f}x")
+
+    if mismatches:
+        raise SystemExit(f"{mismatches} parameter sets scored differently by the optimizer")
+
+if __name__ == "__main__":
+    main()
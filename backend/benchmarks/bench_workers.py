@@ -0,0 +1,99 @@
+"""Multi-worker drill: upstream load and shared counters across uvicorn workers.
+
+Starts the app under ``uvicorn --workers N`` against the stub OANDA server,
+sends a burst of /forex requests spread over the workers, and reports the
+upstream calls it caused and the request total the workers agree on. With
+shared state only the leader worker calls OANDA, so upstream load should
+not grow with the worker count.
+
+    cd backend && python -m benchmarks.bench_workers --workers 1,4
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.stub_oanda import create_stub_app, free_port, serve_in_thread, stop_servers
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "USD_JPY", "USD_CHF", "AUD_USD", "USD_CAD"]
+
+def _wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("app did not start")
+
+async def _burst(base_url: str, requests: int, concurrency: int) -> float:
+    limits = httpx.Limits(max_keepalive_connections=0)  # new connection each time, so workers share the load
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(n: int):
+            async with gate:
+                response = await client.get(f"/forex/{INSTRUMENTS[n % len(INSTRUMENTS)]}")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(requests)))
+        return time.perf_counter() - started
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,4")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    stub = create_stub_app(latency=0.02)
+    stub_port = free_port()
+    servers = [serve_in_thread(stub, stub_port)]
+    print(f"{'workers':>7} {'seconds':>8} {'req/s':>8} {'upstream':>9} {'per s':>6} {'counted':>8} {'live':>5}")
+    failures = []
+    try:
+        for workers in (int(x) for x in args.workers.split(",")):
+            port = free_port()
+            env = dict(os.environ,
+                       OANDA_API_KEY="stub",
+                       OANDA_BASE_URL=f"http://127.0.0.1:{stub_port}/v3",
+                       PRICE_FEED_ENABLED="0",  # count REST polling only
+                       WEB_CONCURRENCY=str(workers),
+                       SHARED_STATE_DIR=tempfile.mkdtemp(prefix="aq-bench-"))
+            app = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                _wait_ready(base_url)
+                time.sleep(1.0)  # let a leader publish its first snapshot
+                calls_before = stub.state.calls
+                elapsed = asyncio.run(_burst(base_url, args.requests, args.concurrency))
+                upstream = stub.state.calls - calls_before
+                time.sleep(1.0)  # every worker stores its counters at least once
+                status = httpx.get(f"{base_url}/status", timeout=5).json()
+                counted, live = status["total_requests"], len(status["workers"]["live_workers"])
+                print(f"{workers:>7} {elapsed:>8.2f} {args.requests / elapsed:>8.0f} {upstream:>9} "
+                      f"{upstream / elapsed:>6.1f} {counted:>8} {live:>5}")
+                if counted < args.requests:
+                    failures.append(f"{workers} workers counted {counted} of {args.requests} requests")
+            finally:
+                app.terminate()
+                app.wait(timeout=30)
+    finally:
+        stop_servers(servers)
+    if failures:
+        raise SystemExit("; ".join(failures))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Macro-benchmarks: endpoint throughput and tail latency at fixed concurrency.
+
+The app runs under uvicorn in a subprocess against the stub OANDA/NewsAPI
+server (another subprocess, so the load generator does not share its
+interpreter). Each scenario is closed-loop: ``concurrency`` clients send
+requests back to back for ``duration`` seconds after a short warm-up.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.stub_oanda import free_port
+
+ROUTES = [
+    "/health",
+    "/forex/EUR_USD",
+    "/forex?instruments=EUR_USD,GBP_USD,USD_JPY",
+    "/analysis/EUR_USD",
+    "/signals/dashboard"
+]
+CONCURRENCY = [1, 16, 64]
+STUB_LATENCY = 0.02
+
+def _wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise SystemExit(f"{url} did not come up")
+
+def _spawn(target: List[str], port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *target, "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ, **env), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+async def _get(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: bytes) -> int:
+    """One keep-alive GET; returns the status code after reading the whole body"""
+    writer.write(request)
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head[9:12])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        if line[:15].lower() == b"content-length:":
+            length = int(line[15:])
+    await reader.readexactly(length)
+    return status
+
+async def _load(port: int, route: str, concurrency: int, duration: float, warmup: float) -> Dict[str, float]:
+    # A bare HTTP/1.1 client: on small machines a full client library would
+    # compete with the app for CPU and the numbers would measure the client
+    request = f"GET {route} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode()
+    latencies: List[float] = []
+    errors = 0
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while True:
+                started = time.perf_counter()
+                if started >= stop_at:
+                    return
+                try:
+                    failed = await _get(reader, writer, request) >= 400
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    failed = True
+                    writer.close()
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                if started >= measure_from:
+                    latencies.append(time.perf_counter() - started)
+                    errors += failed
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    # Requests still in flight at stop_at finish late; count throughput over the measured window
+    ms = np.array(latencies) * 1000 if latencies else np.array([np.nan])
+    return {
+        "rps": len(latencies) / duration,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "requests": len(latencies),
+        "errors": errors
+    }
+
+def run(select: str = "", duration: float = 3.0, warmup: float = 0.5,
+        concurrency: List[int] = CONCURRENCY) -> Dict[str, Dict[str, float]]:
+    """Run every route/concurrency scenario whose key contains ``select``"""
+    scenarios = [(route, c) for route in ROUTES for c in concurrency
+                 if select in f"macro.{route}.c{c}"]
+    if not scenarios:
+        return {}
+    stub_port, app_port = free_port(), free_port()
+    stub = _spawn(["--factory", "benchmarks.stub_oanda:create_stub_app_from_env"], stub_port,
+                  {"STUB_LATENCY": str(STUB_LATENCY)})
+    app = None
+    try:
+        _wait_ready(f"http://127.0.0.1:{stub_port}/v3/accounts")
+        app = _spawn(["app.main:app"], app_port, {
+            "OANDA_API_KEY": "stub",
+            "OANDA_BASE_URL": f"http://127.0.0.1:{stub_port}/v3",
+            "NEWSAPI_KEY": "stub",
+            "NEWSAPI_BASE_URL": f"http://127.0.0.1:{stub_port}/v2",
+            "PRICE_FEED_ENABLED": "0",  # REST path, no stream timing noise
+            "WEB_CONCURRENCY": "1",
+            "SHARED_STATE_DIR": tempfile.mkdtemp(prefix="aq-bench-")
+        })
+        base_url = f"http://127.0.0.1:{app_port}"
+        _wait_ready(f"{base_url}/health")
+        results = {}
+        for route, c in scenarios:
+            results[f"macro.{route}.c{c}"] = asyncio.run(_load(app_port, route, c, duration, warmup))
+        return results
+    finally:
+        for process in (app, stub):
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
@@ -0,0 +1,180 @@
+"""Micro-benchmarks: analyzer, candle parsing, sentiment, resampling, ticks, alerts, correlation.
+
+Every case reports seconds per call (median and best of several timed
+rounds, each long enough to dwarf timer resolution).
+"""
+import asyncio
+import json
+import statistics
+import timeit
+from typing import Any, Callable, Dict
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from app.alerts import AlertEngine
+from app.analysis.correlation import RollingCorrelation
+from app.analysis.sentiment import CURRENCY_TERMS, NewsCorpus
+from app.analysis.technical_analyzer import TechnicalAnalyzer
+from app.analysis.tick_stats import average_true_range, realized_volatility, spread_percentiles
+from app.clients.candle_parser import columns_from_candles, parse_candles
+from app.clients.newsapi import NewsAPIClient
+from app.storage.candle_store import columns_to_frame
+from app.storage.ticks import TickRing
+from app.storage.timeframes import TimeframeAggregator, resample_columns
+from benchmarks.stub_oanda import stub_articles, stub_candles
+
+HISTORY_SIZES = [100, 1000, 10000]
+CANDLE_COUNTS = [500, 5000]
+ARTICLE_COUNTS = [10, 100]
+BASE_CANDLE_COUNTS = [5000, 50000]
+TICK_CAPACITIES = [4096, 65536]
+ALERT_COUNTS = [1000, 100000]
+CORRELATED_PAIRS = [10, 50, 100]
+
+def measure(fn: Callable[[], Any], rounds: int = 5, min_time: float = 0.05) -> Dict[str, float]:
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    loops = max(1, int(loops * min_time / 0.2))  # autorange aims for 0.2 s per round
+    per_call = [t / loops for t in timer.repeat(repeat=rounds, number=loops)]
+    return {"median_s": statistics.median(per_call), "best_s": min(per_call), "loops": loops}
+
+def price_frame(bars: int, seed: int = 1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.08 * np.exp(np.cumsum(rng.normal(0, 0.0005, bars)))
+    spread = np.abs(rng.normal(0, 0.0003, bars))
+    return pd.DataFrame({"close": close, "high": close + spread, "low": close - spread})
+
+def analyzer_cases() -> Dict[str, Callable[[], Any]]:
+    analyzer = TechnicalAnalyzer()
+    cases = {}
+    for bars in HISTORY_SIZES:
+        frame = price_frame(bars)
+        close = frame["close"]
+        cases[f"analyzer.rsi.n{bars}"] = lambda close=close: analyzer.calculate_rsi(close)
+        cases[f"analyzer.macd.n{bars}"] = lambda close=close: analyzer.calculate_macd(close)
+        cases[f"analyzer.bollinger.n{bars}"] = lambda close=close: analyzer.calculate_bollinger_bands(close)
+        cases[f"analyzer.support_resistance.n{bars}"] = lambda frame=frame: analyzer.calculate_support_resistance(frame)
+        cases[f"analyzer.generate_signal.n{bars}"] = lambda frame=frame: analyzer.generate_signal(frame)
+    return cases
+
+def candle_cases() -> Dict[str, Callable[[], Any]]:
+    """The two ForexDataClient decode paths, through to the bid OHLC DataFrame"""
+    cases = {}
+    for count in CANDLE_COUNTS:
+        payload = {"instrument": "EUR_USD", "granularity": "M1", "candles": stub_candles("EUR_USD", "M1", count)}
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        cases[f"candles.fast_parse.n{count}"] = lambda raw=raw: columns_to_frame(parse_candles(raw))
+        cases[f"candles.json_parse.n{count}"] = lambda raw=raw: columns_to_frame(
+            columns_from_candles(json.loads(raw)["candles"]))
+    return cases
+
+def sentiment_cases() -> Dict[str, Callable[[], Any]]:
+    """NewsAPIClient.get_sentiment_score against a canned response (ttl=0, so every call
+    refreshes like the original uncached client), indexing a response, and scoring every
+    currency from the indexed corpus"""
+    cases = {}
+    for count in ARTICLE_COUNTS:
+        articles = stub_articles(count)
+        client = NewsAPIClient(ttl=0.0)
+        client.api_key = "stub"
+        response = httpx.Response(200, json={"status": "ok", "totalResults": count, "articles": articles})
+
+        async def canned(endpoint, params=None, headers=None, response=response):
+            return response  # no network
+        client._make_request = canned
+        loop = asyncio.new_event_loop()
+        cases[f"sentiment.score.n{count}"] = lambda client=client, loop=loop: loop.run_until_complete(
+            client.get_sentiment_score("EUR"))
+        corpus = NewsCorpus()
+        corpus.add(articles)
+        cases[f"sentiment.index.n{count}"] = lambda articles=articles: NewsCorpus().add(articles)
+        cases[f"sentiment.currencies.n{count}"] = lambda corpus=corpus: corpus.score_currencies(CURRENCY_TERMS)
+    return cases
+
+def timeframe_cases() -> Dict[str, Callable[[], Any]]:
+    """Resampling M5 history to H4 in full, and folding one new M5 candle into it"""
+    cases = {}
+    for count in BASE_CANDLE_COUNTS:
+        payload = {"instrument": "EUR_USD", "granularity": "M5", "candles": stub_candles("EUR_USD", "M5", count + 1)}
+        history = parse_candles(json.dumps(payload, separators=(",", ":")).encode())
+        previous = {column: values[:-1] for column, values in history.items()}
+        aggregator = TimeframeAggregator()
+        aggregator.update("EUR_USD", "M5", "H4", previous)
+        state = dict(aggregator._frames)
+
+        def fold_one(history=history, aggregator=aggregator, state=state):
+            aggregator._frames = dict(state)  # back to the state before the newest candle
+            return aggregator.update("EUR_USD", "M5", "H4", history)
+
+        cases[f"timeframes.resample.n{count}"] = lambda history=history: resample_columns(history, "H4")
+        cases[f"timeframes.incremental.n{count}"] = fold_one
+    return cases
+
+def tick_cases() -> Dict[str, Callable[[], Any]]:
+    """Appending one tick to a full ring, and spread/volatility/ATR over everything it holds"""
+    cases = {}
+    for capacity in TICK_CAPACITIES:
+        rng = np.random.default_rng(7)
+        ring = TickRing(capacity)
+        mid = 1.08 + np.cumsum(rng.normal(0, 1e-5, capacity))
+        spread = rng.uniform(1e-5, 3e-4, capacity)
+        for i in range(capacity):
+            ring.append(1.7e9 + i * 0.25, mid[i] - spread[i] / 2, mid[i] + spread[i] / 2)
+        cases[f"ticks.append.n{capacity}"] = lambda ring=ring: ring.append(ring.last(1)["time"][0] + 0.25, 1.08, 1.0802)
+        cases[f"ticks.spread.n{capacity}"] = lambda ring=ring: spread_percentiles(ring.last(), [50, 90, 99], 1e-4)
+        cases[f"ticks.volatility.n{capacity}"] = lambda ring=ring: realized_volatility(ring.last())
+        cases[f"ticks.atr.n{capacity}"] = lambda ring=ring: average_true_range(ring.last(), 60, 14, 1e-4)
+    return cases
+
+def alert_cases() -> Dict[str, Callable[[], Any]]:
+    """A one-pip move on a pair holding every alert (dense: the 100k case fires ~2k alerts a tick)"""
+    cases = {}
+    for count in ALERT_COUNTS:
+        rng = np.random.default_rng(11)
+        engine = AlertEngine(default_cooldown=0.0, max_alerts=count)
+        for offset, condition in zip(rng.normal(0, 0.002, count), rng.choice(["above", "below", "crosses"], count)):
+            engine.add("EUR_USD", "bid", str(condition), 1.08 * (1 + offset))
+        state = {"up": False, "time": 1.7e9}
+
+        def tick(engine=engine, state=state):
+            state["up"] = not state["up"]
+            state["time"] += 0.05
+            bid = 1.0801 if state["up"] else 1.08
+            engine.on_tick("EUR_USD", state["time"], bid, bid + 0.0002)
+            engine.queue.pending.clear()
+
+        cases[f"alerts.tick.n{count}"] = tick
+    return cases
+
+def correlation_cases() -> Dict[str, Callable[[], Any]]:
+    """Folding one bar into a 120-bar rolling correlation, against pandas recomputing it"""
+    cases = {}
+    for pairs in CORRELATED_PAIRS:
+        rng = np.random.default_rng(13)
+        tracker = RollingCorrelation(window=120)
+        for bar in range(240):
+            for i, mid in enumerate(1 + rng.normal(0, 1e-3, pairs)):
+                tracker.on_tick(f"C{i:03d}_USD", bar * 60.0, mid, mid)
+        returns = pd.DataFrame(rng.normal(0, 1e-4, (120, pairs)))
+
+        def fold_bar(tracker=tracker, pairs=pairs):
+            tracker._mids = 1 + rng.normal(0, 1e-3, pairs)
+            tracker.close_bar()
+
+        cases[f"correlation.update.n{pairs}"] = fold_bar
+        cases[f"correlation.matrix.n{pairs}"] = lambda tracker=tracker: tracker.correlation()
+        cases[f"correlation.pandas_recompute.n{pairs}"] = lambda returns=returns: returns.corr()
+    return cases
+
+def run(select: str = "", rounds: int = 5) -> Dict[str, Dict[str, float]]:
+    """Run every case whose name contains ``select``"""
+    cases = {**analyzer_cases(), **candle_cases(), **sentiment_cases(), **timeframe_cases(),
+             **tick_cases(), **alert_cases(), **correlation_cases()}
+    results = {}
+    for name, fn in cases.items():
+        if select in name:
+            fn()  # warm-up (imports, caches)
+            results[f"micro.{name}"] = measure(fn, rounds)
+    return results
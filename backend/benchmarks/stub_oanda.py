@@ -0,0 +1,211 @@
+"""Local stand-in for the OANDA v3 REST API (and NewsAPI's /v2/everything) used by the benchmarks.
+
+Responses follow the shape of the real endpoints closely enough for the
+app's clients, and every REST call sleeps ``app.state.latency`` seconds so
+the benchmarks can dial in upstream latency (and ``app.state.fail_rate``
+an outage). The pricing stream emits
+chunked JSON lines (PRICE ticks plus periodic HEARTBEATs).
+"""
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+BASE_PRICES = {
+    "EUR_USD": 1.0850,
+    "GBP_USD": 1.2650,
+    "USD_JPY": 149.50,
+    "USD_CHF": 0.8850,
+    "AUD_USD": 0.6580,
+    "USD_CAD": 1.3580
+}
+
+def _price(instrument: str, mid: float = None) -> Dict[str, Any]:
+    mid = mid if mid is not None else BASE_PRICES.get(instrument, 1.0)
+    pip = 0.01 if instrument.endswith("JPY") else 0.0001
+    digits = 3 if instrument.endswith("JPY") else 5
+    return {
+        "type": "PRICE",
+        "instrument": instrument,
+        "time": datetime.now(timezone.utc).isoformat(),
+        "tradeable": True,
+        "bids": [{"price": f"{mid:.{digits}f}", "liquidity": 10000000}],
+        "asks": [{"price": f"{mid + 2 * pip:.{digits}f}", "liquidity": 10000000}]
+    }
+
+GRANULARITY_SECONDS = {"S5": 5, "M1": 60, "M5": 300, "M15": 900, "M30": 1800, "H1": 3600, "H4": 14400, "D": 86400}
+
+def _candle_time(ns: int) -> str:
+    seconds, nanos = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S") + f".{nanos:09d}Z"
+
+def stub_candles(instrument: str, granularity: str, count: int, from_time: str = None) -> List[Dict[str, Any]]:
+    """Deterministic bid/ask candles on the granularity grid; the newest one is incomplete"""
+    step = GRANULARITY_SECONDS.get(granularity, 3600)
+    current = int(time.time()) // step  # index of the still-forming candle
+    if from_time:
+        start_seconds = datetime.fromisoformat(from_time.rstrip("Z")[:26]).replace(tzinfo=timezone.utc).timestamp()
+        first = int(-(-start_seconds // step))
+    else:
+        first = current - count + 1
+    base = BASE_PRICES.get(instrument, 1.0)
+    candles = []
+    for index in range(first, min(first + count, current + 1)):
+        rng = random.Random(hash((instrument, granularity, index)))
+        mid = base * (1 + 0.01 * ((index % 500) / 500 - 0.5)) * (1 + rng.gauss(0, 0.001))
+        high, low = mid * (1 + abs(rng.gauss(0, 0.0005))), mid * (1 - abs(rng.gauss(0, 0.0005)))
+        open_, close = rng.uniform(low, high), rng.uniform(low, high)
+        half_spread = mid * 0.00001
+        candles.append({
+            "complete": index < current,
+            "volume": rng.randint(10, 5000),
+            "time": _candle_time(index * step * 1_000_000_000),
+            "bid": {k: f"{v - half_spread:.5f}" for k, v in zip("ohlc", (open_, high, low, close))},
+            "ask": {k: f"{v + half_spread:.5f}" for k, v in zip("ohlc", (open_, high, low, close))}
+        })
+    return candles
+
+HEADLINE_WORDS = [
+    "Dollar", "euro", "rises", "falls", "as", "Fed", "holds", "rates", "support", "strong", "weak", "sterling",
+    "yen", "drops", "gains", "bullish", "bearish", "traders", "sell", "buy", "inflation", "data", "outlook", "ECB"
+]
+
+def stub_articles(count: int, seed: int = 3) -> List[Dict[str, Any]]:
+    """NewsAPI-shaped articles with pseudo-random market headlines"""
+    rng = random.Random(seed)
+    return [{
+        "source": {"id": None, "name": "Stub Wire"},
+        "title": " ".join(rng.choice(HEADLINE_WORDS) for _ in range(rng.randint(6, 14))),
+        "description": None,
+        "url": f"https://news.example/{i}",
+        "publishedAt": _candle_time((int(time.time()) - i * 60) * 1_000_000_000)[:19] + "Z"
+    } for i in range(count)]
+
+STUB_CURRENCIES = ["EUR", "GBP", "AUD", "NZD", "USD", "CAD", "CHF", "JPY", "SEK", "NOK", "SGD", "HKD"]
+
+def stub_instruments() -> List[Dict[str, Any]]:
+    """Every pair of STUB_CURRENCIES, quoted in OANDA's usual order, plus a non-currency instrument"""
+    pairs = [f"{base}_{quote}" for i, base in enumerate(STUB_CURRENCIES) for quote in STUB_CURRENCIES[i + 1:]]
+    return [{
+        "name": name,
+        "type": "CURRENCY",
+        "displayName": name.replace("_", "/"),
+        "pipLocation": -2 if name.endswith("JPY") else -4,
+        "displayPrecision": 3 if name.endswith("JPY") else 5
+    } for name in pairs] + [{"name": "XAU_USD", "type": "METAL", "displayName": "Gold", "pipLocation": -2}]
+
+def create_stub_app(latency: float = 0.0, stream_interval: float = 0.05) -> FastAPI:
+    stub = FastAPI()
+    stub.state.latency = latency
+    stub.state.calls = 0
+    stub.state.stream_interval = stream_interval
+    stub.state.stream_paused = False  # set True to simulate a feed that falls behind
+    stub.state.fail_rate = 0.0  # share of REST calls answered with 503 after the delay
+    stub.state.news_articles = 100  # /v2/everything serves this many, one a minute back from now
+
+    async def _delay():
+        stub.state.calls += 1
+        if stub.state.latency:
+            await asyncio.sleep(stub.state.latency)
+        if stub.state.fail_rate and random.random() < stub.state.fail_rate:
+            raise HTTPException(status_code=503, detail="stub outage")
+
+    @stub.get("/v3/accounts")
+    async def accounts():
+        await _delay()
+        return {"accounts": [{"id": "101-001-36257109-001", "tags": []}]}
+
+    @stub.get("/v3/accounts/{account_id}/instruments")
+    async def instruments(account_id: str):
+        await _delay()
+        return {"instruments": stub_instruments()}
+
+    @stub.get("/v3/accounts/{account_id}/pricing")
+    async def pricing(account_id: str, instruments: str = ""):
+        await _delay()
+        return {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "prices": [_price(i) for i in instruments.split(",") if i]
+        }
+
+    @stub.get("/v3/instruments/{instrument}/candles")
+    async def candles(instrument: str, granularity: str = "S5", count: int = 500,
+                      from_time: Optional[str] = Query(None, alias="from")):
+        await _delay()
+        return {
+            "instrument": instrument,
+            "granularity": granularity,
+            "candles": stub_candles(instrument, granularity, count, from_time)
+        }
+
+    @stub.get("/v2/everything")
+    async def news(q: str = "", pageSize: int = 100, page: int = 1,
+                   from_time: Optional[str] = Query(None, alias="from"), to: Optional[str] = None):
+        await _delay()
+        articles = stub_articles(stub.state.news_articles)
+        if from_time and "T" in from_time:
+            articles = [a for a in articles if a["publishedAt"] >= from_time]
+        if to:
+            articles = [a for a in articles if a["publishedAt"] <= to]
+        return {"status": "ok", "totalResults": len(articles),
+                "articles": articles[(page - 1) * pageSize:page * pageSize]}
+
+    @stub.get("/v3/accounts/{account_id}/pricing/stream")
+    async def pricing_stream(account_id: str, instruments: str = ""):
+        names = [i for i in instruments.split(",") if i]
+        mids = {i: BASE_PRICES.get(i, 1.0) for i in names}
+
+        async def lines():
+            # Like OANDA, open with a snapshot of every subscribed instrument
+            for name in names:
+                yield json.dumps(_price(name, mids[name])) + "\n"
+            ticks = 0
+            while True:
+                await asyncio.sleep(stub.state.stream_interval)
+                if stub.state.stream_paused:
+                    continue
+                ticks += 1
+                # Random-walk one instrument per tick, heartbeat every 20 ticks
+                name = random.choice(names)
+                mids[name] *= 1 + random.gauss(0, 0.0001)
+                yield json.dumps(_price(name, mids[name])) + "\n"
+                if ticks % 20 == 0:
+                    yield json.dumps({"type": "HEARTBEAT", "time": datetime.now(timezone.utc).isoformat()}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/octet-stream")
+
+    return stub
+
+def create_stub_app_from_env() -> FastAPI:
+    """Factory for running the stub in its own process: uvicorn --factory benchmarks.stub_oanda:create_stub_app_from_env"""
+    import os
+    return create_stub_app(latency=float(os.getenv("STUB_LATENCY", "0")),
+                           stream_interval=float(os.getenv("STUB_STREAM_INTERVAL", "0.05")))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def serve_in_thread(asgi_app, port: int) -> Tuple[uvicorn.Server, threading.Thread]:
+    """Run an ASGI app under uvicorn on a daemon thread and wait until it is up"""
+    config = uvicorn.Config(asgi_app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+def stop_servers(servers: List[Tuple[uvicorn.Server, threading.Thread]]):
+    for server, thread in servers:
+        server.should_exit = True
+        thread.join(timeout=5)
@@ -0,0 +1,149 @@
+"""Benchmark suite: micro (indicators, parsing, sentiment) and macro (endpoints).
+
+Writes machine-readable JSON (environment metadata plus one metrics dict
+per case) and compares it against a stored baseline, flagging every
+metric that moved the wrong way by more than ``--threshold``.
+
+    cd backend && python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --micro --select analyzer --fail-on-regression
+    python -m benchmarks.suite --save-baseline   # create benchmarks/baseline.json
+    python -m benchmarks.suite --add-to-baseline # record new cases, keep existing numbers
+
+A baseline holds one commit's numbers (``meta.git_commit``), so
+--save-baseline refuses to overwrite one. Cases written later with
+--add-to-baseline are listed under ``meta.added`` with the commit they were
+measured on; existing entries are never rewritten.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+HIGHER_IS_BETTER = {"rps"}
+LOWER_IS_BETTER_SUFFIXES = ("_s", "_ms")
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+def _direction(metric: str) -> Optional[int]:
+    """+1 when bigger is better, -1 when smaller is, None for informational metrics"""
+    if metric in HIGHER_IS_BETTER:
+        return 1
+    if metric.endswith(LOWER_IS_BETTER_SUFFIXES):
+        return -1
+    return None
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """One row per metric present in both runs; ``change`` is positive when the metric got worse"""
+    rows = []
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            direction = _direction(metric)
+            before = baseline.get(case, {}).get(metric)
+            if direction is None or not before or value != value:
+                continue
+            ratio = value / before
+            change = (1 / ratio - 1) if direction > 0 else (ratio - 1)
+            rows.append({"case": case, "metric": metric, "baseline": before, "current": value,
+                         "ratio": ratio, "change": change, "regression": change > threshold})
+    return rows
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    width = max([len(r["case"]) + len(r["metric"]) + 1 for r in rows] + [10])
+    lines = [f"{'case':<{width}} {'baseline':>12} {'current':>12} {'ratio':>7}"]
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        lines.append(f"{r['case'] + ' ' + r['metric']:<{width}} {r['baseline']:>12.6g} "
+                     f"{r['current']:>12.6g} {r['ratio']:>7.2f}{flag}")
+    return "\n".join(lines)
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--micro", action="store_true", help="only the micro-benchmarks")
+    parser.add_argument("--macro", action="store_true", help="only the endpoint benchmarks")
+    parser.add_argument("--select", default="", help="run cases whose name contains this")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per micro case")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per macro scenario")
+    parser.add_argument("--concurrency", default="1,16,64")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="start a baseline from this run")
+    parser.add_argument("--add-to-baseline", action="store_true",
+                        help="add cases the baseline lacks, keeping the numbers it has")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    from benchmarks import macro, micro
+    run_micro = args.micro or not args.macro
+    run_macro = args.macro or not args.micro
+
+    results: Dict[str, Dict[str, float]] = {}
+    if run_micro:
+        results.update(micro.run(args.select, args.rounds))
+    if run_macro:
+        results.update(macro.run(args.select, args.duration,
+                                 concurrency=[int(c) for c in args.concurrency.split(",")]))
+    report = {"meta": environment(), "results": results}
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            raise SystemExit(f"{args.baseline} exists; use --add-to-baseline for new cases, "
+                             "or remove it to start a new baseline")
+        with open(args.baseline, "w") as f:
+            f.write(text + "\n")
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.add_to_baseline:
+        added = {case: metrics for case, metrics in results.items() if case not in baseline["results"]}
+        if added:
+            baseline["results"].update(added)
+            baseline["meta"].setdefault("added", []).append(
+                {"git_commit": report["meta"]["git_commit"], "timestamp": report["meta"]["timestamp"],
+                 "cases": sorted(added)})
+            with open(args.baseline, "w") as f:
+                f.write(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Added {len(added)} case(s) to {args.baseline}", file=sys.stderr)
+    rows = compare(results, baseline["results"], args.threshold)
+    print(f"\nAgainst baseline {baseline['meta'].get('git_commit')} ({baseline['meta'].get('timestamp')}):",
+          file=sys.stderr)
+    print(format_comparison(rows), file=sys.stderr)
+    regressions = [r for r in rows if r["regression"]]
+    if regressions and args.fail_on_regression:
+        raise SystemExit(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
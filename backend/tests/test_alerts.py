@@ -0,0 +1,46 @@
+"""Alerts fire on crossings in either direction, honour cooldowns and queue one event each."""
+from app.alerts import AlertEngine, AlertQueue, ThresholdIndex
+
+def test_crossings_in_both_directions():
+    index = ThresholdIndex(last=1.0800)
+    index.add(1, 1.0810, "above")
+    index.add(2, 1.0790, "below")
+    index.add(3, 1.0820, "crosses")
+    assert index.cross(1.0805) == []
+    assert index.cross(1.0820) == [1, 3]  # reaching a threshold counts
+    assert index.cross(1.0830) == []      # already past it
+    assert index.cross(1.0780) == [2, 3]  # one move down through two thresholds
+    assert index.cross(1.0780) == []
+    index.remove(3, 1.0820, "crosses")
+    assert index.cross(1.0830) == [1] and len(index) == 2
+
+def test_once_alerts_are_removed_after_firing():
+    engine = AlertEngine(default_cooldown=0.0)
+    alert = engine.add("EUR_USD", "bid", "above", 1.0810, once=True)
+    engine.on_tick("EUR_USD", 0.0, 1.0800, 1.0802)
+    engine.on_tick("EUR_USD", 1.0, 1.0815, 1.0817)
+    assert engine.get(alert["id"]) is None and not engine.indexes
+    engine.on_tick("EUR_USD", 2.0, 1.0800, 1.0802)
+    engine.on_tick("EUR_USD", 3.0, 1.0815, 1.0817)
+    assert engine.triggered == 1
+
+def test_cooldown_suppresses_repeats():
+    engine = AlertEngine(default_cooldown=60.0)
+    engine.add("EUR_USD", "mid", "crosses", 1.0810)
+    for second, bid in enumerate((1.0800, 1.0815, 1.0805, 1.0815)):
+        engine.on_tick("EUR_USD", float(second), bid, bid)
+    assert (engine.triggered, engine.suppressed) == (1, 2)
+    engine.on_tick("EUR_USD", 70.0, 1.0800, 1.0800)  # cooldown over
+    assert engine.triggered == 2
+
+def test_queue_keeps_one_pending_event_per_alert():
+    queue = AlertQueue(max_size=2)
+    queue.put({"alert_id": 1, "value": 1.0810})
+    queue.put({"alert_id": 1, "value": 1.0790})
+    queue.put({"alert_id": 2, "value": 1.0820})
+    queue.put({"alert_id": 3, "value": 1.0830})  # full: the oldest event is dropped
+    events = queue.drain(10)
+    assert [(e["alert_id"], e["value"], e["repeats"]) for e in events] == [(2, 1.0820, 0), (3, 1.0830, 0)]
+    assert (queue.deduplicated, queue.dropped) == (1, 1)
+    queue.put({"alert_id": 1, "value": 1.0800})
+    assert queue.drain(10)[0]["repeats"] == 0  # delivered events no longer absorb new ones
@@ -0,0 +1,35 @@
+"""Backtest P&L, drawdown and Sharpe pinned on a series small enough to work out by hand."""
+import numpy as np
+import pytest
+
+from app.backtest.engine import SECONDS_PER_YEAR, positions_from_scores, simulate
+
+def columns() -> dict:
+    bid_o = np.array([1.0, 1.1, 1.3, 1.2, 1.0])
+    bid_c = np.array([1.1, 1.3, 1.2, 1.0, 0.8])
+    quarter = int(SECONDS_PER_YEAR / 4 * 1e9)
+    return {
+        "time": np.arange(5, dtype=np.int64) * quarter,  # four bars a year
+        "bid_o": bid_o, "ask_o": bid_o + 0.1,
+        "bid_c": bid_c, "ask_c": bid_c + 0.1
+    }
+
+def test_signals_hold_until_the_opposite_one():
+    score = np.array([70, 50, 50, 30, 50, 65])
+    np.testing.assert_array_equal(positions_from_scores(score), [1, 1, 1, -1, -1, 1])
+    np.testing.assert_array_equal(positions_from_scores(score, exit_on_hold=True), [1, 0, 0, -1, 0, 1])
+    np.testing.assert_array_equal(positions_from_scores(score, warmup=2), [0, 0, 0, -1, -1, 1])
+
+def test_pnl_drawdown_and_sharpe():
+    # positions [0, 1, 1, 0, -1]: buy at 1.2 (ask), sell at 1.2 (bid), short at 1.0, marked at ask 0.9
+    result = simulate(columns(), np.array([1, 1, 0, -1, -1]), return_curves=True)
+    np.testing.assert_allclose(result["equity"], [0.0, 0.1, 0.0, 0.0, 0.1], atol=1e-12)
+    assert result["total_pnl"] == pytest.approx(0.1)
+    assert result["total_return"] == pytest.approx(round(0.1 / 1.05, 6))  # notional: first open mid
+    assert result["max_drawdown"] == pytest.approx(0.1)
+    assert result["max_drawdown_pct"] == pytest.approx(round(0.1 / 1.05, 6))
+    # per-bar P&L [0, .1, -.1, 0, .1]: mean .02, std sqrt(.0056); annualised with sqrt(4)
+    assert result["bars_per_year"] == pytest.approx(4.0)
+    assert result["sharpe"] == pytest.approx(round(0.02 / np.sqrt(0.0056) * 2, 4))
+    assert (result["trades"], result["exposure"], result["final_position"]) == (3, 0.6, -1.0)
+    assert result["spread_cost"] == pytest.approx(0.15)
@@ -0,0 +1,100 @@
+"""The breaker opens on failures, probes after a pause and records one outcome per hedged call."""
+import asyncio
+
+import pytest
+
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def breaker(clock: Clock, **kwargs) -> CircuitBreaker:
+    return CircuitBreaker("pricing", window=30.0, min_calls=4, failure_rate=0.5, open_seconds=10.0, clock=clock, **kwargs)
+
+def test_closed_open_half_open_closed():
+    clock = Clock()
+    circuit = breaker(clock)
+    for failed in (False, True, False):
+        circuit.record_failure() if failed else circuit.record_success()
+    assert circuit.state == CLOSED  # three calls are below min_calls
+    circuit.record_failure()
+    assert circuit.state == OPEN and not circuit.allow()
+    clock.now = 9.9
+    assert circuit.state == OPEN and circuit.retry_in() == pytest.approx(0.1)
+    clock.now = 10.0
+    assert circuit.state == HALF_OPEN
+    assert circuit.allow() and not circuit.allow()  # one probe at a time
+    circuit.record_failure()
+    assert circuit.state == OPEN and circuit.opens == 2
+    clock.now = 20.0
+    assert circuit.allow()
+    circuit.record_success()
+    assert circuit.state == CLOSED and circuit.stats()["calls_in_window"] == 0
+
+def test_old_failures_leave_the_window():
+    clock = Clock()
+    circuit = breaker(clock)
+    for _ in range(3):
+        circuit.record_failure()
+    clock.now = 31.0
+    circuit.record_failure()  # the first three are outside the 30 s window
+    assert circuit.state == CLOSED
+
+def test_retries_then_rejects_while_open():
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise ConnectionError("upstream down")
+
+    async def scenario():
+        circuit = breaker(Clock())
+        with pytest.raises(ConnectionError):
+            await circuit.call(failing, retries=2, backoff=0.0)
+        with pytest.raises(ConnectionError):
+            await circuit.call(failing, backoff=0.0)
+        with pytest.raises(CircuitOpenError):
+            await circuit.call(failing)  # four failures opened it: upstream is not called
+        return circuit
+
+    circuit = asyncio.run(scenario())
+    assert len(calls) == 4 and circuit.retries == 2 and circuit.state == OPEN
+
+def test_hedged_call_records_one_outcome():
+    copies = []
+
+    async def slow_then_fast():
+        copies.append(1)
+        await asyncio.sleep(0.2 if len(copies) == 1 else 0.01)
+        return len(copies)
+
+    async def scenario():
+        circuit = breaker(Clock())
+        result = await circuit.call(slow_then_fast, hedge_after=0.02)
+        return circuit, result
+
+    circuit, result = asyncio.run(scenario())
+    assert result == 2 and circuit.hedges == 1
+    assert circuit.stats()["calls_in_window"] == 1  # the losing copy was cancelled, not counted
+
+def test_cancelled_copy_does_not_fail_the_hedge():
+    copies = []
+
+    async def cancelled_then_ok():
+        copies.append(1)
+        if len(copies) == 1:
+            await asyncio.sleep(0.03)
+            raise asyncio.CancelledError()  # the first copy ends cancelled
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def scenario():
+        circuit = breaker(Clock())
+        return circuit, await circuit.call(cancelled_then_ok, hedge_after=0.01)
+
+    circuit, result = asyncio.run(scenario())
+    assert result == "ok" and circuit.stats()["failures_in_window"] == 0
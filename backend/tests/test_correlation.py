@@ -0,0 +1,30 @@
+"""The incrementally updated correlation matches pandas over the same window of bars."""
+import numpy as np
+import pandas as pd
+
+from app.analysis.correlation import RollingCorrelation
+
+def test_matches_pandas_over_the_window():
+    rng = np.random.default_rng(7)
+    names = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD"]
+    window, bars = 20, 75
+    quiet = {30, 31, 32, 55}  # bars without any tick
+    tracker = RollingCorrelation(bar_seconds=60.0, window=window)
+    mids = np.array([1.08, 1.26, 149.5, 0.65])
+    closes = []  # each bar's closing mids, carried through quiet bars
+    checked = 0
+    for bar in range(bars):
+        if bar not in quiet:
+            mids = mids * np.exp(rng.normal(0, 0.0005, len(names)) + rng.normal(0, 0.0003))  # a shared factor
+            for second, (name, mid) in enumerate(zip(names, mids)):
+                tracker.on_tick(name, bar * 60.0 + second, mid, mid)
+        closes.append(mids.copy())
+        if tracker.bars > window:  # the first bar has no previous close
+            returns = np.log(pd.DataFrame(closes[:tracker.bars], columns=names)).diff().fillna(0.0)
+            expected = returns.tail(window).corr()
+            got_names, got = tracker.correlation(names)
+            assert got_names == names
+            np.testing.assert_allclose(got, expected.to_numpy(), atol=1e-9)
+            checked += 1
+    assert tracker.bars == bars - 1  # the last bar is still forming
+    assert tracker.resyncs == (bars - 1) // window and checked > window
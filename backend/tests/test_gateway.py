@@ -0,0 +1,31 @@
+"""Callers arriving during the account lookup share it instead of failing."""
+import asyncio
+
+import httpx
+
+from app.clients.forex_client import ForexDataClient
+from app.clients.gateway import UpstreamGateway
+
+def test_concurrent_callers_share_one_account_lookup():
+    lookups = []
+
+    async def accounts(request):
+        lookups.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"accounts": [{"id": "101-001"}]})
+
+    async def scenario():
+        gateway = UpstreamGateway(api_key="key", base_url="http://oanda")
+        gateway._session = httpx.AsyncClient(base_url="http://oanda", transport=httpx.MockTransport(accounts))
+        ids = await asyncio.gather(*[gateway.get_account_id() for _ in range(10)])
+        await gateway.aclose()
+        return ids, gateway.account_lookups
+
+    ids, count = asyncio.run(scenario())
+    assert ids == ["101-001"] * 10
+    assert lookups == ["/accounts"] and count == 1
+
+def test_candles_are_not_requested_without_a_key():
+    gateway = UpstreamGateway(api_key="", base_url="http://oanda")
+    assert ForexDataClient(gateway=gateway).fetch_candles("EUR_USD", "H1", 10) is None
+    assert gateway.requests == {"interactive": 0, "bulk": 0}
@@ -0,0 +1,69 @@
+"""IncrementalIndicators must reproduce the batch TechnicalAnalyzer values bar by bar."""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analysis.incremental import IncrementalIndicators
+from app.analysis.technical_analyzer import TechnicalAnalyzer
+
+analyzer = TechnicalAnalyzer()
+
+def random_candles(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.08 * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+    spread = np.abs(rng.normal(0, 0.0003, n))
+    return pd.DataFrame({'close': close, 'high': close + spread, 'low': close - spread})
+
+def assert_same(batch, incremental, tol: float):
+    if isinstance(batch, dict):
+        assert batch.keys() == incremental.keys()
+        for key in batch:
+            assert_same(batch[key], incremental[key], tol)
+    elif isinstance(batch, float) and math.isnan(batch):
+        assert math.isnan(incremental)
+    else:
+        assert incremental == pytest.approx(batch, abs=tol)
+
+def assert_matches_batch(candles: pd.DataFrame, state: IncrementalIndicators):
+    closes = candles['close']
+    # Tolerances cover the batch side's rounding (2 decimals for RSI, 5 elsewhere)
+    assert_same(analyzer.calculate_rsi(closes), state.rsi(), 0.011)
+    assert_same(analyzer.calculate_macd(closes), state.macd(), 1.1e-5)
+    assert_same(analyzer.calculate_bollinger_bands(closes), state.bollinger_bands(), 1.1e-3)
+    assert_same(analyzer.calculate_support_resistance(candles), state.support_resistance(), 1.1e-5)
+
+@pytest.mark.parametrize("bars,seed", [(60, 1), (400, 7)])
+def test_every_bar_matches_batch(bars, seed):
+    candles = random_candles(bars, seed)
+    state = IncrementalIndicators()
+    for i, (close, high, low) in enumerate(candles[['close', 'high', 'low']].itertuples(index=False)):
+        state.update(close, high, low)
+        assert_matches_batch(candles.iloc[:i + 1], state)
+
+def test_seed_matches_batch_on_long_history():
+    candles = random_candles(5000)
+    assert_matches_batch(candles, IncrementalIndicators().seed(candles))
+
+def test_flat_prices_match_batch():
+    candles = pd.DataFrame({'close': [1.1] * 40, 'high': [1.1] * 40, 'low': [1.1] * 40})
+    state = IncrementalIndicators().seed(candles)
+    assert math.isnan(state.rsi())
+    assert_matches_batch(candles, state)
+
+def test_close_only_history_matches_batch():
+    candles = random_candles(100)[['close']]
+    state = IncrementalIndicators().seed(candles)
+    assert_same(analyzer.calculate_rsi(candles['close']), state.rsi(), 0.011)
+    assert_same(analyzer.calculate_support_resistance(candles.assign(high=candles['close'], low=candles['close'])),
+                state.support_resistance(), 1.1e-5)
+
+@pytest.mark.parametrize("sentiment", [None, 0.0, 0.6, -0.8])
+def test_generate_signal_matches_batch(sentiment):
+    candles = random_candles(300, seed=3)
+    batch = analyzer.generate_signal(candles, sentiment=sentiment)
+    incremental = IncrementalIndicators().seed(candles).generate_signal(sentiment=sentiment)
+    for key in ('signal', 'strength', 'score', 'technical_score', 'sentiment'):
+        assert incremental.get(key) == batch.get(key)
+    assert_same(batch['indicators'], incremental['indicators'], 0.011)
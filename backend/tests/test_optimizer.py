@@ -0,0 +1,35 @@
+"""The process-pool optimizer finds what a serial grid search over run_backtest finds."""
+import numpy as np
+
+from app.backtest.engine import run_backtest
+from app.backtest.optimizer import optimize, parameter_grid
+
+def candles(bars: int = 800, seed: int = 5) -> dict:
+    rng = np.random.default_rng(seed)
+    mid = 1.08 * np.exp(np.cumsum(rng.normal(0, 0.0015, bars)))
+    opens = np.concatenate([[mid[0]], mid[:-1]])
+    return {
+        "time": np.arange(bars, dtype=np.int64) * 3_600_000_000_000,
+        "bid_o": opens, "ask_o": opens + 0.0002,
+        "bid_c": mid, "ask_c": mid + 0.0002
+    }
+
+def key(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+def test_pool_matches_serial_grid():
+    columns = candles()
+    grid = parameter_grid({"rsi_period": [10, 14], "bb_period": [14, 20],
+                           "rsi_oversold": [25, 35], "buy_above": [55, 70]})
+    serial = {key(params): run_backtest(columns, **params) for params in grid}
+    pooled = optimize(columns, grid, workers=2)
+
+    assert pooled["evaluations"] == len(grid)
+    for result in pooled["results"]:
+        expected = serial[key(result["params"])]
+        for metric in ("sharpe", "total_pnl", "max_drawdown", "trades"):
+            assert result[metric] == expected[metric], (result["params"], metric)
+    best = max(serial.values(), key=lambda r: r["sharpe"])
+    assert pooled["results"][0]["sharpe"] == best["sharpe"]
+    assert key(pooled["results"][0]["params"]) in {key(p) for p in grid
+                                                   if serial[key(p)]["sharpe"] == best["sharpe"]}
@@ -0,0 +1,39 @@
+"""A stalled push client gets only the latest value and never holds up the others."""
+import asyncio
+
+from app.push import SignalBroadcaster
+
+def test_stalled_subscriber_is_conflated_and_others_keep_up():
+    async def scenario():
+        broadcaster = SignalBroadcaster(max_skipped=1000)
+        stalled = broadcaster.subscribe(["EUR_USD"])
+        live = broadcaster.subscribe(["EUR_USD"])
+        received = []
+
+        async def consume():
+            while len(received) < 50:
+                received.extend(m["data"]["bid"] for m in await live.next_batch(timeout=1.0))
+
+        consumer = asyncio.create_task(consume())
+        for n in range(50):
+            broadcaster.publish("price", "EUR_USD", {"bid": n})
+            await asyncio.sleep(0.001)  # the live client reads between updates; the stalled one never does
+        await asyncio.wait_for(consumer, 1.0)
+        return broadcaster, stalled, received, await stalled.next_batch(timeout=0.1)
+
+    broadcaster, stalled, received, backlog = asyncio.run(scenario())
+    assert received == list(range(50))
+    assert [m["data"]["bid"] for m in backlog] == [49]  # one conflated message, the newest
+    assert broadcaster.subscriptions.get(stalled.id) is stalled
+
+def test_lagging_subscriber_is_dropped():
+    broadcaster = SignalBroadcaster(max_skipped=3)
+    slow = broadcaster.subscribe(["EUR_USD"])
+    other = broadcaster.subscribe(["GBP_USD"])
+    broadcaster.publish("price", "GBP_USD", {"bid": 1.26})
+    for n in range(5):
+        broadcaster.publish("price", "EUR_USD", {"bid": n})
+    assert slow.closed and slow.id not in broadcaster.subscriptions
+    assert not other.closed and broadcaster.dropped_clients == 1
+    broadcaster.publish("price", "EUR_USD", {"bid": 4})  # unchanged: not sent at all
+    assert broadcaster.unchanged == 1
@@ -0,0 +1,49 @@
+"""Quotes are fetched once per burst, expire after the TTL and are evicted least recently used first."""
+import asyncio
+
+from app.quote_cache import QuoteCache
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_concurrent_misses_share_one_fetch():
+    calls = []
+
+    async def fetch_many(keys):
+        calls.append(list(keys))
+        await asyncio.sleep(0.01)
+        return {key: {"instrument": key, "bid": 1.08} for key in keys}
+
+    async def scenario():
+        cache = QuoteCache(ttl=5.0)
+        results = await asyncio.gather(*[cache.get_many(["EUR_USD"], fetch_many) for _ in range(20)])
+        return cache, results
+
+    cache, results = asyncio.run(scenario())
+    assert calls == [["EUR_USD"]]
+    assert all(result == {"EUR_USD": {"instrument": "EUR_USD", "bid": 1.08}} for result in results)
+    assert (cache.misses, cache.coalesced) == (1, 19)
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = QuoteCache(ttl=1.0, clock=clock)
+    cache.set("EUR_USD", 1.08)
+    clock.now = 0.99
+    assert cache.get("EUR_USD") == 1.08
+    clock.now = 1.0
+    assert cache.get("EUR_USD") is None
+    assert cache.stats()["size"] == 0
+
+def test_least_recently_used_is_evicted():
+    cache = QuoteCache(ttl=60.0, max_size=2, clock=Clock())
+    cache.set("EUR_USD", 1.08)
+    cache.set("GBP_USD", 1.26)
+    cache.get("EUR_USD")  # now GBP_USD is the least recently used
+    cache.set("USD_JPY", 149.5)
+    assert cache.get("GBP_USD") is None
+    assert (cache.get("EUR_USD"), cache.get("USD_JPY")) == (1.08, 149.5)
+    assert cache.evictions == 1
@@ -0,0 +1,45 @@
+"""Workers reach the leader's state through the shared state directory."""
+import asyncio
+
+import pytest
+
+from app.clients.gateway import TokenBucket
+from app.shared_state import SharedState
+
+def test_leader_answers_other_workers(tmp_path):
+    async def scenario():
+        leader, follower = SharedState(str(tmp_path)), SharedState(str(tmp_path))
+        leader.open()
+        follower.open()
+        try:
+            assert leader.try_lead()  # record locks never conflict within a process, so no follower check
+            with pytest.raises(OSError):
+                await follower.ask_leader({"n": 1})  # nobody serving yet
+
+            async def double(request):
+                return {"result": request["n"] * 2}
+            await leader.serve(double)
+            assert [await follower.ask_leader({"n": n}) for n in (1, 2)] == [{"result": 2}, {"result": 4}]
+
+            await leader.stop_serving()
+            with pytest.raises(OSError):
+                await follower.ask_leader({"n": 3})
+        finally:
+            follower.close()
+            leader.close()
+        assert not (tmp_path / "leader.sock").exists()  # the last worker out removes the socket too
+
+    asyncio.run(scenario())
+
+def test_token_bucket_is_shared_by_workers(tmp_path):
+    state = SharedState(str(tmp_path))
+    state.open()
+    try:
+        clock = lambda: 100.0  # no refill during the test
+        first, second = TokenBucket(rate=1.0, burst=5.0, clock=clock), TokenBucket(rate=1.0, burst=5.0, clock=clock)
+        first.share(state)
+        second.share(state)
+        taken = [first.try_take() == 0.0 for _ in range(3)] + [second.try_take() == 0.0 for _ in range(3)]
+        assert taken == [True] * 5 + [False]  # one burst between them
+    finally:
+        state.close()
@@ -0,0 +1,35 @@
+"""Snapshot responses carry an ETag and answer a matching If-None-Match with 304."""
+import asyncio
+
+import httpx
+
+from app.snapshots import SignalSnapshots, etag_matches
+
+def test_etag_follows_the_body():
+    snapshots = SignalSnapshots()
+    snapshots.publish({"analysis:EUR_USD": {"signal": "BUY", "score": 71}})
+    etag = snapshots.response("analysis:EUR_USD").headers["etag"]
+    assert snapshots.response("analysis:EUR_USD", etag).status_code == 304
+    snapshots.publish({"analysis:EUR_USD": {"signal": "BUY", "score": 71}})
+    assert snapshots.response("analysis:EUR_USD", etag).status_code == 304  # same body, new version
+    assert etag_matches(f'W/{etag}, "other"', etag) and etag_matches("*", etag)
+
+def test_analysis_endpoint_revalidates():
+    from app.main import app, signal_snapshots
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            signal_snapshots.publish({"analysis:EUR_USD": {"signal": "BUY", "score": 71}})
+            first = await client.get("/analysis/EUR_USD")
+            etag = first.headers["etag"]
+            cached = await client.get("/analysis/EUR_USD", headers={"If-None-Match": etag})
+            signal_snapshots.publish({"analysis:EUR_USD": {"signal": "SELL", "score": 29}})
+            changed = await client.get("/analysis/EUR_USD", headers={"If-None-Match": etag})
+        return first, cached, changed
+
+    first, cached, changed = asyncio.run(scenario())
+    assert first.status_code == 200 and first.json()["signal"] == "BUY"
+    assert cached.status_code == 304 and cached.content == b""
+    assert changed.status_code == 200 and changed.json()["signal"] == "SELL"
+    assert changed.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,87 @@
+"""Resampled timeframes must line up with OANDA's candles and survive concurrent store writers."""
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.clients.forex_client import HistoryPending, ForexDataClient
+from app.storage.candle_store import COLUMNS, CandleStore
+from app.storage.timeframes import TimeframeAggregator, bucket_times, resample_columns
+
+def hourly(start: str, hours: int, seed: int = 3) -> dict:
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, periods=hours, freq="h", tz="UTC").as_unit("ns").asi8
+    mid = 1.08 + np.cumsum(rng.normal(0, 0.001, hours))
+    columns = {"time": times, "volume": rng.integers(1, 100, hours)}
+    for side, shift in (("bid", 0.0), ("ask", 0.0002)):
+        columns[f"{side}_o"] = mid + shift
+        columns[f"{side}_h"] = mid + shift + 0.001
+        columns[f"{side}_l"] = mid + shift - 0.001
+        columns[f"{side}_c"] = mid + shift + 0.0005
+    return columns
+
+def utc_hours(buckets: np.ndarray) -> set:
+    return {pd.Timestamp(int(t), tz="UTC").hour for t in np.unique(buckets)}
+
+@pytest.mark.parametrize("start,daily,h4", [
+    ("2024-01-08", {22}, {22, 2, 6, 10, 14, 18}),  # New York on EST: 17:00 is 22:00 UTC
+    ("2024-07-08", {21}, {21, 1, 5, 9, 13, 17})    # and on EDT 21:00 UTC
+])
+def test_daily_and_h4_follow_new_york_close(start, daily, h4):
+    times = hourly(start, 72)["time"]
+    assert utc_hours(bucket_times(times, "D")) == daily
+    assert utc_hours(bucket_times(times, "H4")) == h4
+    assert utc_hours(bucket_times(times, "H1")) == set(range(24))
+
+def test_incremental_updates_match_full_resample():
+    columns = hourly("2024-03-04", 24 * 20)
+    aggregator = TimeframeAggregator()
+    for end in range(30, len(columns["time"]) + 1, 7):
+        history = {c: v[:end] for c, v in columns.items()}
+        for timeframe in ("H4", "D"):
+            incremental = aggregator.update("EUR_USD", "H1", timeframe, history)
+            batch = resample_columns(history, timeframe)
+            for column in COLUMNS:
+                np.testing.assert_array_equal(incremental[column], batch[column])
+    assert aggregator.incremental_updates > 0
+
+def test_replace_is_seen_by_another_store(tmp_path):
+    writer, reader = CandleStore(str(tmp_path)), CandleStore(str(tmp_path))
+    writer.append("EUR_USD", "H1", hourly("2024-01-08", 10))
+    assert len(reader.read("EUR_USD", "H1")["time"]) == 10
+    fresh = hourly("2024-02-01", 5, seed=9)
+    writer.replace("EUR_USD", "H1", fresh)
+    np.testing.assert_array_equal(reader.read("EUR_USD", "H1")["bid_c"], fresh["bid_c"])
+
+def _append_chunks(root: str, columns: dict, offset: int):
+    store = CandleStore(root)
+    for begin in range(offset, len(columns["time"]), 4):
+        store.append("EUR_USD", "H1", {c: v[begin:begin + 4] for c, v in columns.items()})
+
+def test_concurrent_appends_keep_columns_aligned(tmp_path):
+    columns = hourly("2024-01-08", 400)
+    workers = [multiprocessing.Process(target=_append_chunks, args=(str(tmp_path), columns, offset))
+               for offset in (0, 2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stored = CandleStore(str(tmp_path)).read("EUR_USD", "H1")
+    sizes = {c: (tmp_path / "EUR_USD" / "H1" / f"{c}.bin").stat().st_size // d.itemsize
+             for c, d in COLUMNS.items()}
+    assert len(set(sizes.values())) == 1
+    assert np.all(np.diff(stored["time"]) > 0)
+    index = np.searchsorted(columns["time"], stored["time"])
+    np.testing.assert_array_equal(stored["bid_c"], columns["bid_c"][index])
+
+def test_long_history_is_left_to_a_backfill(tmp_path):
+    client = ForexDataClient(candle_store=CandleStore(str(tmp_path)), max_history=50000)
+    fetched = []
+    client.fetch_candles = lambda *args, **kwargs: fetched.append(args)
+    with pytest.raises(ValueError):
+        client.get_timeframes("EUR_USD", ["M5", "D"], bars=1000, backfill=False)  # 288000 M5 candles
+    with pytest.raises(HistoryPending) as pending:
+        client.get_timeframes("EUR_USD", ["M5", "D"], bars=100, backfill=False)
+    assert (pending.value.granularity, pending.value.count) == ("M5", 28800)
+    assert fetched == []  # nothing was paged on the request path
@@ -0,0 +1,33 @@
+"""Vectorized scores agree with TechnicalAnalyzer.generate_signal bar for bar."""
+import numpy as np
+import pandas as pd
+
+from app.analysis.technical_analyzer import technical_analyzer
+from app.analysis.vectorized import MACD_HISTORY, batch_generate_signals, score_series
+
+def prices(bars: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.08 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    return pd.DataFrame({"close": close, "high": close * 1.001, "low": close * 0.999})
+
+def test_score_series_matches_each_prefix():
+    frame = prices(240, seed=11)
+    scores = score_series(frame["close"].to_numpy())[0]
+    expected = [technical_analyzer.generate_signal(frame.iloc[:end])["score"] for end in range(30, len(frame) + 1)]
+    np.testing.assert_array_equal(scores[29:], expected)
+    assert len(set(expected)) > 3  # the series visits several score levels
+
+def test_batch_signals_match_beyond_the_macd_history():
+    frames = [prices(MACD_HISTORY + 476, seed=seed) for seed in range(6)]  # longer than the MACD dot product
+    batch = batch_generate_signals(np.vstack([f["close"] for f in frames]),
+                                   np.vstack([f["high"] for f in frames]),
+                                   np.vstack([f["low"] for f in frames]))
+    for row, frame in enumerate(frames):
+        signal = technical_analyzer.generate_signal(frame)
+        indicators = signal["indicators"]
+        assert (batch["score"][row], batch["signal"][row], batch["strength"][row]) == \
+               (signal["score"], signal["signal"], signal["strength"])
+        assert batch["rsi"][row] == indicators["rsi"]
+        assert (batch["macd"][row], batch["macd_signal"][row], batch["macd_histogram"][row]) == \
+               (indicators["macd"]["macd"], indicators["macd"]["signal"], indicators["macd"]["histogram"])
+        assert batch["bb_position"][row] == indicators["bollinger_bands"]["position"]